@@ -0,0 +1,188 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import pandas as pd
+from dom_snapshot import card_texts_from_html, table_snapshot_from_html
+from prop_normalize import normalize_frame, normalize_props
+from replay import _date_for, _read
+from scrape_bettingpros import parse_cards_fallback, parse_table_to_list
+from scrape_espn import parse_espn_rows
+from xhr_capture import decode_bettingpros_props, decode_espn_players
+
+REPLAY_DIR = 'fixtures/replay'
+XHR_DIR = 'fixtures/xhr'
+BASELINE = 'fixtures/bench_baseline.json'
+
+
+def _json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['payload']
+
+
+def load_cases(replay_dir=REPLAY_DIR, xhr_dir=XHR_DIR):
+    """name -> (parse function, list of inputs). Inputs are read up front so only parsing is timed."""
+    cases = {}
+    for directory in sorted(glob.glob(os.path.join(replay_dir, 'bettingpros_*'))):
+        day = _date_for(directory)
+        pages = [_read(p) for p in sorted(glob.glob(os.path.join(directory, 'scroll_*.html')))]
+        snapshots = [table_snapshot_from_html(p) for p in pages]
+        cases['table_snapshot_from_html'] = (lambda html: table_snapshot_from_html(html)['rows'], pages)
+        cases['parse_table_to_list'] = (lambda snap, day=day: parse_table_to_list(snap, day), snapshots)
+        raw = [r for snap in snapshots for r in parse_table_to_list(snap, day)]
+        cases['normalize_props'] = (normalize_props, [raw])
+        cases['normalize_frame'] = (normalize_frame, [pd.DataFrame(normalize_props(raw))])
+        page = os.path.join(directory, 'page.html')
+        if os.path.exists(page):
+            cases['parse_cards_fallback'] = (lambda html, day=day: parse_cards_fallback(card_texts_from_html(html), day), [_read(page)])
+    for directory in sorted(glob.glob(os.path.join(replay_dir, 'espn_*'))):
+        day = _date_for(directory)
+        pages = [_read(p) for p in sorted(glob.glob(os.path.join(directory, 'page_*.html')))]
+        cases['parse_espn_rows'] = (lambda html, day=day: parse_espn_rows(html, day), pages)
+    for path in sorted(glob.glob(os.path.join(xhr_dir, 'bettingpros_*.json'))):
+        cases['decode_bettingpros_props'] = (lambda payload, day=_date_for(path): decode_bettingpros_props(payload, day), [_json(path)])
+    for path in sorted(glob.glob(os.path.join(xhr_dir, 'espn_*.json'))):
+        cases['decode_espn_players'] = (lambda payload, day=_date_for(path): decode_espn_players(payload, day), [_json(path)])
+    return cases
+
+
+def bench(func, inputs, min_time=0.5, max_rounds=200):
+    """Time repeated passes over `inputs`, then one traced pass for allocations."""
+    rows = sum(len(func(item)) for item in inputs)  # warm-up, also the row count
+    rounds, elapsed, best = 0, 0.0, float('inf')
+    while rounds < max_rounds and (elapsed < min_time or rounds < 3):
+        start = time.perf_counter()
+        for item in inputs:
+            func(item)
+        took = time.perf_counter() - start
+        best = min(best, took)
+        elapsed += took
+        rounds += 1
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [func(item) for item in inputs]
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.count for stat in after.compare_to(before, 'filename') if stat.count > 0)
+    del results
+    return {
+        'rows': rows,
+        'rounds': rounds,
+        'best_s': best,
+        'rows_per_sec': rows / best if best else 0.0,
+        'peak_kb': peak / 1024,
+        'retained_blocks': allocated,
+    }
+
+
+def bench_tree(directory, min_time, only=None):
+    """Results of bench_parsers.py run in another checkout (e.g. the previous revision)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'results.json')
+        command = [sys.executable, 'bench_parsers.py', '--min-time', str(min_time), '--json', out] + (['--only', only] if only else [])
+        subprocess.run(command, cwd=directory, check=True, stdout=subprocess.DEVNULL)
+        with open(out, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def best_of(runs):
+    """Per parser, the fastest time and smallest peak over several runs (noise only slows a run down)."""
+    best = {}
+    for run in runs:
+        for name, r in run.items():
+            b = best.setdefault(name, dict(r))
+            if r['best_s'] < b['best_s']:
+                b.update(best_s=r['best_s'], rows_per_sec=r['rows_per_sec'])
+            b['peak_kb'] = min(b['peak_kb'], r['peak_kb'])
+    return best
+
+
+def compare(results, baseline, reference=None, tolerance=0.3):
+    """Failures of a run: any row count that differs from `baseline` (a committed file, so only
+    its row counts are used), and, when `reference` holds results of the previous revision
+    benched on the same machine in the same job, rows/sec or peak memory worse than it by more
+    than `tolerance` (0.3 = 30%). Absolute timings from another machine are never compared."""
+    failures = []
+    for name, base in baseline.items():
+        result = results.get(name)
+        if result is None:
+            failures.append(f"{name}: missing (fixture removed?)")
+            continue
+        if result['rows'] != base['rows']:
+            failures.append(f"{name}: {result['rows']} rows, baseline {base['rows']}")
+    for name, ref in (reference or {}).items():
+        result = results.get(name)
+        if result is None:
+            continue
+        if result['rows_per_sec'] < ref['rows_per_sec'] * (1 - tolerance):
+            failures.append(f"{name}: {result['rows_per_sec']:.0f} rows/s, previous revision {ref['rows_per_sec']:.0f}")
+        if result['peak_kb'] > ref['peak_kb'] * (1 + tolerance):
+            failures.append(f"{name}: peak {result['peak_kb']:.0f}KB, previous revision {ref['peak_kb']:.0f}KB")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the scrapers\' parsers against saved fixtures (no browser, no network).')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to spend timing each parser')
+    parser.add_argument('--only', help='comma-separated parser names')
+    parser.add_argument('--json', dest='json_out', help='write results to this file')
+    parser.add_argument('--baseline', help=f'check row counts against this file (e.g. {BASELINE})')
+    parser.add_argument('--against', help='checkout of the previous revision: bench it alternately with this one and compare speed and memory')
+    parser.add_argument('--repeat', type=int, default=3, help='alternating runs of each tree with --against (best run counts)')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='allowed slowdown / memory growth against --against, as a fraction')
+    parser.add_argument('--write-baseline', action='store_true', help=f'rewrite {BASELINE} with this run\'s row counts')
+    args = parser.parse_args(argv)
+
+    cases = load_cases()
+    if args.only:
+        wanted = set(args.only.split(','))
+        cases = {k: v for k, v in cases.items() if k in wanted}
+    if not cases:
+        print(f"No fixtures found under {REPLAY_DIR} / {XHR_DIR}")
+        return 1
+
+    runs, reference_runs = [], []
+    for _ in range(args.repeat if args.against else 1):
+        if args.against:
+            reference_runs.append(bench_tree(args.against, args.min_time, args.only))
+        runs.append({name: bench(func, inputs, args.min_time) for name, (func, inputs) in cases.items()})
+    results = best_of(runs)
+    reference = best_of(reference_runs) if args.against else None
+
+    print(f"{'parser':<26} {'rows':>6} {'rows/s':>10} {'best':>9} {'peak':>9} {'blocks':>7}" + ('  vs previous' if reference else ''))
+    for name, r in results.items():
+        ref = (reference or {}).get(name)
+        versus = f"  {r['rows_per_sec'] / ref['rows_per_sec']:.2f}x" if ref else ''
+        print(f"{name:<26} {r['rows']:>6} {r['rows_per_sec']:>10.0f} {r['best_s'] * 1000:>7.2f}ms {r['peak_kb']:>7.0f}KB {r['retained_blocks']:>7}{versus}")
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+    if args.write_baseline:
+        with open(BASELINE, 'w', encoding='utf-8') as f:
+            json.dump({name: {'rows': r['rows']} for name, r in results.items()}, f, indent=2, sort_keys=True)
+            f.write('\n')
+    if args.baseline or reference:
+        baseline = json.load(open(args.baseline, encoding='utf-8')) if args.baseline else {}
+        if args.only:
+            baseline = {k: v for k, v in baseline.items() if k in cases}
+        failures = compare(results, baseline, reference, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        against = ' and '.join(filter(None, [args.baseline and f'{args.baseline} row counts',
+                                             reference and f'{args.against} (tolerance {args.tolerance:.0%})']))
+        print(f"No regressions against {against}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
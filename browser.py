@@ -0,0 +1,240 @@
+import os
+import json
+import queue
+import shutil
+import threading
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+logger = logging.getLogger('browser')
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Requests the lean profile refuses via CDP Network.setBlockedURLs: static media/fonts and
+# known ad, analytics and consent-banner hosts. None of them carry table data.
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*.mp4', '*.webm', '*.m3u8',
+    '*/combiner/i?*',
+    '*doubleclick.net*', '*googlesyndication.com*', '*googleadservices.com*', '*googletagservices.com*',
+    '*googletagmanager.com*', '*google-analytics.com*', '*adservice.google.*', '*amazon-adsystem.com*',
+    '*adnxs.com*', '*rubiconproject.com*', '*pubmatic.com*', '*casalemedia.com*', '*criteo.*',
+    '*taboola.com*', '*outbrain.com*', '*moatads.com*', '*scorecardresearch.com*', '*quantserve.com*',
+    '*chartbeat.*', '*hotjar.com*', '*facebook.net*', '*connect.facebook.*', '*segment.io*',
+    '*nr-data.net*', '*newrelic.com*', '*optimizely.com*', '*branch.io*', '*cookielaw.org*', '*onetrust.com*',
+]
+
+
+def headless_from_env():
+    return os.getenv("HEADLESS", "true").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    """Resolve chromedriver once per process: CHROMEDRIVER_PATH, then PATH, then
+    webdriver-manager (whose download is cached on disk). None lets Selenium Manager decide."""
+    path = os.getenv('CHROMEDRIVER_PATH') or shutil.which('chromedriver')
+    if path:
+        return path
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    except Exception:
+        logger.debug("webdriver-manager install failed; falling back to Selenium Manager", exc_info=True)
+        return None
+
+
+def browser_profile(profile=None):
+    """'lean' (default) blocks media, fonts, ads and trackers; 'full' loads everything."""
+    return (profile or os.getenv('BROWSER_PROFILE', 'lean')).lower()
+
+
+def chrome_options(headless=None, profile=None):
+    options = Options()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--window-size=1366,1200')
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    if os.getenv('CHROME_BIN'):
+        options.binary_location = os.getenv('CHROME_BIN')
+    if headless_from_env() if headless is None else headless:
+        options.add_argument("--headless=new")
+    # performance log feeds NetworkMeter (bytes transferred) in every profile so runs compare
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if browser_profile(profile) == 'lean':
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+    return options
+
+
+def apply_profile(driver, profile=None):
+    """Turn on CDP domains used for metrics and, for the lean profile, URL blocking."""
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        driver.execute_cdp_cmd('Network.enable', {})
+        if browser_profile(profile) == 'lean':
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    except Exception:
+        logger.debug("CDP setup failed", exc_info=True)
+
+
+def new_driver(headless=None, profile=None):
+    """Start a Chrome driver with the options shared by all scrapers."""
+    path = chromedriver_path()
+    service = Service(path) if path else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options(headless, profile))
+    try:
+        driver.set_window_size(1366, 1200)
+    except Exception:
+        pass
+    apply_profile(driver, profile)
+    driver.network_meter = NetworkMeter()
+    return driver
+
+
+class NetworkMeter:
+    """Running totals from Chrome's performance log: requests, bytes on the wire, blocked.
+
+    Reading the log drains it, so anything else interested in the events (e.g. XHR capture)
+    registers in `listeners` and is handed every event as it is collected."""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self.listeners = []
+
+    def collect(self, driver):
+        """Drain the performance log, update totals, notify listeners and return the decoded CDP events."""
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return []
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params') or {}
+            if method == 'Network.requestWillBeSent':
+                self.requests += 1
+            elif method == 'Network.loadingFinished':
+                self.bytes += int(params.get('encodedDataLength') or 0)
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                self.blocked += 1
+            events.append(message)
+        for event in events:
+            for listener in list(self.listeners):
+                listener(event)
+        return events
+
+
+def network_meter(driver):
+    meter = getattr(driver, 'network_meter', None)
+    if meter is None:
+        meter = driver.network_meter = NetworkMeter()
+    return meter
+
+
+def page_report(driver):
+    """Page-ready time, network totals so far and JS heap for the current page."""
+    meter = network_meter(driver)
+    meter.collect(driver)
+    report = {'page_ready_ms': None, 'bytes': meter.bytes, 'requests': meter.requests, 'blocked': meter.blocked, 'js_heap_bytes': None}
+    try:
+        report['page_ready_ms'] = driver.execute_script(
+            "var n = performance.getEntriesByType('navigation')[0]; return n ? n.domContentLoadedEventEnd : null;")
+    except Exception:
+        pass
+    try:
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])
+        report['js_heap_bytes'] = next((m['value'] for m in metrics if m.get('name') == 'JSHeapUsedSize'), None)
+    except Exception:
+        pass
+    return report
+
+
+def format_page_report(report):
+    ready = f"{report['page_ready_ms']:.0f}ms" if report.get('page_ready_ms') is not None else 'n/a'
+    heap = f"{report['js_heap_bytes'] / 1e6:.1f}MB" if report.get('js_heap_bytes') is not None else 'n/a'
+    return (f"profile={browser_profile()}, page_ready={ready}, transferred={report['bytes'] / 1e6:.2f}MB, "
+            f"requests={report['requests']}, blocked={report['blocked']}, js_heap={heap}")
+
+
+def reset_driver(driver):
+    """Return a pooled driver to a clean state between sources."""
+    driver.delete_all_cookies()
+    driver.get('about:blank')
+    network_meter(driver).collect(driver)
+    driver.network_meter = NetworkMeter()
+
+
+class DriverPool:
+    """Bounded pool of reusable headless drivers, created lazily on first use."""
+
+    def __init__(self, size=2, factory=new_driver):
+        self.size = size
+        self.factory = factory
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.slots = threading.Semaphore(size)
+        self.all = set()
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser free within {timeout}s")
+        driver = None
+        try:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = self.factory()
+                with self.lock:
+                    self.created += 1
+                    self.all.add(driver)
+            yield driver
+        except BaseException:
+            # a failed source may leave the browser in any state; don't hand it out again
+            self.discard(driver)
+            driver = None
+            raise
+        finally:
+            if driver is not None:
+                try:
+                    reset_driver(driver)
+                    self.idle.put(driver)
+                except Exception:
+                    self.discard(driver)
+            self.slots.release()
+
+    def discard(self, driver):
+        if driver is None:
+            return
+        with self.lock:
+            self.all.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            drivers = list(self.all)
+            self.all.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
@@ -0,0 +1,158 @@
+import csv
+import os
+import logging
+
+logger = logging.getLogger('checkpoint')
+
+
+class CsvCheckpoint:
+    """Append-only CSV sink: buffers rows (dicts, or tuples in `fieldnames` order) and appends
+    them in batches, never rewriting what is already on disk, so a crashed run can be resumed
+    from the file."""
+
+    def __init__(self, path, fieldnames, batch_size=25):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = batch_size
+        self.pending = []
+        self.rows_written = 0
+        self._fh = None
+        self._writer = None
+
+    def _repair_tail(self):
+        """Drop a half-written last line left behind by a crash mid-flush."""
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            f.seek(0)
+            data = f.read()
+            f.seek(0)
+            f.truncate(data.rfind(b'\n') + 1)
+
+    def _header_matches(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), None) == self.fieldnames
+
+    @property
+    def marker(self):
+        return self.path + '.done'
+
+    def is_complete(self):
+        """True once mark_complete() was called: the file holds a finished run, not one to resume."""
+        return os.path.exists(self.marker)
+
+    def mark_complete(self):
+        with open(self.marker, 'w', encoding='utf-8'):
+            pass
+
+    def reset(self):
+        """Start over: drop the file and its completion marker."""
+        self.close()
+        self.pending = []
+        self.rows_written = 0
+        for path in (self.path, self.marker):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load(self):
+        """Yield rows already checkpointed (empty if there is no usable checkpoint, or the
+        checkpoint belongs to a run that completed)."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0 or self.is_complete():
+            return
+        self._repair_tail()
+        if not self._header_matches():
+            logger.warning(f"Checkpoint {self.path} has a different header; it will be replaced")
+            return
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if None in row or None in row.values():
+                    continue
+                yield row
+
+    def _open(self):
+        resume = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        if resume:
+            self._repair_tail()
+            resume = self._header_matches()
+        self._fh = open(self.path, 'a' if resume else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._fh, fieldnames=self.fieldnames, extrasaction='ignore', lineterminator='\n')
+        if not resume:
+            self._writer.writeheader()
+
+    def append(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        if self._fh is None:
+            self._open()
+        for row in self.pending:
+            # dicts by field name; tuple records (e.g. namedtuples) already in `fieldnames` order
+            if isinstance(row, dict):
+                self._writer.writerow(row)
+            else:
+                self._writer.writer.writerow(row)
+        self._fh.flush()
+        self.rows_written += len(self.pending)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def compact_checkpoint(src, dest, fieldnames, transform=None, key=None, batch=None, batch_size=5000):
+    """Stream `src` into `dest`. `batch` (rows -> rows) is applied to `batch_size` rows at a
+    time, then `transform` may rewrite a row or return None to drop it; repeats of `key(row)`
+    are dropped. Returns the number of rows written."""
+    seen = set()
+    written = 0
+    tmp = dest + '.tmp'
+    with open(src, newline='', encoding='utf-8') as fin, open(tmp, 'w', newline='', encoding='utf-8') as fout:
+        writer = csv.DictWriter(fout, fieldnames=fieldnames, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        rows = (row for row in csv.DictReader(fin) if None not in row and None not in row.values())
+        if batch is not None:
+            rows = (row for chunk in _chunks(rows, batch_size) for row in batch(chunk))
+        for row in rows:
+            if transform is not None:
+                row = transform(row)
+                if row is None:
+                    continue
+            if key is not None:
+                k = key(row)
+                if k in seen:
+                    continue
+                seen.add(k)
+            writer.writerow(row)
+            written += 1
+    os.replace(tmp, dest)
+    return written
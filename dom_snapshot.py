@@ -0,0 +1,145 @@
+import os
+from datetime import datetime
+from lxml import html as lxml_html
+
+
+# JS executed once per scroll: copies the header row plus every row from index `start`
+# onwards into a detached table, attaching each row/cell/button's rendered innerText, so
+# only rows added since the previous scroll come back, in a single round trip.
+# `data-anchor` carries the text of row `start - 1` so callers can detect a re-rendered table.
+TABLE_SNAPSHOT_JS = """
+var table = arguments[0], start = arguments[1] || 0;
+var rows = table.rows ? Array.from(table.rows) : Array.from(table.querySelectorAll('tr'));
+var out = document.createElement('table');
+for (var i = 0; i < rows.length; i++) {
+  var row = rows[i];
+  if (i < start && !row.querySelector('th')) continue;
+  var copy = row.cloneNode(true);
+  copy.setAttribute('data-inner-text', row.innerText || '');
+  var live = row.querySelectorAll('th, td, button');
+  var dup = copy.querySelectorAll('th, td, button');
+  for (var j = 0; j < live.length && j < dup.length; j++) {
+    dup[j].setAttribute('data-inner-text', live[j].innerText || '');
+  }
+  out.appendChild(copy);
+}
+out.setAttribute('data-total-rows', rows.length);
+out.setAttribute('data-start', start);
+if (start > 0 && start <= rows.length) out.setAttribute('data-anchor', (rows[start - 1].innerText || '').trim());
+return out.outerHTML;
+"""
+
+_BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol',
+    'p', 'pre', 'section', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+}
+
+
+def inner_text(el):
+    """Approximate Selenium's `.text` for an lxml element: prefer the innerText captured by
+    TABLE_SNAPSHOT_JS, otherwise break lines at block elements and collapse whitespace."""
+    captured = el.get('data-inner-text')
+    if captured is not None:
+        return captured.strip()
+    parts = []
+
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in ('script', 'style'):
+            return
+        block = node.tag in _BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append('\n')
+
+    walk(el)
+    lines = (' '.join(l.split()) for l in ''.join(parts).split('\n'))
+    return '\n'.join(l for l in lines if l)
+
+
+def table_snapshot_from_html(html):
+    """Parse a table's outerHTML into plain strings: header labels plus, per `tr`,
+    the row text, the `td` texts and the texts of any buttons inside the row."""
+    empty = {'headers': [], 'rows': [], 'total_rows': 0, 'start': 0, 'anchor': None}
+    try:
+        root = lxml_html.fromstring(html)
+    except Exception:
+        return empty
+    tables = [root] if root.tag == 'table' else root.xpath('.//table')
+    if not tables:
+        return empty
+    table = tables[0]
+    headers = [inner_text(th).lower() for th in table.iter('th')]
+    rows = []
+    for tr in table.iter('tr'):
+        rows.append({
+            'text': inner_text(tr),
+            'cells': [inner_text(td) for td in tr.iter('td')],
+            'buttons': [inner_text(b) for b in tr.iter('button')],
+        })
+    try:
+        total_rows = int(table.get('data-total-rows'))
+    except (TypeError, ValueError):
+        total_rows = len(rows)
+    try:
+        start = int(table.get('data-start') or 0)
+    except ValueError:
+        start = 0
+    return {'headers': headers, 'rows': rows, 'total_rows': total_rows, 'start': start, 'anchor': table.get('data-anchor')}
+
+
+def snapshot_html(driver, table_el, start=0):
+    """The header row plus rows from `start` onwards as HTML with innerText attached, in one WebDriver call."""
+    return driver.execute_script(TABLE_SNAPSHOT_JS, table_el, start)
+
+
+def snapshot_table(driver, table_el, start=0):
+    """Pull the table's header labels and rows from `start` onwards with a single WebDriver call."""
+    return table_snapshot_from_html(snapshot_html(driver, table_el, start))
+
+
+# Elements the BettingPros card fallback scans, as CSS (live page) and XPath (saved HTML).
+CARD_SELECTOR = 'main div, .pbcs-content-container div, article, li'
+CARD_XPATH = "//main//div | //*[contains(concat(' ', normalize-space(@class), ' '), ' pbcs-content-container ')]//div | //article | //li"
+CARD_TEXTS_JS = "return Array.from(document.querySelectorAll(arguments[0])).map(function (el) { return el.innerText || ''; });"
+
+
+def card_texts(driver):
+    """innerText of every card-fallback candidate element, in one WebDriver call."""
+    return driver.execute_script(CARD_TEXTS_JS, CARD_SELECTOR) or []
+
+
+def card_texts_from_html(html):
+    """Same candidates as card_texts, read from a saved page."""
+    try:
+        root = lxml_html.fromstring(html)
+    except Exception:
+        return []
+    return [inner_text(el) for el in root.xpath(CARD_XPATH)]
+
+
+class SnapshotRecorder:
+    """Saves the HTML snapshots a scraper parses (one file per scroll/page step) so the
+    parsers can be re-run offline with replay.py. Enabled by REPLAY_RECORD_DIR."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, source):
+        root = os.getenv('REPLAY_RECORD_DIR')
+        if not root:
+            return None
+        return cls(os.path.join(root, f"{source}_{datetime.now():%Y-%m-%d_%H%M%S}"))
+
+    def save(self, name, html):
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+            f.write(html or '')
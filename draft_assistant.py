@@ -0,0 +1,281 @@
+import os
+import json
+import math
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from draft_sim import player_pool
+from loader import latest_snapshots
+from players import join_sources, load_index, normalize_position
+
+logger = logging.getLogger('draft_assistant')
+
+# Starting lineup; FLEX takes RB/WR/TE
+ROSTER_SLOTS = {'QB': 1, 'RB': 2, 'WR': 2, 'TE': 1, 'FLEX': 1, 'K': 1, 'DST': 1}
+FLEX_POSITIONS = ('RB', 'WR', 'TE')
+# How far (in ranks) an unfilled starting need pulls a position up the board
+NEED_BONUS = 12
+CANDIDATES_PER_POSITION = 5
+
+
+class UnknownPlayer(KeyError):
+    """No player in the pool matches the name (HTTP 404)."""
+
+
+class PickConflict(KeyError):
+    """The player is already drafted, or for an undo, not drafted (HTTP 409)."""
+
+
+class DraftState:
+    """In-memory board for one live draft.
+
+    Players are kept in one rank-ordered list per position with a head index; drafting a
+    player only flips a flag, and heads skip drafted players lazily, so each pick and each
+    recommendation touches a handful of players rather than the whole pool."""
+
+    def __init__(self, pool, index, roster_slots=None):
+        self.index = index
+        self.roster_slots = dict(roster_slots or ROSTER_SLOTS)
+        self.players = {}
+        by_position = {}
+        line_columns = [c for c in pool.columns if c.startswith('line_')]
+        for row in pool.sort_values(['score', 'centre'], kind='stable').itertuples(index=False):
+            position = normalize_position(row.position) or 'UNK'
+            lines = {c[len('line_'):]: getattr(row, c) for c in line_columns if not _missing(getattr(row, c))}
+            self.players[row.player_id] = {
+                'player_id': row.player_id, 'name': row.player_name, 'position': position,
+                'rank': None if _missing(row.rank) else float(row.rank), 'adp': None if _missing(row.adp) else float(row.adp),
+                'tier': None if _missing(row.tier) else int(row.tier), 'score': float(row.score), 'lines': lines,
+            }
+            by_position.setdefault(position, []).append(row.player_id)
+        self.by_position = by_position
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.drafted = {}
+            self.heads = {p: 0 for p in self.by_position}
+            self.mine = {p: 0 for p in self.by_position}
+            self.picks = 0
+
+    def _advance(self, position):
+        ids = self.by_position[position]
+        head = self.heads[position]
+        while head < len(ids) and ids[head] in self.drafted:
+            head += 1
+        self.heads[position] = head
+        return head
+
+    def needs(self):
+        """Unfilled starting slots by position, FLEX counted once the base slots are full."""
+        needs = {}
+        flex_surplus = 0
+        for position, slots in self.roster_slots.items():
+            if position == 'FLEX':
+                continue
+            have = self.mine.get(position, 0)
+            needs[position] = max(slots - have, 0)
+            if position in FLEX_POSITIONS:
+                flex_surplus += max(have - slots, 0)
+        needs['FLEX'] = max(self.roster_slots.get('FLEX', 0) - flex_surplus, 0)
+        return needs
+
+    def _resolve(self, name, position=''):
+        """Player ID for a name or ID; without a position, fuzzy matching tries each one."""
+        if name in self.players:
+            return name
+        pid = self.index.resolve(name, position)
+        for pos in ([] if pid or position else self.by_position):
+            pid = self.index.resolve(name, pos)
+            if pid:
+                break
+        return pid
+
+    def draft(self, name, mine=False, position=''):
+        """Mark a player drafted. Returns the player dict; raises UnknownPlayer or PickConflict."""
+        with self.lock:
+            pid = self._resolve(name, position)
+            if pid not in self.players:
+                raise UnknownPlayer(f"Unknown player {name!r}")
+            if pid in self.drafted:
+                raise PickConflict(f"{self.players[pid]['name']} already drafted")
+            player = self.players[pid]
+            self.drafted[pid] = {'pick': self.picks + 1, 'mine': bool(mine)}
+            self.picks += 1
+            if mine:
+                self.mine[player['position']] = self.mine.get(player['position'], 0) + 1
+            self._advance(player['position'])
+            return player
+
+    def undo(self, name):
+        with self.lock:
+            pid = self._resolve(name)
+            if pid not in self.players:
+                raise UnknownPlayer(f"Unknown player {name!r}")
+            taken = self.drafted.pop(pid, None)
+            if taken is None:
+                raise PickConflict(f"{name!r} is not drafted")
+            player = self.players[pid]
+            if taken['mine']:
+                self.mine[player['position']] -= 1
+            self.picks -= 1
+            ids = self.by_position[player['position']]
+            self.heads[player['position']] = min(self.heads[player['position']], ids.index(pid))
+            return player
+
+    def best_available(self, n=10, position=None):
+        """Best `n` undrafted players overall (or at one position) by score."""
+        with self.lock:
+            positions = [position] if position else list(self.by_position)
+            out = []
+            for pos in positions:
+                if pos not in self.by_position:
+                    continue
+                ids = self.by_position[pos]
+                i = self._advance(pos)
+                taken = 0
+                while i < len(ids) and taken < n:
+                    if ids[i] not in self.drafted:
+                        out.append(self.players[ids[i]])
+                        taken += 1
+                    i += 1
+            out.sort(key=lambda p: p['score'])
+            return out[:n]
+
+    def recommend(self, n=10):
+        """Best available with unfilled starting needs pulled up by NEED_BONUS ranks."""
+        with self.lock:
+            needs = self.needs()
+            candidates = self.best_available(CANDIDATES_PER_POSITION * len(self.by_position))
+        scored = []
+        for player in candidates:
+            position = player['position']
+            need = needs.get(position, 0) or (needs.get('FLEX', 0) if position in FLEX_POSITIONS else 0)
+            scored.append((player['score'] - (NEED_BONUS if need else 0), player))
+        scored.sort(key=lambda item: item[0])
+        return [dict(p, need=bool(needs.get(p['position']) or (p['position'] in FLEX_POSITIONS and needs.get('FLEX')))) for _, p in scored[:n]]
+
+    def summary(self):
+        with self.lock:
+            return {'picks': self.picks, 'available': len(self.players) - len(self.drafted), 'needs': self.needs(),
+                    'mine': [self.players[pid]['name'] for pid, d in self.drafted.items() if d['mine']]}
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def load_state(scoring_format='ppr', data_dir='Data'):
+    """DraftState over the newest snapshots: Boris rank for the format, ESPN ADP for players
+    Boris doesn't rank (placed after all ranked players), prop lines attached."""
+    espn, boris, props = latest_snapshots(data_dir)
+    index = load_index(data_dir)
+    pool = player_pool(join_sources(espn, boris, props, index), scoring_format)
+    pool = pool.assign(score=pool['rank'].fillna(pool['centre'] + pool['rank'].max()))
+    return DraftState(pool, index)
+
+
+def _count(value):
+    """`n` from a query string or JSON body as a non-negative int; ValueError otherwise."""
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'n must be an integer, got {value!r}') from None
+    if n < 0:
+        raise ValueError(f'n must not be negative, got {n}')
+    return n
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't wait on delayed ACKs
+    state = None
+
+    def log_message(self, fmt, *args):
+        logger.debug(fmt % args)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        if not isinstance(body, dict):
+            raise ValueError('body must be a JSON object')
+        return body
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            n = _count(query.get('n', ['10'])[0])
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+        if url.path == '/recommend':
+            self._send(200, {'recommendations': self.state.recommend(n), **self.state.summary()})
+        elif url.path == '/available':
+            self._send(200, {'players': self.state.best_available(n, query.get('position', [None])[0])})
+        elif url.path == '/state':
+            self._send(200, self.state.summary())
+        else:
+            self._send(404, {'error': f'unknown path {url.path}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            body = self._body()
+            if url.path == '/pick':
+                n = _count(body.get('n', 10))
+                player = self.state.draft(body['player'], body.get('mine', False), body.get('position', ''))
+                self._send(200, {'drafted': player, 'recommendations': self.state.recommend(n), **self.state.summary()})
+            elif url.path == '/undo':
+                self._send(200, {'restored': self.state.undo(body['player']), **self.state.summary()})
+            elif url.path == '/reset':
+                self.state.reset()
+                self._send(200, self.state.summary())
+            else:
+                self._send(404, {'error': f'unknown path {url.path}'})
+        except UnknownPlayer as e:
+            self._send(404, {'error': e.args[0]})
+        except PickConflict as e:
+            self._send(409, {'error': e.args[0]})
+        except KeyError as e:
+            self._send(400, {'error': f'missing field {e.args[0]!r}' if e.args else 'missing field'})
+        except (TypeError, ValueError) as e:
+            self._send(400, {'error': str(e)})
+
+
+def make_server(state, host='127.0.0.1', port=8765):
+    handler = type('DraftHandler', (Handler,), {'state': state})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Live draft assistant: POST /pick {"player", "mine"}, GET /recommend.')
+    parser.add_argument('--format', default=os.getenv('SCORING_FORMAT', 'ppr'), choices=['standard', 'ppr', 'half_ppr'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('DRAFT_ASSISTANT_PORT', '8765')))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+    state = load_state(args.format)
+    server = make_server(state, args.host, args.port)
+    logger.info(f"Draft assistant ({args.format}, {len(state.players)} players) on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from loader import latest_snapshots
+from players import join_sources, load_index
+
+MIN_SIGMA = 1.0
+
+
+def player_pool(joined, scoring_format='ppr', size=None):
+    """Draftable players for one scoring format with the centre and spread of their draft spot.
+
+    Centre is ESPN ADP (Boris avg rank when ESPN has no ADP). Spread is the larger of Boris
+    Std.Dev and a quarter of the Best..Worst rank range; players Boris doesn't rank get
+    10% of their ADP. Sorted by centre and cut to `size`."""
+    ranked = joined[joined['scoring_format'] == scoring_format]
+    unranked = joined[joined['scoring_format'].isna() & ~joined['player_id'].isin(ranked['player_id'])]
+    pool = pd.concat([ranked, unranked], ignore_index=True).drop_duplicates('player_id')
+    centre = pool['adp'].fillna(pool['avg_rank'])
+    spread = np.fmax(pool['std_dev'], (pool['worst_rank'] - pool['best_rank']) / 4)
+    spread = spread.fillna(centre * 0.1)
+    pool = pool.assign(centre=centre, sigma=np.maximum(spread, MIN_SIGMA)).dropna(subset=['centre'])
+    pool = pool.sort_values('centre', kind='stable').reset_index(drop=True)
+    return pool.head(size) if size else pool
+
+
+def snake_order(teams, rounds):
+    """Team index (0-based) making each overall pick of a snake draft."""
+    forward = np.arange(teams)
+    return np.concatenate([forward if r % 2 == 0 else forward[::-1] for r in range(rounds)])
+
+
+def my_picks(slot, teams, rounds, pool_size=None):
+    """Overall pick numbers (0-based) belonging to draft slot `slot` (1-based). With
+    `pool_size`, only the picks made while the pool still has players."""
+    picks = np.flatnonzero(snake_order(teams, rounds) == slot - 1)
+    return picks if pool_size is None else picks[picks < pool_size]
+
+
+def simulate_batch(centre, sigma, my_score, slot, teams, rounds, drafts, seed):
+    """Advance `drafts` snake drafts at once. Every pick is taken by the best available
+    player under a per-draft noisy ADP draw; at our own slot the best available by
+    `my_score` is taken instead. Returns how often each player was still available at
+    each of our picks made before the pool runs out: an int array (players, our picks)."""
+    rng = np.random.default_rng(seed)
+    n = len(centre)
+    keys = (centre + sigma * rng.standard_normal((drafts, n), dtype=np.float32)).astype(np.float32)
+    mine = np.broadcast_to(np.asarray(my_score, dtype=np.float32), (drafts, n))
+    order = snake_order(teams, rounds)
+    ours = set(my_picks(slot, teams, rounds, n).tolist())
+    rows = np.arange(drafts)
+    available = np.zeros((n, len(ours)), dtype=np.int64)
+    taken = np.zeros((drafts, n), dtype=bool)
+    k = 0
+    for pick in range(min(len(order), n)):
+        if pick in ours:
+            available[:, k] = drafts - taken.sum(axis=0)
+            k += 1
+            choice = np.where(taken, np.inf, mine).argmin(axis=1)
+        else:
+            choice = np.where(taken, np.inf, keys).argmin(axis=1)
+        taken[rows, choice] = True
+    return available
+
+
+def _run_chunk(args):
+    return simulate_batch(*args)
+
+
+def simulate(pool, slot, teams=12, rounds=15, drafts=20000, seed=0, workers=None, batch=2000, strategy='adp'):
+    """Run `drafts` drafts split into batches across a process pool. Returns (availability
+    DataFrame with one `pick_<n>` column per our pick, drafts/sec). Picks after the pool is
+    exhausted have nobody left to take and get no column. Results depend only on seed,
+    drafts and batch size, not on the number of workers."""
+    centre = pool['centre'].to_numpy(dtype=np.float32)
+    sigma = pool['sigma'].to_numpy(dtype=np.float32)
+    # 'adp': we draft like everyone else (by centre); 'rank': by Boris rank, ADP for unranked players
+    my_score = centre if strategy == 'adp' else pool['rank'].fillna(pool['centre'] + 1000).to_numpy(dtype=np.float32)
+    sizes = [batch] * (drafts // batch) + ([drafts % batch] if drafts % batch else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [(centre, sigma, my_score, slot, teams, rounds, size, s) for size, s in zip(sizes, seeds)]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            counts = sum(executor.map(_run_chunk, chunks))
+    else:
+        counts = sum(_run_chunk(c) for c in chunks)
+    elapsed = time.perf_counter() - started
+    picks = my_picks(slot, teams, rounds, len(pool))
+    result = pool[['player_id', 'player_name', 'position', 'centre', 'sigma']].copy()
+    for k, pick in enumerate(picks):
+        result[f'pick_{pick + 1}'] = counts[:, k] / drafts
+    return result, drafts / elapsed if elapsed else float('inf')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Monte Carlo snake-draft availability from ESPN ADP and Boris Chen spread.')
+    parser.add_argument('--slot', type=int, default=int(os.getenv('DRAFT_SLOT', '1')), help='our draft slot (1-based)')
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--rounds', type=int, default=15)
+    parser.add_argument('--drafts', type=int, default=20000)
+    parser.add_argument('--format', default='ppr', choices=['standard', 'ppr', 'half_ppr'])
+    parser.add_argument('--strategy', default='adp', choices=['adp', 'rank'], help='how we pick at our own slots')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--csv', help='write the full availability table here')
+    args = parser.parse_args(argv)
+
+    espn, boris, props = latest_snapshots()
+    joined = join_sources(espn, boris, props, load_index())
+    pool = player_pool(joined, args.format, size=int(args.teams * args.rounds * 1.5))
+    result, rate = simulate(pool, args.slot, args.teams, args.rounds, args.drafts, args.seed, args.workers, args.batch, args.strategy)
+    if args.csv:
+        result.to_csv(args.csv, index=False)
+    pick_columns = [c for c in result.columns if c.startswith('pick_')]
+    skipped = len(my_picks(args.slot, args.teams, args.rounds)) - len(pick_columns)
+    if skipped:
+        print(f"Only {len(pool)} players in the pool: our last {skipped} picks are not simulated")
+    pick_columns = pick_columns[:4]
+    print(result[['player_name', 'position', 'centre', 'sigma'] + pick_columns].head(args.top).round(3).to_string(index=False))
+    print(f"\n{args.drafts} drafts of {args.teams} teams x {args.rounds} rounds over {len(pool)} players: {rate:,.0f} drafts/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+import os
+import csv
+import sys
+import json
+import time
+import codecs
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+import aiohttp
+import pandas as pd
+from http_fetch import CACHE_PATH, HttpCache
+from loader import schema_version
+from store import save_snapshot
+
+logger = logging.getLogger('ingest')
+
+CONCURRENCY = int(os.getenv('INGEST_CONCURRENCY', '8'))
+CHUNK_SIZE = 64 * 1024
+RETRIES = 3
+BACKOFF = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, sock_read=30)  # as http_fetch.DEFAULT_TIMEOUT
+
+
+class FeedSource:
+    """One downloadable rankings feed.
+
+    `filename` and the values of `extra_columns` may contain '{date}' (the run date).
+    `parser` is 'csv', 'json' (an array of objects, or JSON Lines) or a class with the
+    CsvRows interface. `columns` picks and orders the output columns (missing ones are
+    left empty); without it CSV feeds keep their header and JSON feeds take the keys of
+    the first object. `schema` names a loader schema the output header is checked against, and
+    `store`/`partition` the store source and scoring_format partition the rows go to.
+    """
+
+    def __init__(self, name, url, filename, parser='csv', columns=None, extra_columns=None,
+                 schema=None, store=None, partition=None, label=None):
+        self.name = name
+        self.url = url
+        self.filename = filename
+        self.parser = parser
+        self.columns = columns
+        self.extra_columns = extra_columns or {}
+        self.schema = schema
+        self.store = store
+        self.partition = partition
+        self.label = label or name
+
+
+# name -> FeedSource; scrapers register their feeds on import (see scrape_borris)
+REGISTRY = {}
+
+
+def register(source):
+    REGISTRY[source.name] = source
+    return source
+
+
+class CsvRows:
+    """Incremental CSV parser: feed() decoded text chunks, get back the records completed so
+    far. A record ends at a newline outside quotes, so quoted fields may span chunks. With
+    `columns`, records are cut down to those columns of the feed's header, in that order."""
+
+    def __init__(self, columns=None):
+        self.columns = list(columns) if columns else None
+        self.header = None
+        self.picks = None
+        self.tail = ''
+        self.record = []
+        self.quotes = 0
+
+    def _rows(self, lines):
+        rows = [r for r in csv.reader(lines) if r]
+        if self.header is None and rows:
+            header = rows.pop(0)
+            self.header = self.columns or header
+            if self.columns:
+                positions = {name: i for i, name in enumerate(header)}
+                self.picks = [positions.get(name) for name in self.columns]
+        if self.picks is not None:
+            rows = [['' if i is None or i >= len(r) else r[i] for i in self.picks] for r in rows]
+        return rows
+
+    def feed(self, text):
+        *lines, self.tail = (self.tail + text).split('\n')
+        ready = []
+        for line in lines:
+            self.record.append(line + '\n')
+            self.quotes += line.count('"')
+            if not self.quotes % 2:
+                ready.extend(self.record)
+                self.record = []
+                self.quotes = 0
+        return self._rows(ready)
+
+    def close(self):
+        rest = self.record + ([self.tail] if self.tail else [])
+        self.record, self.tail = [], ''
+        return self._rows(rest)
+
+
+class JsonRows:
+    """Incremental parser for a JSON array of objects or JSON Lines: each object is decoded
+    as soon as its closing brace has arrived and flattened to `columns`."""
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self, columns=None):
+        self.header = list(columns) if columns else None
+        self.buffer = ''
+
+    def feed(self, text):
+        buffer = self.buffer + text
+        rows = []
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,[]':
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] != '{':
+                raise ValueError(f"Expected a JSON object at offset {pos}, got {buffer[pos]!r}")
+            try:
+                item, pos = self.decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # object not complete yet
+            if self.header is None:
+                self.header = list(item)
+            rows.append(['' if item.get(c) is None else item.get(c) for c in self.header])
+        self.buffer = buffer[pos:]
+        return rows
+
+    def close(self):
+        if self.buffer.strip():
+            raise ValueError('Truncated JSON response')
+        return []
+
+
+PARSERS = {'csv': CsvRows, 'json': JsonRows}
+
+
+async def _download(session, source, filename, extra_columns, cache):
+    """Stream one response through the source's parser into `filename` (via a .part file)."""
+    url = source.url
+    headers = cache.conditional_headers(url) if cache is not None else {}
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            entry = cache.get(url)
+            return {'status': 'unchanged', 'filename': entry['filename'], 'rows': entry.get('rows'), 'bytes': 0}
+        response.raise_for_status()
+        parser_class = PARSERS[source.parser] if isinstance(source.parser, str) else source.parser
+        parser = parser_class(source.columns)
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')()
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        tmp = filename + '.part'
+        tail = list(extra_columns.values())
+        rows = received = 0
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+
+            def write(records):
+                if parser.header is not None and not f.tell():
+                    writer.writerow(parser.header + list(extra_columns))
+                writer.writerows(record + tail for record in records)
+                return len(records)
+
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                received += len(chunk)
+                rows += write(parser.feed(decoder.decode(chunk)))
+            rows += write(parser.feed(decoder.decode(b'', final=True)) + parser.close())
+        if parser.header is None:
+            os.remove(tmp)
+            raise ValueError(f'Empty response from {url}')
+        os.replace(tmp, filename)
+        if source.schema:
+            schema_version(source.schema, parser.header + list(extra_columns))  # logs a mismatch
+        if cache is not None:
+            cache.put(url, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'filename': filename,
+                'rows': rows,
+            })
+    return {'status': 'downloaded', 'filename': filename, 'rows': rows, 'bytes': received}
+
+
+async def fetch_source(session, source, limit, today, cache=None):
+    """Download one source once a concurrency slot is free, retrying transient failures
+    (connection errors, timeouts and RETRY_STATUS responses) with exponential backoff."""
+    filename = source.filename.format(date=today)
+    extra_columns = {k: str(v).format(date=today) for k, v in source.extra_columns.items()}
+    async with limit:
+        started = time.perf_counter()
+        for attempt in range(RETRIES + 1):
+            try:
+                result = await _download(session, source, filename, extra_columns, cache)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = getattr(e, 'status', None)
+                if attempt == RETRIES or (status is not None and status not in RETRY_STATUS):
+                    raise
+                logger.debug(f"{source.name}: {e}; retrying")
+                await asyncio.sleep(BACKOFF * 2 ** attempt)
+        result['latency'] = time.perf_counter() - started
+    return result
+
+
+async def ingest_async(sources, concurrency=CONCURRENCY, cache=None, today=None):
+    """{name: result} for every source, fetched over one pooled session with at most
+    `concurrency` downloads in flight. A failed source gets status 'failed' and its error."""
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    limit = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=TIMEOUT) as session:
+        results = await asyncio.gather(*(fetch_source(session, s, limit, today, cache) for s in sources), return_exceptions=True)
+    out = {}
+    for source, result in zip(sources, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            logger.warning(f"{source.name} failed: {result}")
+            result = {'status': 'failed', 'filename': None, 'rows': 0, 'bytes': 0, 'latency': 0.0, 'error': str(result) or repr(result)}
+        out[source.name] = result
+    return out
+
+
+def ingest(sources=None, concurrency=None, cache_path=None, today=None, metrics=None, store=True):
+    """Fetch `sources` (FeedSource objects or registry names; default: the whole registry)
+    concurrently, then load each output CSV as result['frame'] and, for sources with a
+    `store`, write it to the snapshot store. Validators are kept in the HTTP cache, so an
+    unchanged feed costs one 304 and yields its previous file."""
+    sources = [REGISTRY[s] if isinstance(s, str) else s for s in (sources or list(REGISTRY.values()))]
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    cache = HttpCache(cache_path or CACHE_PATH)
+    results = asyncio.run(ingest_async(sources, concurrency or CONCURRENCY, cache, today))
+    cache.save()
+    for source in sources:
+        result = results[source.name]
+        if metrics is not None:
+            metrics.record('fetch', result['latency'], feed=source.name, status=result['status'], bytes=result['bytes'])
+        if result['status'] == 'failed':
+            continue
+        try:
+            started = time.perf_counter()
+            result['frame'] = df = pd.read_csv(result['filename'])
+            if metrics is not None:
+                metrics.record('parse', time.perf_counter() - started, feed=source.name, rows=len(df))
+            if store and source.store:
+                started = time.perf_counter()
+                save_snapshot(df, source.store, today, source.partition)
+                if metrics is not None:
+                    metrics.record('write', time.perf_counter() - started, feed=source.name, target='store', rows=len(df))
+        except Exception as e:
+            logger.warning(f"{source.name}: could not load {result['filename']}: {e}")
+            result.update({'status': 'failed', 'error': str(e)})
+    return results
+
+
+if __name__ == '__main__':
+    # python ingest.py [names...] [--concurrency N]  fetch registered feeds (default: all)
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+    import scrape_borris  # noqa: F401 (registers the Boris feeds)
+    parser = argparse.ArgumentParser(description='Fetch registered rankings feeds concurrently.')
+    parser.add_argument('names', nargs='*', help='registered feeds: ' + ', '.join(REGISTRY))
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    results = ingest(args.names or None, args.concurrency)
+    for name, result in results.items():
+        print(f"{name:<20} {result['status']:<10} rows={result['rows'] or 0:<6} {result['latency']:.2f}s {result.get('error', '')}")
+    print(f"\n{len(results)} feeds in {time.perf_counter() - started:.2f}s")
+    sys.exit(0 if all(r['status'] != 'failed' for r in results.values()) else 1)
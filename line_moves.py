@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import logging
+from datetime import datetime
+import pandas as pd
+from checkpoint import CsvCheckpoint
+from players import normalize_name, snapshot_files
+
+logger = logging.getLogger('line_moves')
+
+CHANGELOG_PATH = 'Data/prop_line_changes.csv'
+CHANGE_FIELDS = ['observed_at', 'player_name', 'bet_type', 'matchup', 'line', 'odds', 'change']
+CHANGE_KINDS = ('new', 'moved', 'removed')
+
+_LEADING_LINE = re.compile(r'^\s*([ou]?\d+(?:\.\d+)?)\s+(.+)$', re.I)
+
+
+def legacy_row(row):
+    """The 2025-09-03 layout put the line inside bet_type ('23.5 Rush Yds') and the
+    projection in `line` ('44.1 Over'); move the line back into `line`."""
+    m = _LEADING_LINE.match(row.get('bet_type') or '')
+    if m:
+        row = dict(row, line=m.group(1).lstrip('oOuU'), bet_type=m.group(2).strip())
+    return row
+
+
+def line_key(row):
+    """Identity of a market across scrapes: (player, bet type, matchup), spelling-insensitive."""
+    return (normalize_name(row.get('player_name')), (row.get('bet_type') or '').strip().lower(),
+            (row.get('matchup') or '').strip().upper())
+
+
+class LineTracker:
+    """Change log of prop lines.
+
+    Only the first sighting of a market and later changes of its line/odds are appended to
+    CHANGELOG_PATH, so the file grows with movement, not with the number of scrapes. The
+    current value of every market is rebuilt by folding the log once at startup."""
+
+    def __init__(self, path=CHANGELOG_PATH):
+        self.path = path
+        self.current = {}
+        self.labels = {}
+        self.last_observed = ''
+        self.sink = CsvCheckpoint(path, CHANGE_FIELDS, batch_size=500)
+        for row in self.sink.load():
+            self._apply(row)
+
+    def _apply(self, row):
+        key = line_key(row)
+        if row['change'] == 'removed':
+            self.current.pop(key, None)
+        else:
+            self.current[key] = (row['line'], row['odds'])
+            self.labels[key] = (row['player_name'], row['bet_type'], row['matchup'])
+        self.last_observed = max(self.last_observed, row['observed_at'])
+
+    def _log(self, change, counts):
+        self._apply(change)
+        self.sink.append([change])
+        counts[change['change']] += 1
+
+    def ingest(self, rows, observed_at=None, track_removed=False):
+        """Diff one scrape against the current lines and append what changed as it goes, so
+        `rows` may be a stream. Snapshots older than the newest one already logged are
+        ignored. Returns the number of changes of each kind ({'new': .., 'moved': .., 'removed': ..})."""
+        observed_at = observed_at or datetime.now().isoformat(timespec='seconds')
+        counts = dict.fromkeys(CHANGE_KINDS, 0)
+        if observed_at <= self.last_observed:
+            logger.info(f"Skipping snapshot {observed_at}: log already has {self.last_observed}")
+            return counts
+        seen = set()
+        for row in rows:
+            row = legacy_row(row)
+            key = line_key(row)
+            if not key[0] or not key[1] or key in seen:
+                continue
+            seen.add(key)
+            value = ((row.get('line') or '').strip(), (row.get('odds') or '').strip())
+            before = self.current.get(key)
+            if before == value:
+                continue
+            self._log({'observed_at': observed_at, 'player_name': row.get('player_name', '').strip(),
+                       'bet_type': row.get('bet_type', '').strip(), 'matchup': (row.get('matchup') or '').strip(),
+                       'line': value[0], 'odds': value[1], 'change': 'new' if before is None else 'moved'}, counts)
+        if track_removed:
+            # only meaningful for complete scrapes; a partial run would look like mass removals
+            for key in set(self.current) - seen:
+                player_name, bet_type, matchup = self.labels[key]
+                self._log({'observed_at': observed_at, 'player_name': player_name, 'bet_type': bet_type, 'matchup': matchup,
+                           'line': '', 'odds': '', 'change': 'removed'}, counts)
+        self.last_observed = observed_at
+        self.sink.flush()
+        return counts
+
+    def close(self):
+        self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_snapshot(df, observed_at=None, path=CHANGELOG_PATH):
+    """Log a finished scrape's line changes for the scrapers: failures are logged, never raised.
+    `df` may also be an iterable of row dicts (e.g. a csv.DictReader), read once. Returns the
+    change counts from LineTracker.ingest."""
+    if df is None or (isinstance(df, pd.DataFrame) and not len(df)):
+        return dict.fromkeys(CHANGE_KINDS, 0)
+    rows = df.to_dict('records') if isinstance(df, pd.DataFrame) else df
+    try:
+        with LineTracker(path) as tracker:
+            return tracker.ingest(rows, observed_at)
+    except Exception:
+        logger.exception("Could not update the prop line change log")
+        return dict.fromkeys(CHANGE_KINDS, 0)
+
+
+def backfill(data_dir='Data', path=CHANGELOG_PATH):
+    """Ingest every dated BettingPros snapshot in date order (the _final_ file when both exist)."""
+    chosen = {}
+    for file_path, source, _, date, final in snapshot_files(data_dir):
+        if source == 'bettingpros' and (date not in chosen or final):
+            chosen[date] = file_path
+    total = 0
+    with LineTracker(path) as tracker:
+        for date, file_path in sorted(chosen.items()):
+            df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+            changes = sum(tracker.ingest(df.to_dict('records'), date).values())
+            total += changes
+            logger.info(f"{file_path}: {len(df)} rows, {changes} changes")
+    return total
+
+
+def load_changes(path=CHANGELOG_PATH):
+    """The change log with numeric line/odds and parsed timestamps."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df['observed_at'] = pd.to_datetime(df['observed_at'], format='ISO8601')  # backfilled dates and scrape timestamps
+    df['line'] = pd.to_numeric(df['line'], errors='coerce')
+    df['odds'] = pd.to_numeric(df['odds'], errors='coerce')
+    return df
+
+
+def line_history(player, bet_type=None, path=CHANGELOG_PATH, changes=None):
+    """Time series of one player's lines: one row per change, indexed by observed_at."""
+    changes = load_changes(path) if changes is None else changes
+    names = changes['player_name'].map(normalize_name)
+    mask = names == normalize_name(player)
+    if bet_type:
+        mask &= changes['bet_type'].str.lower() == bet_type.lower()
+    return changes[mask].set_index('observed_at').sort_index()
+
+
+def movers(path=CHANGELOG_PATH, changes=None, since=None):
+    """Markets whose line moved, with first and latest line and the net move, biggest first."""
+    changes = load_changes(path) if changes is None else changes
+    if since:
+        changes = changes[changes['observed_at'] >= pd.Timestamp(since)]
+    keys = ['player_name', 'bet_type', 'matchup']
+    moved = changes[changes['change'] == 'moved'][keys].drop_duplicates()
+    series = changes.merge(moved, on=keys).sort_values('observed_at')
+    summary = series.groupby(keys).agg(first_line=('line', 'first'), last_line=('line', 'last'),
+                                       moves=('change', lambda c: int((c == 'moved').sum())),
+                                       last_seen=('observed_at', 'last')).reset_index()
+    summary['net_move'] = summary['last_line'] - summary['first_line']
+    return summary.reindex(summary['net_move'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    # python line_moves.py backfill          build the change log from Data/bettingpros_prop_bets_*.csv
+    # python line_moves.py history "Name"    one player's line time series
+    # (the log is not committed; history and movers build it first when it is missing)
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'movers'
+    if command == 'backfill':
+        print(f"{backfill()} changes logged to {CHANGELOG_PATH}")
+        sys.exit()
+    if not os.path.exists(CHANGELOG_PATH):
+        backfill()
+    if command == 'history':
+        print(line_history(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None).to_string())
+    else:
+        print(movers().head(20).to_string(index=False))
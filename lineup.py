@@ -0,0 +1,210 @@
+import sys
+import time
+import heapq
+import argparse
+import numpy as np
+import pandas as pd
+from draft_assistant import FLEX_POSITIONS, ROSTER_SLOTS
+from draft_sim import snake_order
+from loader import latest_snapshots
+from players import join_sources, load_index, normalize_position
+from prop_projections import projections
+
+# Positions each slot accepts; any other slot name only takes its own position
+SLOT_POSITIONS = {'FLEX': FLEX_POSITIONS, 'SUPERFLEX': ('QB',) + FLEX_POSITIONS}
+# A prop projection is used only when it prices the position's main yardage market; without
+# it (e.g. a QB with only a rushing line) the Boris-based estimate is closer
+CORE_STATS = {'QB': 'pass_yds', 'RB': 'rush_yds', 'WR': 'rec_yds', 'TE': 'rec_yds'}
+
+
+def expand_slots(slot_rules=None):
+    """[(slot name, accepted positions)] with one entry per starting spot, most restrictive
+    first so the search fills the slots with the fewest choices before the flexible ones."""
+    slots = []
+    for slot, count in (slot_rules or ROSTER_SLOTS).items():
+        accepted = SLOT_POSITIONS.get(slot, (normalize_position(slot),))
+        slots.extend([(slot, accepted)] * count)
+    return sorted(slots, key=lambda s: len(s[1]))
+
+
+def solve(positions, points, slots, k=1):
+    """Exact top-`k` lineups by branch and bound.
+
+    Slots are filled in order; each slot tries its eligible players best first, and a branch
+    is cut as soon as its total plus the best remaining score of every open slot (ignoring
+    conflicts, so never an underestimate) cannot beat the k-th best lineup found so far.
+    Identical slots take players in candidate order, and lineups with the same starters in
+    different slots (an RB at FLEX vs. at RB) count once. A slot with no eligible player
+    left stays empty. Returns [(total, [player index or None per slot])], best first."""
+    candidates = []
+    for _, accepted in slots:
+        eligible = [i for i, position in enumerate(positions) if position in accepted]
+        candidates.append(sorted(eligible, key=lambda i: -points[i]))
+    best = [max((points[i] for i in c), default=0.0) for c in candidates]
+    suffix = np.r_[np.cumsum(best[::-1])[::-1], 0.0]
+    same_as_previous = [s > 0 and slots[s][1] == slots[s - 1][1] for s in range(len(slots))]
+
+    heap = []  # k best so far: (total, tie, picks); heap[0] is the k-th best
+    seen = set()
+    chosen = [None] * len(slots)
+    used = set()
+    counter = [0]
+
+    def threshold():
+        return heap[0][0] if len(heap) >= k else -np.inf
+
+    def search(s, total, start):
+        if s == len(slots):
+            starters = frozenset(i for i in chosen if i is not None)
+            if starters in seen:
+                return
+            counter[0] += 1
+            item = (total, -counter[0], list(chosen))
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            else:
+                seen.discard(frozenset(i for i in heap[0][2] if i is not None))
+                heapq.heapreplace(heap, item)
+            seen.add(starters)
+            return
+        options = candidates[s]
+        first = start if same_as_previous[s] else 0
+        for j in range(first, len(options)):
+            i = options[j]
+            if i in used:
+                continue
+            if total + points[i] + suffix[s + 1] <= threshold():
+                break  # options are sorted, so no later one can do better
+            chosen[s] = i
+            used.add(i)
+            search(s + 1, total + points[i], j + 1)
+            used.discard(i)
+            chosen[s] = None
+        if all(i in used for i in options) and total + suffix[s + 1] > threshold():
+            search(s + 1, total, len(options))
+
+    search(0, 0.0, 0)
+    return [(total, picks) for total, _, picks in sorted(heap, reverse=True)]
+
+
+def optimize(roster, slot_rules=None, k=1):
+    """Best `k` lineups for one roster (DataFrame with player_name, position and points).
+    Each lineup is {'points', 'starters': [{'slot', 'player_name', 'position', 'points'}], 'bench'}."""
+    roster = roster.reset_index(drop=True)
+    names = roster['player_name'].astype(str).tolist()
+    positions = [normalize_position(p) for p in roster['position'].fillna('').astype(str)]
+    points = roster['points'].fillna(0.0).astype(float).tolist()
+    slots = expand_slots(slot_rules)
+    lineups = []
+    for total, picks in solve(positions, points, slots, k):
+        starters = [{'slot': slot, 'player_name': names[i] if i is not None else None, 'position': positions[i] if i is not None else None,
+                     'points': round(points[i], 2) if i is not None else 0.0}
+                    for (slot, _), i in zip(slots, picks)]
+        started = set(i for i in picks if i is not None)
+        lineups.append({'points': round(total, 2), 'starters': starters,
+                        'bench': [names[i] for i in range(len(names)) if i not in started]})
+    return lineups
+
+
+def _resolve(index, name):
+    """Player ID for a name; without a position, fuzzy matching tries each one."""
+    pid = index.resolve(name)
+    for position in ([] if pid else ('QB', 'RB', 'WR', 'TE', 'K', 'DST')):
+        pid = index.resolve(name, position)
+        if pid:
+            break
+    return pid
+
+
+def optimize_many(rosters, board, index, slot_rules=None, k=1):
+    """optimize() for every roster in {team: [player names]}, scored from `board`
+    (projected_points output). Unknown names are benched with zero points."""
+    by_id = board.drop_duplicates('player_id').set_index('player_id')
+    results = {}
+    for team, names in rosters.items():
+        ids = [_resolve(index, name) for name in names]
+        rows = [{'player_name': by_id.at[pid, 'player_name'], 'position': by_id.at[pid, 'position'], 'points': by_id.at[pid, 'points']}
+                if pid in by_id.index else {'player_name': name, 'position': '', 'points': 0.0}
+                for name, pid in zip(names, ids)]
+        results[team] = optimize(pd.DataFrame(rows, columns=['player_name', 'position', 'points']), slot_rules, k)
+    return results
+
+
+def projected_points(scoring_format='ppr', data_dir='Data'):
+    """Expected points for every player in the newest snapshots: the prop-implied projection
+    where BettingPros prices the player, otherwise a per-position fit of those projections
+    on Boris avg rank (log scale). Positions without enough priced players (K, DST) use the
+    fit over all positions, which keeps their Boris order."""
+    espn, boris, props = latest_snapshots(data_dir)
+    index = load_index(data_dir)
+    joined = join_sources(espn, boris, props, index)
+    board = joined[joined['scoring_format'] == scoring_format].copy()
+    board['position'] = board['position'].fillna('').map(normalize_position)
+    column = f'points_{scoring_format}'
+    if props is not None:
+        projected = projections(props)
+        projected['player_id'] = index.ids(projected['player_name'])
+        projected = projected.dropna(subset=['player_id']).drop_duplicates('player_id')
+        core = sorted(c for c in set(CORE_STATS.values()) if c in projected.columns)
+        board = board.merge(projected[['player_id', column] + core], on='player_id', how='left')
+        priced = pd.Series(False, index=board.index)
+        for position, stat in CORE_STATS.items():
+            if stat in core:
+                priced |= (board['position'] == position) & board[stat].notna()
+        board[column] = board[column].where(priced)
+    else:
+        board[column] = np.nan
+    x = np.log(board['avg_rank'].fillna(board['rank']).to_numpy(dtype=float))
+    y = board[column].to_numpy(dtype=float)
+    known = ~np.isnan(x) & ~np.isnan(y)
+    fitted = np.full(len(board), np.nan)
+    overall = np.polyfit(x[known], y[known], 1) if known.sum() >= 3 else np.array([-1.0, 10.0])
+    for position in board['position'].unique():
+        mask = (board['position'] == position).to_numpy()
+        coef = np.polyfit(x[mask & known], y[mask & known], 1) if (mask & known).sum() >= 3 else overall
+        fitted[mask] = np.polyval(coef, x[mask])
+    board['points'] = np.where(~np.isnan(y), y, np.maximum(fitted, 0.0))
+    board['source'] = np.where(~np.isnan(y), 'props', 'boris')
+    return board[['player_id', 'player_name', 'position', 'rank', 'points', 'source']].dropna(subset=['points']).reset_index(drop=True)
+
+
+def league_rosters(board, teams, rounds):
+    """Demo rosters: a snake draft in Boris rank order."""
+    order = board.sort_values('rank', kind='stable')['player_name'].tolist()
+    rosters = {f'team_{t + 1}': [] for t in range(teams)}
+    for pick, team in enumerate(snake_order(teams, rounds)[:len(order)]):
+        rosters[f'team_{int(team) + 1}'].append(order[pick])
+    return rosters
+
+
+def main(argv=None):
+    # python lineup.py --roster "Josh Allen,Bijan Robinson,..." --k 3   best lineups for one roster
+    # python lineup.py --league 12                                       batch over a demo league
+    parser = argparse.ArgumentParser(description='Start/sit optimizer over projected points.')
+    parser.add_argument('--format', default='ppr', choices=['standard', 'ppr', 'half_ppr'])
+    parser.add_argument('--roster', help='comma-separated player names')
+    parser.add_argument('--league', type=int, default=12, help='teams in the demo league when no roster is given')
+    parser.add_argument('--rounds', type=int, default=15)
+    parser.add_argument('--k', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    board = projected_points(args.format)
+    index = load_index()
+    if args.roster:
+        rosters = {'roster': [n.strip() for n in args.roster.split(',') if n.strip()]}
+    else:
+        rosters = league_rosters(board, args.league, args.rounds)
+    started = time.perf_counter()
+    results = optimize_many(rosters, board, index, k=args.k)
+    elapsed = time.perf_counter() - started
+    for team, lineups in list(results.items())[:2]:
+        print(f"{team}:")
+        for rank, lineup in enumerate(lineups, 1):
+            starters = ', '.join(f"{s['slot']} {s['player_name']} ({s['points']})" for s in lineup['starters'])
+            print(f"  #{rank} {lineup['points']:.2f}: {starters}")
+    print(f"\n{len(rosters)} rosters, top {args.k} lineups each: {elapsed * 1000:.1f}ms ({elapsed * 1000 / len(rosters):.2f}ms per roster)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+import logging
+from functools import lru_cache
+import pandas as pd
+from players import repair_espn_rows, snapshot_files
+from prop_normalize import normalize_frame
+from store import parse_csv_name
+
+logger = logging.getLogger('loader')
+
+CACHE_SIZE = int(os.getenv('LOADER_CACHE_SIZE', '64'))
+
+# Column dtypes per (source, schema version). Versions are told apart by their header; a file
+# whose header matches none is read with the newest version of its source.
+SCHEMAS = {
+    ('espn', 1): {
+        'rank': 'Int32', 'player_name': 'string', 'team': 'category', 'position': 'category',
+        'adp': 'float64', 'seven_day_change': 'float64', 'date_scraped': 'string',
+    },
+    ('boris', 1): {
+        'Rank': 'Int32', 'Player.Name': 'string', 'Tier': 'Int16', 'Position': 'category',
+        'Best.Rank': 'Int32', 'Worst.Rank': 'Int32', 'Avg.Rank': 'float64', 'Std.Dev': 'float64',
+        'scoring_format': 'category', 'date_scraped': 'string',
+    },
+    # checkpoint layout; 2025-09-03 has the same header with the line inside bet_type,
+    # which normalize_frame detects per row
+    ('bettingpros', 1): {
+        'player_name': 'string', 'position': 'category', 'matchup': 'category', 'bet_type': 'category',
+        'line': 'string', 'odds': 'string', 'sportsbook': 'category', 'date_scraped': 'string',
+    },
+    # _final_ files: cleaned, no sportsbook column
+    ('bettingpros', 2): {
+        'player_name': 'string', 'position': 'category', 'matchup': 'category', 'bet_type': 'category',
+        'line': 'string', 'odds': 'string', 'date_scraped': 'string',
+    },
+}
+
+# Typed BettingPros columns (prop_normalize.normalize_frame output plus the file's metadata)
+PROP_DTYPES = {
+    'player_name': 'string', 'position': 'category', 'matchup': 'category', 'bet_type': 'category',
+    'stat': 'category', 'line': 'float64', 'side': 'category', 'projection': 'float64', 'edge': 'float64',
+    'odds': 'Int64', 'valid': 'bool', 'sportsbook': 'category', 'date_scraped': 'string',
+}
+
+NUMERIC = ('Int16', 'Int32', 'Int64', 'float32', 'float64')
+
+
+def schema_version(source, columns):
+    """Schema version whose columns match the header exactly, else the newest for the source."""
+    columns = list(columns)
+    versions = sorted(v for s, v in SCHEMAS if s == source)
+    if not versions:
+        raise ValueError(f"No schema for source {source!r}")
+    for version in versions:
+        if list(SCHEMAS[(source, version)]) == columns:
+            return version
+    logger.warning(f"{source} columns {columns} match no schema; reading as version {versions[-1]}")
+    return versions[-1]
+
+
+def coerce(df, source, version=None):
+    """Apply a source schema to a frame of strings (a CSV read as text, or rows a scraper just
+    built). Unparseable numbers become NA; columns outside the schema are left as they are."""
+    version = version or schema_version(source, df.columns)
+    dtypes = SCHEMAS[(source, version)]
+    df = df.copy()
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        if dtype in NUMERIC:
+            values = pd.to_numeric(df[column], errors='coerce')
+            if dtype.startswith('Int'):
+                values = values.round()
+            df[column] = values.astype(dtype)
+        else:
+            values = df[column].astype('string').str.strip()
+            df[column] = values.mask(values == '').astype(dtype)
+    if source == 'bettingpros':
+        df = typed_props(df)
+    return df
+
+
+def typed_props(df):
+    """BettingPros rows with numeric line/edge/odds (see prop_normalize.normalize_frame)."""
+    typed = normalize_frame(df.astype(object))
+    for column in ('sportsbook', 'date_scraped'):
+        if column in df.columns:
+            typed[column] = df[column]
+    return typed.astype({c: t for c, t in PROP_DTYPES.items() if c in typed.columns})
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load(path, mtime_ns, size):
+    parsed = parse_csv_name(path)
+    if not parsed:
+        raise ValueError(f"Not a known snapshot file name: {path}")
+    source = parsed[0]
+    columns = pd.read_csv(path, nrows=0).columns
+    version = schema_version(source, columns)
+    dtypes = SCHEMAS[(source, version)]
+    text = {c: 'string' for c in columns}
+    # everything is read as text and typed by coerce(), which tolerates junk cells the scrapers
+    # occasionally write (read_csv with numeric dtypes would fail the whole file)
+    df = pd.read_csv(path, dtype=text, keep_default_na=False, na_values=[''])
+    if source == 'espn':
+        df = repair_espn_rows(df)
+    df = coerce(df, source, version)
+    logger.debug(f"Loaded {path}: {len(df)} rows, {source} schema v{version} ({len(dtypes)} columns)")
+    return df
+
+
+def load(path):
+    """Typed DataFrame for one Data/ snapshot CSV. Frames are cached by (path, mtime, size),
+    so loading an unchanged file again is a dict hit plus a copy."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _load(path, stat.st_mtime_ns, stat.st_size).copy()
+
+
+def cache_info():
+    return _load.cache_info()
+
+
+def clear_cache():
+    _load.cache_clear()
+
+
+def load_source(source, data_dir='Data', scoring_format=None, start=None, end=None, final=None):
+    """Every dated snapshot of a source concatenated, oldest first. `final` picks the BettingPros
+    _final_ files (True), the checkpoints (False) or both (None)."""
+    frames = []
+    for path, file_source, file_format, date, is_final in sorted(snapshot_files(data_dir), key=lambda f: f[3]):
+        if file_source != source or (scoring_format and file_format != scoring_format):
+            continue
+        if (start and date < start) or (end and date > end) or (final is not None and is_final != final):
+            continue
+        frames.append(load(path))
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    # concat falls back to object when the files' category sets differ
+    categorical = [c for c, t in frames[0].dtypes.items() if isinstance(t, pd.CategoricalDtype)]
+    return df.astype({c: 'category' for c in categorical})
+
+
+def latest_snapshots(data_dir='Data'):
+    """Newest ESPN frame, newest Boris frame per scoring format (concatenated, with a
+    `scoring_format` key) and newest BettingPros frame (the _final_ file when present)."""
+    latest = {}
+    for path, source, scoring_format, date, final in snapshot_files(data_dir):
+        key = (source, scoring_format)
+        if key not in latest or (date, final) > latest[key][:2]:
+            latest[key] = (date, final, path)
+    espn = props = None
+    boris = []
+    for (source, scoring_format), (_, _, path) in sorted(latest.items()):
+        df = load(path)
+        if source == 'espn':
+            espn = df
+        elif source == 'bettingpros':
+            props = df
+        else:
+            boris.append(df.assign(scoring_format=scoring_format))
+    return espn, (pd.concat(boris, ignore_index=True) if boris else None), props
+
+
+if __name__ == '__main__':
+    # python loader.py [repeat]  load every Data/ snapshot cold, then `repeat` more times from the cache
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    paths = sorted(p[0] for p in snapshot_files())
+    started = time.perf_counter()
+    frames = [load(p) for p in paths]
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for p in paths:
+            load(p)
+    warm = (time.perf_counter() - started) / repeat
+    for path, df in zip(paths, frames):
+        print(f"{os.path.basename(path):<48} {len(df):>5} rows  {df.memory_usage(deep=True).sum() / 1e3:>6.0f}KB")
+    print(f"\n{len(paths)} files: {cold * 1000:.0f}ms cold, {warm * 1000:.2f}ms cached ({cache_info()})")
@@ -0,0 +1,77 @@
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlparse
+import numpy as np
+from draft_assistant import load_state, make_server
+from draft_sim import snake_order
+
+
+def post(conn, path, payload):
+    body = json.dumps(payload)
+    conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, data
+
+
+def run_draft(conn, names, slot, teams, rounds):
+    """POST one full snake draft (players taken in ADP order, ours flagged) and return the
+    latency of every pick in milliseconds."""
+    post(conn, '/reset', {})
+    latencies = []
+    for pick, team in enumerate(snake_order(teams, rounds)[:len(names)]):
+        started = time.perf_counter()
+        status, data = post(conn, '/pick', {'player': names[pick], 'mine': int(team) == slot - 1})
+        latencies.append((time.perf_counter() - started) * 1000)
+        if status != 200:
+            raise RuntimeError(f"pick {pick + 1} ({names[pick]}) -> {status} {data[:200]!r}")
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay full drafts against the draft assistant and report per-pick latency.')
+    parser.add_argument('--url', help='running assistant, e.g. http://127.0.0.1:8765 (default: start one in-process)')
+    parser.add_argument('--format', default='ppr', choices=['standard', 'ppr', 'half_ppr'])
+    parser.add_argument('--drafts', type=int, default=20)
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--rounds', type=int, default=15)
+    parser.add_argument('--slot', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    state = load_state(args.format)
+    print(f"Loaded {len(state.players)} players in {(time.perf_counter() - started) * 1000:.0f}ms")
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = make_server(state, port=0)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # everyone drafts in ADP order, so every pick is a valid, still-available player
+    names = [p['player_id'] for p in sorted(state.players.values(), key=lambda p: p['adp'] if p['adp'] is not None else float('inf'))]
+    conn = http.client.HTTPConnection(host, port)
+    latencies = []
+    try:
+        for _ in range(args.drafts):
+            latencies.extend(run_draft(conn, names, args.slot, args.teams, args.rounds))
+    finally:
+        conn.close()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    lat = np.array(latencies)
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    print(f"{len(lat)} pick events over {args.drafts} drafts: p50={p50:.2f}ms p95={p95:.2f}ms p99={p99:.2f}ms max={lat.max():.2f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
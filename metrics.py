@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger('metrics')
+
+METRICS_FILE = 'Data/metrics.jsonl'
+# Prometheus histogram buckets for span durations, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where `resource` is unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class Registry:
+    """Process-wide totals behind the optional Prometheus endpoint: a duration histogram per
+    (source, span) and a counter per (source, name)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, source, span, seconds):
+        with self.lock:
+            h = self.histograms.setdefault((source, span), {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    h['buckets'][i] += 1
+            h['sum'] += seconds
+            h['count'] += 1
+
+    def inc(self, source, name, n=1):
+        with self.lock:
+            self.counters[(source, name)] = self.counters.get((source, name), 0) + n
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = ['# TYPE scrape_span_seconds histogram']
+        with self.lock:
+            for (source, span), h in sorted(self.histograms.items()):
+                labels = f'source="{source}",span="{span}"'
+                for bound, count in zip(BUCKETS, h['buckets']):
+                    lines.append(f'scrape_span_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'scrape_span_seconds_bucket{{{labels},le="+Inf"}} {h["count"]}')
+                lines.append(f'scrape_span_seconds_sum{{{labels}}} {h["sum"]:.6f}')
+                lines.append(f'scrape_span_seconds_count{{{labels}}} {h["count"]}')
+            lines.append('# TYPE scrape_events_total counter')
+            for (source, name), value in sorted(self.counters.items()):
+                lines.append(f'scrape_events_total{{source="{source}",name="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+_server = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        logger.debug(fmt % args)
+
+
+def serve_from_env():
+    """Start the /metrics endpoint once per process if METRICS_PORT is set."""
+    global _server
+    port = os.getenv('METRICS_PORT')
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((os.getenv('METRICS_HOST', '127.0.0.1'), int(port)), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+            logger.info(f"Serving Prometheus metrics on http://{_server.server_address[0]}:{_server.server_port}/metrics")
+    return _server
+
+
+class RunMetrics:
+    """Spans and counters for one scraper run, appended to METRICS_FILE as JSON lines
+    (one object per span, one summary object with the counters when the run closes) and
+    fed to the process-wide Prometheus registry. METRICS_FILE= (empty) disables the file."""
+
+    def __init__(self, source, path=None):
+        self.source = source
+        self.run_id = uuid.uuid4().hex[:12]
+        self.path = os.getenv('METRICS_FILE', METRICS_FILE) if path is None else path
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self._fh = None
+        self._unwatch = None
+        serve_from_env()
+
+    def _emit(self, record):
+        if not self.path:
+            return
+        line = json.dumps({'run': self.run_id, 'source': self.source, **record}, default=str)
+        with self.lock:
+            try:
+                if self._fh is None:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    self._fh = open(self.path, 'a', encoding='utf-8')
+                self._fh.write(line + '\n')
+                self._fh.flush()
+            except OSError:
+                logger.debug(f"Could not write metrics to {self.path}", exc_info=True)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time a block. Attributes may be added to the yielded dict inside the block."""
+        started_at = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, started_at, error=error, **attrs)
+
+    def record(self, name, seconds, started_at=None, **attrs):
+        """Log a span measured elsewhere."""
+        REGISTRY.observe(self.source, name, seconds)
+        attrs = {k: v for k, v in attrs.items() if v is not None}
+        self._emit({'type': 'span', 'name': name, 'ts': started_at or time.time() - seconds,
+                    'duration_ms': round(seconds * 1000, 3), **attrs})
+
+    def count(self, name, n=1):
+        if not n:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        REGISTRY.inc(self.source, name, n)
+
+    def watch_driver(self, driver):
+        """Count every WebDriver command (driver and element calls all go through
+        driver.execute) as `webdriver_calls` until close()."""
+        original = getattr(driver, 'execute', None)
+        if original is None or self._unwatch is not None:
+            return driver
+
+        def execute(command, params=None):
+            self.count('webdriver_calls')
+            return original(command, params)
+
+        patched_instance = 'execute' in getattr(driver, '__dict__', {})
+        driver.execute = execute
+
+        def unwatch():
+            if patched_instance:
+                driver.execute = original
+            else:
+                del driver.execute
+
+        self._unwatch = unwatch
+        return driver
+
+    def close(self, **attrs):
+        """Stop counting driver calls and write the run summary (total time and counters)."""
+        if self._unwatch is not None:
+            self._unwatch()
+            self._unwatch = None
+        self._emit({'type': 'summary', 'ts': time.time(), 'duration_ms': round((time.perf_counter() - self.started) * 1000, 3),
+                    'counters': dict(self.counters), **attrs})
+        with self.lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,289 @@
+import os
+import re
+import sys
+import json
+import glob
+import difflib
+import unicodedata
+from functools import lru_cache
+import pandas as pd
+from snapshot_store import SnapshotStore
+from store import parse_csv_name
+
+INDEX_PATH = 'Data/.player_index.json'
+
+SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+
+# Short/alternate first names that are not simple prefixes of the full one (prefixes such
+# as Ken/Kenneth or Cam/Cameron are matched by fuzzy_match)
+FIRST_NAMES = {
+    'mike': 'michael', 'gabe': 'gabriel', 'nate': 'nathaniel', 'bob': 'robert', 'bobby': 'robert',
+    'rob': 'robert', 'bill': 'william', 'jeff': 'jeffery', 'tony': 'anthony', 'zach': 'zachary',
+    'zack': 'zachary', 'jake': 'jacob',
+}
+
+# Nicknames that stand for one player's first name only ("Tank" is Nathaniel Dell but
+# Cornelius Bigsby), keyed by the whole name as normalize_name sees it
+PLAYER_ALIASES = {
+    'tank dell': 'nathaniel dell', 'hollywood brown': 'marquise brown', 'chig okonkwo': 'chigoziem okonkwo',
+}
+
+# Bump when normalize_name's rules change, so a saved index keyed by the old rules is rebuilt
+NAME_KEY_VERSION = 2
+
+# Team nickname / city / abbreviation -> ESPN team abbreviation, for matching defenses
+# ("Steelers D/ST" at ESPN, "Pittsburgh Steelers" at Boris Chen)
+TEAMS = {
+    'cardinals': 'ari', 'falcons': 'atl', 'ravens': 'bal', 'bills': 'buf', 'panthers': 'car', 'bears': 'chi',
+    'bengals': 'cin', 'browns': 'cle', 'cowboys': 'dal', 'broncos': 'den', 'lions': 'det', 'packers': 'gb',
+    'texans': 'hou', 'colts': 'ind', 'jaguars': 'jax', 'chiefs': 'kc', 'raiders': 'lv', 'chargers': 'lac',
+    'rams': 'lar', 'dolphins': 'mia', 'vikings': 'min', 'patriots': 'ne', 'saints': 'no', 'giants': 'nyg',
+    'jets': 'nyj', 'eagles': 'phi', 'steelers': 'pit', '49ers': 'sf', 'seahawks': 'sea', 'buccaneers': 'tb',
+    'titans': 'ten', 'commanders': 'wsh',
+}
+TEAM_ABBRS = set(TEAMS.values()) | {'fa', 'was', 'jac', 'lvr', 'la'}
+
+# ESPN sometimes renders the injury tag before the team, shifting team -> position
+INJURY_TAGS = {'Q', 'O', 'D', 'IR', 'SSPD', 'PUP', 'NA', 'DTD', 'P'}
+
+POSITIONS = {'D/ST': 'DST', 'DEF': 'DST', 'DST': 'DST', 'PK': 'K'}
+
+_PUNCT = re.compile(r"[.'’`]")
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+@lru_cache(maxsize=None)
+def normalize_name(name):
+    """Comparison key for a player name: ASCII, lower case, no punctuation, no generational
+    suffix, first-name and per-player aliases expanded. Defenses become 'dst <team>'."""
+    text = unicodedata.normalize('NFKD', str(name or '')).encode('ascii', 'ignore').decode('ascii').lower()
+    text = _PUNCT.sub('', text)
+    tokens = [t for t in _SEPARATORS.split(text) if t]
+    while tokens and tokens[-1] in ('d', 'st', 'dst', 'def', 'defense'):
+        tokens.pop()
+    if tokens and tokens[-1] in TEAMS:
+        return f'dst {TEAMS[tokens[-1]]}'
+    while len(tokens) > 2 and tokens[-1] in SUFFIXES:
+        tokens.pop()
+    key = ' '.join(tokens)
+    if key in PLAYER_ALIASES:
+        return PLAYER_ALIASES[key]
+    if tokens and tokens[0] in FIRST_NAMES:
+        tokens[0] = FIRST_NAMES[tokens[0]]
+    return ' '.join(tokens)
+
+
+def normalize_position(position):
+    position = str(position or '').strip().upper().rstrip(',')
+    return POSITIONS.get(position, position)
+
+
+def player_id(key):
+    """Stable ID for a normalized name key."""
+    return key.replace(' ', '-')
+
+
+def repair_espn_rows(df):
+    """Undo ESPN rows where the injury tag landed in `team` and the team in `position`
+    ('Justin Jefferson,Q,Min'). The position is lost in those rows and left empty."""
+    df = df.copy()
+    # plain objects, so loader's categoricals can take values from the other column
+    df['team'] = df['team'].astype(object)
+    df['position'] = df['position'].astype(object)
+    team = df['team'].astype(str).str.strip()
+    shifted = team.isin(INJURY_TAGS) & df['position'].astype(str).str.lower().isin(TEAM_ABBRS)
+    df.loc[shifted, 'team'] = df.loc[shifted, 'position']
+    df.loc[shifted, 'position'] = ''
+    df['position'] = df['position'].fillna('').astype(str).str.rstrip(',')
+    return df
+
+
+class PlayerIndex:
+    """Canonical player IDs and every name key seen for them.
+
+    `aliases` maps normalized name -> ID, so lookups are a dict hit once built. Names not
+    seen before are matched by fuzzy_match when added and the result is stored as an alias,
+    so each spelling is resolved once."""
+
+    def __init__(self, players=None, aliases=None, signature=None):
+        self.players = players or {}
+        self.aliases = aliases or {}
+        self.signature = signature
+        self._by_last = {}
+        for key, pid in self.aliases.items():
+            self._by_last.setdefault(key.rsplit(' ', 1)[-1], set()).add(key)
+
+    def __len__(self):
+        return len(self.players)
+
+    def lookup(self, name):
+        """ID for a name, or None. No fuzzy matching."""
+        return self.aliases.get(normalize_name(name))
+
+    def fuzzy_match(self, key, position=''):
+        """Existing alias key for `key`, or None. Only keys with the same last name and the
+        same (known) position are considered; the first names must be a prefix of one
+        another (Ken/Kenneth) or a close difflib match (typos, transliterations)."""
+        if key.startswith('dst ') or not position or ' ' not in key:
+            return None
+        first, last = key.split(' ', 1)
+        for cand in self._by_last.get(key.rsplit(' ', 1)[-1], ()):
+            cand_first, cand_last = cand.split(' ', 1) if ' ' in cand else (cand, '')
+            if cand_last != last or self.players[self.aliases[cand]].get('position') != position:
+                continue
+            if min(len(first), len(cand_first)) >= 3 and (cand_first.startswith(first) or first.startswith(cand_first)):
+                return cand
+            if difflib.SequenceMatcher(None, first, cand_first).ratio() >= 0.85:
+                return cand
+        return None
+
+    def resolve(self, name, position=''):
+        """lookup() with the fuzzy fallback; a fuzzy hit is cached as a new alias."""
+        key = normalize_name(name)
+        pid = self.aliases.get(key)
+        if pid is None and key:
+            match = self.fuzzy_match(key, normalize_position(position))
+            if match:
+                pid = self.aliases[key] = self.aliases[match]
+                self._by_last.setdefault(key.rsplit(' ', 1)[-1], set()).add(key)
+        return pid
+
+    def add(self, name, position='', team='', source=None):
+        """Resolve (or create) the ID for a name, recording the spelling as an alias."""
+        key = normalize_name(name)
+        if not key:
+            return None
+        position = normalize_position(position)
+        pid = self.resolve(name, position)
+        if pid is None:
+            pid = self.aliases[key] = player_id(key)
+            self._by_last.setdefault(key.rsplit(' ', 1)[-1], set()).add(key)
+        player = self.players.setdefault(pid, {'name': str(name).strip(), 'position': '', 'team': '', 'sources': []})
+        if position and not player['position']:
+            player['position'] = position
+        if team and not player['team']:
+            player['team'] = str(team).strip()
+        if source and source not in player['sources']:
+            player['sources'].append(source)
+        return pid
+
+    def ids(self, names):
+        """Vectorized lookup: IDs for a Series of names (None where unknown). Each distinct
+        name is normalized once."""
+        names = pd.Series(names)
+        uniques = names.dropna().unique()
+        mapping = {n: self.aliases.get(normalize_name(n)) for n in uniques}
+        return names.map(mapping)
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'signature': self.signature, 'players': self.players, 'aliases': self.aliases}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('players'), data.get('aliases'), data.get('signature'))
+
+
+def restore_snapshots(data_dir='Data'):
+    """Write every file in the snapshot store that is missing from `data_dir`. The workflow
+    commits only the store, so a fresh checkout has none of the newer dated CSVs until
+    they are restored. Returns the restored paths."""
+    store = SnapshotStore(os.getenv('SNAPSHOT_DIR') or os.path.join(data_dir, 'snapshots'))
+    return [store.restore(name, data_dir) for name in sorted(store.index)
+            if not os.path.exists(os.path.join(data_dir, name))]
+
+
+def snapshot_files(data_dir='Data'):
+    """Dated scrape CSVs in `data_dir` as (path, source, scoring_format, date, is_final),
+    including any only in the snapshot store (restored first)."""
+    restore_snapshots(data_dir)
+    files = []
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.csv'))):
+        parsed = parse_csv_name(path)
+        if parsed:
+            files.append((path, *parsed))
+    return files
+
+
+def files_signature(files):
+    return [['name-keys', NAME_KEY_VERSION]] + [[os.path.basename(f[0]), os.path.getmtime(f[0])] for f in files]
+
+
+def build_index(data_dir='Data'):
+    """Index every player in every snapshot. Boris Chen goes first (cleanest names and
+    positions), then ESPN, then BettingPros, so variant spellings attach to those IDs."""
+    files = snapshot_files(data_dir)
+    order = {'boris': 0, 'espn': 1, 'bettingpros': 2}
+    index = PlayerIndex(signature=files_signature(files))
+    for path, source, _, _, _ in sorted(files, key=lambda f: (order[f[1]], f[3])):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        if source == 'boris':
+            rows = zip(df['Player.Name'], df['Position'], [''] * len(df))
+        elif source == 'espn':
+            df = repair_espn_rows(df)
+            rows = zip(df['player_name'], df['position'], df['team'])
+        else:
+            rows = zip(df['player_name'], df['position'], [''] * len(df))
+        for name, position, team in dict.fromkeys(rows):
+            index.add(name, position, team, source)
+    return index
+
+
+def load_index(data_dir='Data', path=INDEX_PATH, rebuild=False):
+    """The persisted index if the snapshots it was built from are unchanged, else rebuild and save."""
+    signature = files_signature(snapshot_files(data_dir))
+    if not rebuild and os.path.exists(path):
+        try:
+            index = PlayerIndex.load(path)
+            if index.signature == signature:
+                return index
+        except (OSError, ValueError):
+            pass
+    index = build_index(data_dir)
+    index.save(path)
+    return index
+
+
+def join_sources(espn, boris, props, index):
+    """One row per (player_id, scoring_format): ESPN ADP, Boris rank/tier for that format
+    and each prop market's line as a `line_<bet type>` column."""
+    espn = repair_espn_rows(espn)
+    espn = espn.assign(player_id=index.ids(espn['player_name']))
+    espn = espn.dropna(subset=['player_id']).drop_duplicates('player_id')[['player_id', 'player_name', 'team', 'adp', 'seven_day_change']]
+
+    boris = boris.rename(columns={'Player.Name': 'boris_name', 'Rank': 'rank', 'Tier': 'tier', 'Position': 'position',
+                                  'Best.Rank': 'best_rank', 'Worst.Rank': 'worst_rank', 'Avg.Rank': 'avg_rank', 'Std.Dev': 'std_dev'})
+    boris = boris.assign(player_id=index.ids(boris['boris_name']))
+    boris = boris[['player_id', 'scoring_format', 'boris_name', 'position', 'rank', 'tier', 'best_rank', 'worst_rank', 'avg_rank', 'std_dev']]
+    # plain floats/objects (loader reads nullable ints and categoricals): the outer join leaves NaN gaps
+    boris = boris.astype({'position': object, 'rank': float, 'tier': float, 'best_rank': float, 'worst_rank': float})
+
+    joined = boris.merge(espn, on='player_id', how='outer')
+    joined['player_name'] = joined['player_name'].fillna(joined['boris_name'])
+    joined = joined.drop(columns='boris_name')
+
+    if props is not None and len(props):
+        props = props.assign(player_id=index.ids(props['player_name']),
+                             line=pd.to_numeric(props['line'], errors='coerce'))
+        props = props.dropna(subset=['player_id', 'line'])
+        props = props[props['bet_type'].astype(str).str.strip() != '']
+        lines = props.pivot_table(index='player_id', columns='bet_type', values='line', aggfunc='first')
+        lines.columns = ['line_' + _SEPARATORS.sub('_', str(c).lower()).strip('_') for c in lines.columns]
+        joined = joined.merge(lines, left_on='player_id', right_index=True, how='left')
+    return joined
+
+
+if __name__ == '__main__':
+    # python players.py [--rebuild]  build/load the index and print the join of the latest snapshots
+    index = load_index(rebuild='--rebuild' in sys.argv)
+    from loader import latest_snapshots  # loader builds on this module
+    espn, boris, props = latest_snapshots()
+    joined = join_sources(espn, boris, props, index)
+    matched = joined.dropna(subset=['adp', 'rank'])
+    print(f"{len(index)} players, {len(index.aliases)} name keys; {matched['player_id'].nunique()} players in both ESPN and Boris")
+    print(joined.sort_values(['scoring_format', 'rank']).head(10).to_string(index=False))
@@ -0,0 +1,234 @@
+import re
+import sys
+import glob
+import time
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Shared, precompiled patterns (also used by the scraper's row parsers)
+HAS_ALPHA = re.compile(r'[A-Za-z]')
+PERCENT = re.compile(r'\d+%')
+PARENS = re.compile(r'\(([^)]+)\)')
+PARENS_ANY = re.compile(r'\([^)]*\)')
+OU_NUMBER = re.compile(r'[ou]\s*\d', re.I)
+STAT_NUMBER = re.compile(r'\d+\.?\d*\s*(Pass|Rush|Rec|Yds|Yards|TD)', re.I)
+CARD_STAT_NUMBER = re.compile(r'\d+\.?\d*\s*(Pass|Rush|Rec|Yds|Yards)', re.I)
+BUTTON_OU = re.compile(r'\b([OUou])\s*([\d\.]+)')
+POSITION_TOKEN = re.compile(r'\b(QB|RB|WR|TE|K|PK|DEF)\b', re.I)
+STAT_WORDS = re.compile(r'\b(pass|rush|receiv|rec|td|yards|yds|receptions|passing)\b', re.I)
+
+# Column-level patterns for normalize_frame (pandas str.extract needs named/numbered groups)
+_LEADING_LINE = r'^\s*(?P<lead_side>[OUou](?=\s*\d))?\s*(?P<lead_line>\d+(?:\.\d+)?)\s*(?P<stat_text>.*?)\s*$'
+_LINE_CELL = r'^\s*(?P<cell_side>[OUou](?=\s*\d))?\s*(?P<cell_number>[+-]?\d+(?:\.\d+)?)\s*(?P<cell_word>over|under)?\s*$'
+_ODDS_CELL = r'^\s*\(?\s*(?P<odds_number>[+-]?\d+(?:\.\d+)?)\s*\)?\s*$'
+_BET_STRING = (r'^\s*(?P<side>[OUou](?=\s*\d))?\s*(?P<line>\d+(?:\.\d+)?)\s*(?P<bet_type>[^()]*?)\s*'
+               r'(?:\((?P<odds>[^)]*)\))?\s*$')
+
+# stat label -> category, first match wins (order matters: 'Rush + Rec Yds' before 'Rush Yds')
+STAT_CATEGORIES = [(re.compile(pattern, re.I), category) for pattern, category in [
+    (r'rush(?:ing)?\s*\+\s*rec|scrimmage', 'rush_rec_yds'),
+    (r'pass(?:ing)?\s*\+\s*rush', 'pass_rush_yds'),
+    (r'pass(?:ing)?\s*y(?:ar)?ds', 'pass_yds'),
+    (r'pass(?:ing)?\s*att', 'pass_att'),
+    (r'pass(?:ing)?\s*tds?|passing touchdowns', 'pass_td'),
+    (r'\bcmps?\b|completions', 'pass_cmp'),
+    (r'\bints?\b|interceptions', 'pass_int'),
+    (r'rush(?:ing)?\s*y(?:ar)?ds', 'rush_yds'),
+    (r'rush(?:ing)?\s*att|carries', 'rush_att'),
+    (r'rec(?:eiving)?\s*y(?:ar)?ds', 'rec_yds'),
+    (r'\brecs?\b|receptions', 'rec'),
+    (r'anytime|\btds?\b|touchdowns?', 'td'),
+    (r'longest', 'longest'),
+    (r'field goals?|\bfgs?\b', 'fg'),
+    (r'kicking points', 'kick_pts'),
+]]
+# BettingPros shows some markets with no label at all, only 'O 0.5' or 'U 22.5' (the 2025-09
+# snapshots have them on every date). They are told apart by position and line, checked
+# against the projections in those files: (positions, lowest line, highest line, category).
+UNLABELED_STATS = [
+    (('RB', 'WR', 'TE'), 0.5, 0.5, 'td'),
+    (('QB',), 0.5, 0.5, 'pass_int'),
+    (('QB',), 14.5, 27.5, 'pass_cmp'),
+]
+SIDE_ONLY = r'^\s*[OUou]\s*\d+(?:\.\d+)?(?:\s+[OUou]\s*\d+(?:\.\d+)?)*\s*$'
+SIDES = {'o': 'over', 'u': 'under', 'over': 'over', 'under': 'under'}
+SIDE_LETTERS = {'over': 'O', 'under': 'U'}
+
+OUTPUT_COLUMNS = ['player_name', 'position', 'matchup', 'bet_type', 'stat', 'line', 'side', 'projection', 'edge', 'odds', 'valid']
+# Scraper row fields, as in scrape_bettingpros.PROP_FIELDS
+PROP_FIELDS = ['player_name', 'position', 'matchup', 'bet_type', 'line', 'odds', 'sportsbook', 'date_scraped']
+
+
+@lru_cache(maxsize=1024)
+def stat_of(label):
+    """Category code for one stat label ('' if unrecognised)."""
+    for pattern, category in STAT_CATEGORIES:
+        if pattern.search(label):
+            return category
+    return ''
+
+
+def stat_category(labels):
+    """STAT_CATEGORIES lookup for a Series of labels; a snapshot only has a handful of
+    distinct labels, so each is matched once and the rest are cache hits."""
+    return labels.fillna('').astype(str).map(stat_of)
+
+
+def unlabeled_stat(position, line):
+    """UNLABELED_STATS lookup for Series of positions and numeric lines ('' where none fits)."""
+    stat = pd.Series('', index=line.index, dtype=object)
+    for positions, low, high, category in UNLABELED_STATS:
+        stat = stat.mask((stat == '') & position.isin(positions) & line.between(low, high), category)
+    return stat
+
+
+def _side(*columns):
+    """First explicit side marker across `columns` (O/U letters or Over/Under words)."""
+    side = pd.Series('', index=columns[0].index, dtype=object)
+    for column in columns:
+        found = column.str.lower().map(SIDES)
+        side = side.mask((side == '') & found.notna(), found)
+    return side
+
+
+def _extract(column, pattern, flags=0):
+    """str.extract over the distinct values only: prop lines, bet labels and odds repeat a lot
+    within and across snapshots, so this parses a fraction of the rows."""
+    codes, uniques = pd.factorize(column)
+    parts = pd.Series(uniques, dtype=object).str.extract(pattern, flags=flags)
+    parts = parts.iloc[codes]
+    parts.index = column.index
+    return parts
+
+
+def normalize_frame(df):
+    """Typed prop rows from any BettingPros CSV layout, in one vectorized pass.
+
+    Handles the current layout (bet_type='Rush Yds', line='82.5', odds='-10.4'), the
+    2025-09-03 layout (bet_type='23.5 Rush Yds', line='44.1 Over' projection) and rows where
+    the side landed in the stat column ('U 22.5'). Output columns:
+
+    line        the prop line as float
+    side        'over'/'under' from an explicit O/U or Over/Under, else from the sign of `edge`
+    stat        category code from STAT_CATEGORIES, or from UNLABELED_STATS for rows the
+                page shows without a label ('' when neither fits)
+    projection  BettingPros projection where the snapshot carries it
+    edge        projection minus line (what the table's odds column actually holds)
+    odds        American odds as a nullable int when a value looks like one (e.g. -110, +120)
+    valid       player name has letters and is not a teaser, and the line is numeric
+    """
+    def col(name):
+        return df[name].fillna('').astype(str).str.strip() if name in df.columns else pd.Series('', index=df.index)
+
+    name = col('player_name')
+    bet = col('bet_type')
+    line_cell = col('line')
+    odds_cell = col('odds')
+
+    lead = _extract(bet, _LEADING_LINE)
+    cell = _extract(line_cell, _LINE_CELL, re.I)
+    odds = _extract(odds_cell, _ODDS_CELL)['odds_number']
+
+    lead_line = pd.to_numeric(lead['lead_line'], errors='coerce')
+    cell_number = pd.to_numeric(cell['cell_number'], errors='coerce')
+    legacy = lead_line.notna()
+
+    out = pd.DataFrame(index=df.index)
+    out['player_name'] = name
+    out['position'] = col('position').str.upper()
+    out['matchup'] = col('matchup').str.replace(r'^-\s*', '', regex=True)
+    # legacy rows: the stat label follows the number in bet_type; otherwise bet_type is the label
+    label = lead['stat_text'].where(legacy, bet).fillna('')
+    out['bet_type'] = label
+    out['line'] = lead_line.where(legacy, cell_number)
+    stat = stat_category(label)
+    out['stat'] = stat.mask(stat == '', unlabeled_stat(out['position'], out['line']))
+    # 'Over'/'Under' after a number in the line cell marks a projection (2025-09-03 layout)
+    has_word = cell['cell_word'].notna()
+    out['projection'] = cell_number.where(legacy & has_word)
+    number = pd.to_numeric(odds, errors='coerce')
+    american = number.notna() & (number.abs() >= 100) & (number == number.round())
+    out['edge'] = number.where(~american)
+    out['odds'] = number.where(american).astype('Int64')
+    side = _side(lead['lead_side'], cell['cell_side'], cell['cell_word'])
+    edge_side = pd.Series(np.where(out['edge'] > 0, 'over', np.where(out['edge'] < 0, 'under', '')), index=df.index)
+    out['side'] = side.mask(side == '', edge_side)
+    out['valid'] = (name.str.contains(HAS_ALPHA) & ~name.str.contains(PERCENT)
+                    & ~name.str.lower().str.contains('click to view|out of', regex=True) & out['line'].notna())
+    return out[OUTPUT_COLUMNS]
+
+
+def parse_bet_strings(strings):
+    """Vectorized parse of raw bet strings such as 'o82.5 Rush Yds (-10.4)' or 'U 22.5 (-110)'
+    into line, side, bet_type, stat, edge and odds columns."""
+    strings = pd.Series(strings, dtype=object).fillna('').astype(str)
+    parts = strings.str.extract(_BET_STRING)
+    parts['bet_type'] = parts['bet_type'].mask(parts['bet_type'].fillna('').str.match(SIDE_ONLY), '')
+    number = pd.to_numeric(parts['odds'].str.replace('−', '-', regex=False), errors='coerce')
+    american = number.notna() & (number.abs() >= 100) & (number == number.round())
+    return pd.DataFrame({
+        'line': pd.to_numeric(parts['line'], errors='coerce'),
+        'side': _side(parts['side']),
+        'bet_type': parts['bet_type'].fillna(''),
+        'stat': stat_category(parts['bet_type']),
+        'edge': number.where(~american),
+        'odds': number.where(american).astype('Int64'),
+    })
+
+
+def normalize_props(rows):
+    """The scraper's normalization stage: scraped prop dicts (PROP_FIELDS) in, the valid
+    ones back out with canonical text fields.
+
+    The whole batch is parsed at once. The line text ('82.5 Rush Yds', 'U 23.5 U 23.5',
+    'o82.5 Rush Yds (-10.4)') is split by parse_bet_strings, then normalize_frame types and
+    validates the rows. A row's line becomes '82.5', or 'U 23.5' when the page gave a side.
+    bet_type becomes the stat label ('' for unlabeled markets), and odds becomes the
+    number from the odds cell, else from the line text's parentheses."""
+    if not rows:
+        return []
+    df = pd.DataFrame(rows, columns=PROP_FIELDS).fillna('').astype(str)
+    bet = parse_bet_strings(df['line'])
+    label = bet['bet_type'].where(bet['bet_type'] != '', df['bet_type'].str.strip())
+    label = label.mask(label.str.match(SIDE_ONLY), '')
+    odds = _extract(df['odds'].str.replace('−', '-', regex=False), _ODDS_CELL)['odds_number']
+    odds = odds.fillna(_extract(df['line'], r'\((?P<odds>[^)]*)\)')['odds'].str.strip()).fillna('')
+    number = bet['line'].map(lambda x: '' if pd.isna(x) else f'{x:g}')
+    letter = bet['side'].map(SIDE_LETTERS).fillna('')
+    line = (letter + ' ' + number).str.strip().where(number != '', '')
+    df = df.assign(bet_type=label, line=line, odds=odds)
+    typed = normalize_frame(df)
+    df['position'] = typed['position']
+    df['matchup'] = typed['matchup']
+    return df[typed['valid']].to_dict('records')
+
+
+def accuracy(raw, normalized):
+    """Share of rows each stage yields a usable value for, next to the raw columns as text."""
+    rows = len(raw)
+    raw_line = pd.to_numeric(raw['line'], errors='coerce').notna().sum() if 'line' in raw else 0
+    return {
+        'rows': rows,
+        'raw_numeric_line': raw_line / rows if rows else 0.0,
+        'line': normalized['line'].notna().mean() if rows else 0.0,
+        'stat': (normalized['stat'] != '').mean() if rows else 0.0,
+        'side': (normalized['side'] != '').mean() if rows else 0.0,
+        'valid': normalized['valid'].mean() if rows else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    # python prop_normalize.py [files...]  throughput and parse rates over the BettingPros CSVs
+    paths = sys.argv[1:] or sorted(glob.glob('Data/bettingpros_prop_bets_*.csv'))
+    frames = {path: pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths}
+    print(f"{'file':<48} {'rows':>5} {'raw line':>9} {'line':>6} {'stat':>6} {'side':>6} {'valid':>6}")
+    for path, df in frames.items():
+        a = accuracy(df, normalize_frame(df))
+        print(f"{path:<48} {a['rows']:>5} {a['raw_numeric_line']:>9.1%} {a['line']:>6.1%} {a['stat']:>6.1%} {a['side']:>6.1%} {a['valid']:>6.1%}")
+    combined = pd.concat(frames.values(), ignore_index=True)
+    big = pd.concat([combined] * 50, ignore_index=True)
+    started = time.perf_counter()
+    normalize_frame(big)
+    elapsed = time.perf_counter() - started
+    print(f"\nnormalize_frame: {len(big):,} rows in {elapsed * 1000:.0f}ms ({len(big) / elapsed:,.0f} rows/sec)")
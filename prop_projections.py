@@ -0,0 +1,148 @@
+import sys
+import time
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from loader import latest_snapshots
+
+# Fantasy points per unit of each stat; receptions depend on the format (as in the boris_chen_* files)
+BASE_SCORING = {'pass_yds': 0.04, 'pass_td': 4.0, 'pass_int': -2.0, 'rush_yds': 0.1, 'rec_yds': 0.1, 'td': 6.0}
+RECEPTION_POINTS = {'standard': 0.0, 'ppr': 1.0, 'half_ppr': 0.5}
+FORMATS = list(RECEPTION_POINTS)
+
+# Rough per-game standard deviation of each stat around its line, used to turn a de-vigged
+# over probability into an expected value: line + sigma * probit(p_over)
+STAT_SIGMA = {
+    'pass_yds': 45.0, 'pass_td': 0.9, 'pass_int': 0.7, 'pass_cmp': 4.5, 'pass_att': 6.0, 'rush_yds': 22.0,
+    'rush_att': 4.0, 'rec_yds': 22.0, 'rec': 1.8, 'td': 0.5, 'rush_rec_yds': 28.0, 'pass_rush_yds': 48.0,
+    'longest': 8.0, 'fg': 0.8, 'kick_pts': 3.0,
+}
+# Sportsbooks' usual overround when only one side's price is known (-110 / -110)
+DEFAULT_OVERROUND = 2 * 110 / 210
+
+CACHE_SIZE = 16
+_cache = OrderedDict()
+
+
+def implied_probability(odds):
+    """American odds -> implied probability (vig included); NaN where odds are missing."""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(odds > 0, 100.0 / (odds + 100.0), -odds / (-odds + 100.0))
+
+
+def devig(p_over, p_under):
+    """Fair over probability from both sides' implied probabilities (normalized to sum to 1);
+    with only one side known, that side is divided by DEFAULT_OVERROUND."""
+    both = ~np.isnan(p_over) & ~np.isnan(p_under)
+    fair = np.where(both, p_over / (p_over + p_under), np.nan)
+    fair = np.where(~both & ~np.isnan(p_over), p_over / DEFAULT_OVERROUND, fair)
+    fair = np.where(~both & np.isnan(p_over) & ~np.isnan(p_under), 1 - p_under / DEFAULT_OVERROUND, fair)
+    return np.clip(fair, 0.01, 0.99)
+
+
+def probit(p):
+    """Logistic approximation of the inverse normal CDF (within ~0.03 for 0.2 < p < 0.8, ~0.09 at 0.05/0.95)."""
+    return np.log(p / (1 - p)) / 1.702
+
+
+def scoring_matrix(stats):
+    """(len(stats), len(FORMATS)) points per unit of each stat in each format."""
+    matrix = np.zeros((len(stats), len(FORMATS)))
+    for i, stat in enumerate(stats):
+        for j, scoring_format in enumerate(FORMATS):
+            matrix[i, j] = RECEPTION_POINTS[scoring_format] if stat == 'rec' else BASE_SCORING.get(stat, 0.0)
+    return matrix
+
+
+def market_expectations(props):
+    """Expected stat value for every usable player-market row, best source first:
+    the snapshot's projection, the line plus the projection edge, the line shifted by the
+    de-vigged over probability, and finally the line itself (the market's median)."""
+    props = props[props['valid'] & (props['stat'].astype(str) != '') & props['line'].notna()]
+    line = props['line'].to_numpy(dtype=float)
+    projection = props['projection'].to_numpy(dtype=float)
+    edge = props['edge'].to_numpy(dtype=float)
+    odds = props['odds'].astype('float64').to_numpy(dtype=float)
+    side = props['side'].astype(str).to_numpy()
+    sigma = props['stat'].astype(str).map(STAT_SIGMA).fillna(1.0).to_numpy(dtype=float)
+
+    # both sides of a market sit on separate rows: line them up per (player, stat, line)
+    key = pd.MultiIndex.from_arrays([props['player_name'].astype(str), props['stat'].astype(str), line])
+    implied = implied_probability(odds)
+    over = pd.Series(np.where(side == 'over', implied, np.nan), index=key).groupby(level=[0, 1, 2]).transform('max').to_numpy()
+    under = pd.Series(np.where(side == 'under', implied, np.nan), index=key).groupby(level=[0, 1, 2]).transform('max').to_numpy()
+    from_odds = line + sigma * probit(devig(over, under))
+
+    expected = np.where(~np.isnan(projection), projection,
+                        np.where(~np.isnan(edge), line + edge,
+                                 np.where(~np.isnan(from_odds), from_odds, line)))
+    return pd.DataFrame({
+        'player_name': props['player_name'].astype(str).to_numpy(),
+        'position': props['position'].astype(str).replace('nan', '').to_numpy(),
+        'stat': props['stat'].astype(str).to_numpy(),
+        'expected': np.maximum(expected, 0.0),
+    })
+
+
+def project(props):
+    """Prop-implied fantasy points per player: one row per player with the expected value of
+    each priced stat, the number of markets used and points_<format> for every format.
+    Only priced markets count, so a player without a TD market gets no TD points."""
+    markets = market_expectations(props)
+    if not len(markets):
+        return pd.DataFrame(columns=['player_name', 'position', 'markets'] + [f'points_{f}' for f in FORMATS])
+    grouped = markets.groupby(['player_name', 'stat'], sort=False)['expected'].mean()
+    table = grouped.unstack('stat')
+    values = table.to_numpy(dtype=float)
+    points = np.nan_to_num(values) @ scoring_matrix(list(table.columns))
+    out = table.reset_index()
+    out.columns.name = None
+    first = markets.drop_duplicates('player_name').set_index('player_name')['position']
+    out.insert(1, 'position', out['player_name'].map(first).to_numpy())
+    out.insert(2, 'markets', (~np.isnan(values)).sum(axis=1))
+    for j, scoring_format in enumerate(FORMATS):
+        out[f'points_{scoring_format}'] = points[:, j].round(2)
+    return out.sort_values('points_ppr', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def snapshot_hash(props):
+    """Content hash of a props frame (row order included)."""
+    return hashlib.sha256(pd.util.hash_pandas_object(props, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def projections(props):
+    """project() memoized by snapshot_hash, keeping the CACHE_SIZE most recent snapshots."""
+    digest = snapshot_hash(props)
+    if digest in _cache:
+        _cache.move_to_end(digest)
+    else:
+        _cache[digest] = project(props)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return _cache[digest].copy()
+
+
+def latest_projections(data_dir='Data'):
+    """Projections from the newest BettingPros snapshot."""
+    _, _, props = latest_snapshots(data_dir)
+    return projections(props) if props is not None else None
+
+
+if __name__ == '__main__':
+    # python prop_projections.py [path] [repeat]  project a snapshot (default: newest) and time it
+    from loader import load
+    props = load(sys.argv[1]) if len(sys.argv) > 1 else latest_snapshots()[2]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    started = time.perf_counter()
+    result = project(props)
+    cold = time.perf_counter() - started
+    projections(props)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        projections(props)
+    cached = (time.perf_counter() - started) / repeat
+    columns = ['player_name', 'position', 'markets'] + [f'points_{f}' for f in FORMATS]
+    print(result[columns].head(15).to_string(index=False))
+    print(f"\n{len(props)} prop rows -> {len(result)} players: {cold * 1000:.1f}ms, {cached * 1000:.2f}ms cached")
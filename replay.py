@@ -0,0 +1,60 @@
+import os
+import re
+import sys
+import glob
+from datetime import datetime
+from dom_snapshot import card_texts_from_html, table_snapshot_from_html
+from prop_normalize import normalize_props
+from scrape_bettingpros import PropAccumulator, parse_cards_fallback, parse_table_to_list
+from scrape_espn import parse_espn_rows
+
+
+def _date_for(directory):
+    m = re.search(r'\d{4}-\d{2}-\d{2}', os.path.basename(os.path.normpath(directory)))
+    return m.group(0) if m else datetime.now().strftime('%Y-%m-%d')
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def replay_bettingpros(directory, today_date=None):
+    """Re-run a recorded BettingPros scrape (scroll_*.html, optional page.html) with no browser.
+    Returns the unique rows the live run would have collected, normalized as at compaction."""
+    today_date = today_date or _date_for(directory)
+    acc = PropAccumulator()
+    for path in sorted(glob.glob(os.path.join(directory, 'scroll_*.html'))):
+        acc.add(parse_table_to_list(table_snapshot_from_html(_read(path)), today_date))
+    page = os.path.join(directory, 'page.html')
+    if not acc.rows and os.path.exists(page):
+        acc.add(parse_cards_fallback(card_texts_from_html(_read(page)), today_date))
+    return normalize_props(acc.rows)
+
+
+def replay_espn(directory, today_date=None):
+    """Re-run a recorded ESPN scrape (page_*.html) with no browser."""
+    today_date = today_date or _date_for(directory)
+    players = []
+    for path in sorted(glob.glob(os.path.join(directory, 'page_*.html'))):
+        players.extend(parse_espn_rows(_read(path), today_date))
+    return players
+
+
+def replay_dir(directory):
+    """Pick the replayer from the recording directory name (bettingpros_* / espn_*)."""
+    name = os.path.basename(os.path.normpath(directory))
+    if name.startswith('bettingpros'):
+        return replay_bettingpros(directory)
+    if name.startswith('espn'):
+        return replay_espn(directory)
+    raise ValueError(f"Don't know how to replay {directory}")
+
+
+if __name__ == '__main__':
+    # e.g. python replay.py fixtures/replay/*  (or a REPLAY_RECORD_DIR recording)
+    for directory in sys.argv[1:]:
+        rows = replay_dir(directory)
+        print(f"{directory}: {len(rows)} rows")
+        for row in rows[:3]:
+            print(f"  {row}")
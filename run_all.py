@@ -0,0 +1,139 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from browser import DriverPool
+from scrape_bettingpros import scrape_bettingpros_prop_bets
+from scrape_borris import download_boris_chen_csv_files
+from scrape_espn import scrape_espn_draft_trends
+
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+logger = logging.getLogger('run_all')
+
+
+def count_rows(result):
+    """Row count for whatever a source returns (DataFrame, dict of DataFrames, or None)."""
+    if result is None:
+        return 0
+    if isinstance(result, dict):
+        return sum(len(df) for df in result.values())
+    return len(result)
+
+
+# name -> (kind, callable). 'http' sources run straight on their thread; 'browser'
+# sources are handed a driver from the shared pool, and 'pooled' ones the pool as well,
+# for extra browsers (ESPN_BROWSERS).
+SOURCES = {
+    'boris': ('http', download_boris_chen_csv_files),
+    'espn': ('pooled', scrape_espn_draft_trends),
+    'bettingpros': ('browser', scrape_bettingpros_prop_bets),
+}
+
+
+# How often the run loop looks again at sources still waiting for a browser
+POLL_SECONDS = 1.0
+
+
+def run_source(name, kind, func, pool, in_use, started, timeout, kwargs=None):
+    """Run one source. Its clock (`started[name]`) starts once it runs, i.e. after a browser
+    source got a driver; waiting for one is bounded by `timeout` too."""
+    kwargs = kwargs or {}
+    if kind in ('browser', 'pooled'):
+        if kind == 'pooled':
+            kwargs = dict(kwargs, pool=pool)
+        with pool.acquire(timeout=timeout) as driver:
+            in_use[name] = driver
+            started[name] = time.perf_counter()
+            try:
+                return func(driver=driver, **kwargs)
+            finally:
+                in_use.pop(name, None)
+    started[name] = time.perf_counter()
+    return func(**kwargs)
+
+
+def start_source(name, *args):
+    """run_source on a daemon thread, so a source that hangs past its deadline can be
+    abandoned: executor threads would be joined at interpreter exit and hold up the process."""
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(run_source(name, *args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=f'source-{name}', daemon=True).start()
+    return future
+
+
+def run_all(sources=None, timeout=None, browsers=None, options=None):
+    """Run every source concurrently and return a summary dict per source. `options` maps a
+    source name to extra keyword arguments for its scraper.
+
+    Each source gets `timeout` seconds from its own start (a browser source starts once it
+    has a driver). A failing or timed-out source does not affect the others. On timeout the
+    source's browser is quit so its scraper unwinds instead of holding a pool slot, and its
+    thread is abandoned.
+    """
+    names = sources or [s.strip() for s in os.getenv('SOURCES', ','.join(SOURCES)).split(',') if s.strip()]
+    timeout = float(timeout or os.getenv('SOURCE_TIMEOUT', '900'))
+    browsers = int(browsers or os.getenv('BROWSER_POOL', '2'))
+    unknown = [n for n in names if n not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown sources: {', '.join(unknown)} (known: {', '.join(SOURCES)})")
+
+    pool = DriverPool(size=browsers)
+    in_use = {}
+    summary = {}
+    started = {}
+    run_start = time.perf_counter()
+    try:
+        futures = {}
+        for name in names:
+            kind, func = SOURCES[name]
+            futures[start_source(name, kind, func, pool, in_use, started, timeout, (options or {}).get(name))] = name
+        pending = set(futures)
+        while pending:
+            now = time.perf_counter()
+            for future in [f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout]:
+                name = futures[future]
+                summary[name] = {'status': 'timeout', 'latency': now - started[name], 'rows': 0, 'error': f'exceeded {timeout:.0f}s'}
+                pending.discard(future)
+                pool.discard(in_use.pop(name, None))
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            wait_for = min(deadlines, default=now + POLL_SECONDS) - now
+            if len(deadlines) < len(pending):
+                wait_for = min(wait_for, POLL_SECONDS)
+            done, _ = wait(pending, timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                entry = summary[name] = {'latency': time.perf_counter() - started.get(name, run_start)}
+                try:
+                    result = future.result()
+                    rows = count_rows(result)
+                    entry.update({'status': 'ok' if rows else 'empty', 'rows': rows, 'error': ''})
+                except Exception as e:
+                    logger.exception(f"Source {name} failed")
+                    entry.update({'status': 'failed', 'rows': 0, 'error': str(e)})
+    finally:
+        pool.close()
+
+    total = time.perf_counter() - run_start
+    logger.info(f"Run summary ({len(names)} sources, {pool.created} browsers started, elapsed={total:.2f}s):")
+    for name in names:
+        s = summary[name]
+        logger.info(f"  {name:<12} {s['status']:<8} rows={s['rows']:<6} latency={s['latency']:.2f}s {s['error']}")
+    slowest = max((s['latency'] for s in summary.values()), default=0.0)
+    logger.info(f"  sum of latencies={sum(s['latency'] for s in summary.values()):.2f}s, slowest={slowest:.2f}s")
+    return summary
+
+
+if __name__ == '__main__':
+    results = run_all()
+    if not any(s['status'] == 'ok' for s in results.values()):
+        raise SystemExit(1)
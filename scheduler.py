@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from selenium.webdriver.common.by import By
+from browser import DriverPool
+from dom_snapshot import snapshot_html, snapshot_table
+from http_fetch import CACHE_PATH, DEFAULT_TIMEOUT, HttpCache, make_session
+from run_all import SOURCES, run_all
+from scrape_bettingpros import BETTINGPROS_URL, TABLE_SELECTORS as PROP_TABLE_SELECTORS, parse_table_to_list, prop_key
+from scrape_borris import BORIS_BASE_URL, CSV_FILES
+from scrape_espn import ESPN_URL, TABLE_SELECTORS as ESPN_TABLE_SELECTORS, parse_espn_rows
+from waits import wait_for_document, wait_for_table
+
+logger = logging.getLogger('scheduler')
+
+STATE_PATH = os.getenv('SCHEDULER_STATE', 'Data/.scheduler_state.json')
+PROBE_TOP_N = int(os.getenv('PROBE_TOP_N', '50'))
+
+# Per-source freshness policy, in seconds: probe at most every `probe_every`; scrape when the
+# probe's fingerprint changed, or when the last scrape is older than `max_age` whatever the
+# probe says. Override with e.g. SCHEDULE_BETTINGPROS=900,21600 (tighter on game days).
+# The workflow's cron entries (run-bettingpros.yml) follow the `probe_every` intervals.
+POLICIES = {
+    'boris': {'probe_every': 3600, 'max_age': 7 * 86400},
+    'espn': {'probe_every': 4 * 3600, 'max_age': 2 * 86400},
+    'bettingpros': {'probe_every': 1800, 'max_age': 12 * 3600},
+}
+
+
+def load_policies(names=None):
+    unknown = [n for n in names or [] if n not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown sources: {', '.join(unknown)} (known: {', '.join(POLICIES)})")
+    policies = {}
+    for name in names or POLICIES:
+        policy = dict(POLICIES[name])
+        override = os.getenv(f'SCHEDULE_{name.upper()}')
+        if override:
+            probe_every, _, max_age = override.partition(',')
+            policy['probe_every'] = float(probe_every)
+            if max_age:
+                policy['max_age'] = float(max_age)
+        policies[name] = policy
+    return policies
+
+
+def fingerprint(items):
+    """Stable short hash of JSON-serializable probe contents."""
+    return hashlib.sha256(json.dumps(items, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def probe_boris(driver=None, base_url=None, cache_path=None):
+    """ETag (else Last-Modified) of every Boris CSV from HEAD requests. A 304 against the
+    validators of the last download reuses that file's cached ETag, so an unchanged upstream
+    hashes the same either way."""
+    base_url = (base_url or os.getenv('BORIS_BASE_URL', BORIS_BASE_URL)).rstrip('/')
+    cache = HttpCache(cache_path or CACHE_PATH)
+    session = make_session(pool_size=len(CSV_FILES))
+    validators = {}
+    for format_key, (csv_file, _) in CSV_FILES.items():
+        url = f'{base_url}/{csv_file}'
+        response = session.head(url, headers=cache.conditional_headers(url), timeout=DEFAULT_TIMEOUT, allow_redirects=True)
+        if response.status_code == 304:
+            entry = cache.get(url)
+            validators[format_key] = entry.get('etag') or entry.get('last_modified')
+            continue
+        response.raise_for_status()
+        headers = response.headers
+        validators[format_key] = headers.get('ETag') or headers.get('Last-Modified') or headers.get('Content-Length')
+    return fingerprint(validators)
+
+
+def probe_espn(driver, top_n=PROBE_TOP_N):
+    """Hash of the first page's top-N rows (name, team, position, ADP): one page load instead
+    of paging the whole table."""
+    driver.get(ESPN_URL)
+    if wait_for_table(driver, ESPN_TABLE_SELECTORS, 20, settle_ms=300) is None:
+        raise TimeoutError('ESPN table did not load')
+    html = snapshot_html(driver, driver.find_element(By.CSS_SELECTOR, ESPN_TABLE_SELECTORS[0]))
+    rows = parse_espn_rows(html, '')[:top_n]
+    if not rows:
+        raise ValueError('ESPN probe found no rows')
+    return fingerprint([(r['player_name'], r['team'], r['position'], r['adp']) for r in rows])
+
+
+def probe_bettingpros(driver, top_n=PROBE_TOP_N):
+    """Row count of the table as first rendered plus a hash of its first N props (player,
+    bet, line, odds), before any scrolling or popup handling."""
+    driver.get(BETTINGPROS_URL)
+    wait_for_document(driver, 15)
+    if wait_for_table(driver, PROP_TABLE_SELECTORS, 20, settle_ms=300) is None:
+        raise TimeoutError('BettingPros table did not load')
+    for selector in PROP_TABLE_SELECTORS:
+        tables = driver.find_elements(By.CSS_SELECTOR, selector)
+        if tables:
+            break
+    snapshot = snapshot_table(driver, tables[0])
+    props = parse_table_to_list(snapshot, '')
+    if not props:
+        raise ValueError('BettingPros probe found no props')
+    return fingerprint([snapshot.get('total_rows', 0), sorted(prop_key(p) for p in props)[:top_n]])
+
+
+# Scraper arguments for scheduled rescrapes. A rescrape is a new run of a source whose data
+# changed, so BettingPros must not merge in a checkpoint left by an earlier run today.
+SCRAPE_OPTIONS = {'bettingpros': {'resume': False}}
+
+# name -> probe(driver) returning a fingerprint; 'browser' sources get a pooled driver
+PROBES = {
+    'boris': probe_boris,
+    'espn': probe_espn,
+    'bettingpros': probe_bettingpros,
+}
+
+
+# Probe bookkeeping changes on every tick, so it is kept in a separate (uncommitted) file;
+# the state file itself only changes when a source was rescraped.
+PROBE_FIELDS = ('last_probe', 'probes', 'skipped')
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class SchedulerState:
+    """Per-source fingerprints and timestamps, persisted as JSON so a restarted daemon picks
+    up where it left off instead of rescraping everything. Fingerprints and scrape times go
+    to `path`, probe times and counts to `probes_path` (default: next to it)."""
+
+    def __init__(self, path=STATE_PATH, probes_path=None):
+        self.path = path
+        self.probes_path = probes_path or os.path.splitext(path)[0] + '.probes.json'
+        self.sources = _read_json(path)
+        for name, entry in _read_json(self.probes_path).items():
+            self.sources.setdefault(name, {}).update(entry)
+        self.changed = False
+
+    def get(self, name):
+        entry = self.sources.setdefault(name, {})
+        for field, default in (('fingerprint', None), ('last_probe', 0.0), ('last_scrape', 0.0),
+                               ('probes', 0), ('scrapes', 0), ('skipped', 0)):
+            entry.setdefault(field, default)
+        return entry
+
+    def save(self):
+        """Write the probe bookkeeping, and the state file only if `changed` was set."""
+        _write_json(self.probes_path, {name: {k: entry[k] for k in PROBE_FIELDS if k in entry}
+                                       for name, entry in self.sources.items()})
+        if self.changed:
+            _write_json(self.path, {name: {k: v for k, v in entry.items() if k not in PROBE_FIELDS}
+                                    for name, entry in self.sources.items()})
+            self.changed = False
+
+
+class Scheduler:
+    """Probe sources when their policy says so and scrape only the ones that changed.
+
+    `probes` and `scrape` default to PROBES and run_all; both can be swapped out (e.g. to
+    run against stand-in servers). `scrape(names)` returns run_all's per-source summary.
+    """
+
+    def __init__(self, names=None, state_path=STATE_PATH, probes=None, scrape=None, browsers=1, clock=time.time):
+        self.policies = load_policies(names)
+        self.state = SchedulerState(state_path)
+        self.probes = probes or PROBES
+        self.scrape = scrape or (lambda names: run_all(sources=names, options=SCRAPE_OPTIONS))
+        self.browsers = browsers
+        self.clock = clock
+
+    def due(self, now=None):
+        now = self.clock() if now is None else now
+        return [name for name, policy in self.policies.items()
+                if not self.state.get(name)['last_probe'] or now - self.state.get(name)['last_probe'] >= policy['probe_every']]
+
+    def next_due(self):
+        """Seconds until the next source is due for a probe."""
+        now = self.clock()
+        waits = [self.state.get(name)['last_probe'] + policy['probe_every'] - now for name, policy in self.policies.items()]
+        return max(0.0, min(waits, default=0.0))
+
+    def probe(self, names):
+        """{name: fingerprint, or None when the probe failed}. Browser probes share one pool."""
+        results = {}
+        pool = None
+        try:
+            for name in names:
+                started = time.perf_counter()
+                try:
+                    if SOURCES[name][0] != 'http':
+                        pool = pool or DriverPool(size=self.browsers)
+                        with pool.acquire() as driver:
+                            results[name] = self.probes[name](driver)
+                    else:
+                        results[name] = self.probes[name]()
+                except Exception as e:
+                    logger.warning(f"Probe {name} failed: {e}")
+                    results[name] = None
+                logger.info(f"Probed {name} in {time.perf_counter() - started:.2f}s: {results[name]}")
+        finally:
+            if pool is not None:
+                pool.close()
+        return results
+
+    def stale(self, name, probed, now):
+        """Why a source needs a full scrape, or '' if its last one is still current."""
+        entry = self.state.get(name)
+        if not entry['last_scrape']:
+            return 'never scraped'
+        if now - entry['last_scrape'] >= self.policies[name]['max_age']:
+            return 'max age reached'
+        if probed is not None and probed != entry['fingerprint']:
+            return 'changed'
+        return ''
+
+    def tick(self, force=False, dry_run=False):
+        """Probe every due source (all of them with `force`), scrape the stale ones and save
+        the state. Returns {name: reason} for the sources scraped (or that would be)."""
+        now = self.clock()
+        names = list(self.policies) if force else self.due(now)
+        if not names:
+            return {}
+        probed = self.probe(names)
+        stale = {}
+        for name in names:
+            entry = self.state.get(name)
+            entry['last_probe'] = now
+            entry['probes'] += 1
+            reason = self.stale(name, probed[name], now)
+            if reason:
+                stale[name] = reason
+            else:
+                entry['skipped'] += 1
+            logger.info(f"  {name:<12} {reason or 'unchanged, skipped'}")
+        if stale and not dry_run:
+            summary = self.scrape(list(stale))
+            for name in stale:
+                result = summary.get(name) or {}
+                if result.get('status') != 'ok':
+                    # keep the old fingerprint so the next probe retries the scrape
+                    logger.warning(f"Scrape of {name} {result.get('status', 'failed')}; will retry on next probe")
+                    continue
+                entry = self.state.get(name)
+                entry.update({'fingerprint': probed[name] or entry['fingerprint'], 'last_scrape': now, 'rows': result.get('rows', 0)})
+                entry['scrapes'] += 1
+                self.state.changed = True
+        self.state.save()
+        return stale
+
+    def run_forever(self, max_sleep=300):
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception('Scheduler tick failed')
+            time.sleep(min(max(self.next_due(), 1.0), max_sleep))
+
+
+def main(argv=None):
+    # python scheduler.py                 run as a daemon, probing each source per POLICIES
+    # python scheduler.py --once          one pass over the due sources (e.g. from cron)
+    # python scheduler.py --once --force  probe every source now; --dry-run only reports
+    parser = argparse.ArgumentParser(description='Rescrape sources only when their data changed.')
+    parser.add_argument('--sources', help='comma-separated subset of ' + ','.join(POLICIES))
+    parser.add_argument('--once', action='store_true')
+    parser.add_argument('--force', action='store_true', help='probe all sources regardless of their interval')
+    parser.add_argument('--dry-run', action='store_true', help='probe and report, but do not scrape')
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.sources.split(',') if s.strip()] if args.sources else None
+    scheduler = Scheduler(names, browsers=int(os.getenv('BROWSER_POOL', '1')))
+    if args.once:
+        stale = scheduler.tick(force=args.force, dry_run=args.dry_run)
+        logger.info(f"Stale: {', '.join(f'{n} ({r})' for n, r in stale.items()) or 'none'}")
+        return 0
+    logger.info(f"Scheduler started: {json.dumps(scheduler.policies)}")
+    scheduler.run_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,37 +1,409 @@
 import pandas as pd
 import time
 import os
+import csv
+import hashlib
 import traceback
-import re
+from collections import namedtuple
+from itertools import islice
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from browser import browser_profile, format_page_report, headless_from_env, new_driver, page_report
+from checkpoint import CsvCheckpoint, compact_checkpoint
+from dom_snapshot import SnapshotRecorder, card_texts, snapshot_html, table_snapshot_from_html
+from xhr_capture import BETTINGPROS_API, ResponseRecorder, capture_mode, iter_bettingpros_pages
+from line_moves import record_snapshot
+from metrics import RunMetrics, peak_rss_mb
+from prop_normalize import (BUTTON_OU, CARD_STAT_NUMBER, HAS_ALPHA, OU_NUMBER, PARENS, PERCENT, POSITION_TOKEN, STAT_NUMBER,
+                            STAT_WORDS, normalize_props)
+from store import save_snapshot, save_snapshot_csv
+from waits import WaitStats, probe_table, wait_for_document, wait_for_table
 import logging
 
 # Configure module logger
 logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
 logger = logging.getLogger('scrape_bettingpros')
 
+BETTINGPROS_URL = "https://www.bettingpros.com/nfl/picks/prop-bets/"
+TABLE_SELECTORS = [
+    '.table-overflow--is-scrollable-vertical.props-table table',
+    'table.table.table--is-striped',
+    'table'
+]
 
-def scrape_bettingpros_prop_bets():
-    """Scrape BettingPros NFL prop bets into CSV."""
-    chrome_options = Options()
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--window-size=1366,1200')
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    headless = os.getenv("HEADLESS", "true").lower() in ("1", "true", "yes")
-    if headless:
-        chrome_options.add_argument("--headless=new")
+PROP_FIELDS = ['player_name', 'position', 'matchup', 'bet_type', 'line', 'odds', 'sportsbook', 'date_scraped']
+FINAL_FIELDS = ['player_name', 'position', 'matchup', 'bet_type', 'line', 'odds', 'date_scraped']
+# Row record of the streaming mode: a tuple in PROP_FIELDS order, no per-row dict
+PropRow = namedtuple('PropRow', PROP_FIELDS)
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    try:
-        driver.set_window_size(1366, 1200)
-    except Exception:
-        pass
+
+def prop_key(p):
+    """Dedupe key for a parsed prop row."""
+    return ((p.get('player_name') or '').strip().lower(), (p.get('bet_type') or '').strip().lower(), (p.get('line') or '').strip(), (p.get('odds') or '').strip())
+
+
+def prop_digest(p):
+    """prop_key hashed to a 64-bit int: ~32 bytes in a set instead of a tuple of four strings."""
+    return int.from_bytes(hashlib.blake2b('\x1f'.join(prop_key(p)).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def is_clean_player_name(name):
+    """Reject percent/junk/premium-teaser values that land in the player column."""
+    name = name or ''
+    return bool(HAS_ALPHA.search(name)) and not PERCENT.search(name) and 'click to view' not in name.lower()
+
+
+class PropAccumulator:
+    """Keyed store of scraped props that only parses rows added since the previous scroll.
+
+    `next_row` is the table row index to snapshot from next time; `cleaned` is kept up to
+    date as rows arrive so the partial save never re-filters the whole list.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.cleaned = []
+        self.drained = 0
+        self.keys = set()
+        self.next_row = 0
+        self.last_row_text = None
+        self.rows_parsed = 0
+        self.rows_new = 0
+
+    def is_stale(self, snapshot):
+        """True when the table was re-rendered (fewer rows, or the row we stopped at changed)
+        so the snapshot starting at `next_row` cannot be trusted."""
+        if snapshot['start'] == 0:
+            return False
+        if snapshot['total_rows'] < snapshot['start']:
+            return True
+        return snapshot['anchor'] is not None and self.last_row_text is not None and snapshot['anchor'] != self.last_row_text
+
+    def reset_position(self):
+        self.next_row = 0
+        self.last_row_text = None
+
+    def advance(self, snapshot):
+        """Remember where this snapshot ended so the next one starts after it."""
+        self.next_row = snapshot['total_rows']
+        body = [r for r in snapshot['rows'] if r['cells']]
+        if body:
+            self.last_row_text = body[-1]['text']
+
+    def add(self, props):
+        """Merge parsed rows; returns the rows that were not seen before."""
+        new_rows = []
+        for p in props:
+            if not p.get('player_name'):
+                continue
+            key = prop_key(p)
+            if key in self.keys:
+                continue
+            self.keys.add(key)
+            self.rows.append(p)
+            if is_clean_player_name(p.get('player_name')):
+                self.cleaned.append(p)
+            new_rows.append(p)
+        self.rows_parsed += len(props)
+        self.rows_new += len(new_rows)
+        return new_rows
+
+    def drain(self):
+        """Clean rows added since the last drain (for the checkpoint)."""
+        rows = self.cleaned[self.drained:]
+        self.drained = len(self.cleaned)
+        return rows
+
+
+def prop_records(props):
+    """Streaming stage: parsed dicts -> (digest, PropRow), dropping rows without a player name."""
+    for p in props:
+        if p.get('player_name'):
+            yield prop_digest(p), PropRow(*(p.get(f) or '' for f in PROP_FIELDS))
+
+
+def unseen(records, keys):
+    """Streaming stage: records whose digest is not in `keys` yet (adding it)."""
+    for digest, row in records:
+        if digest not in keys:
+            keys.add(digest)
+            yield row
+
+
+class StreamingPropAccumulator(PropAccumulator):
+    """PropAccumulator that keeps no rows (STREAM_PROPS=true).
+
+    Parsed rows pass through prop_records -> unseen -> `pending`, which drain() hands to the
+    checkpoint after every scroll, so memory is one batch of PropRow tuples plus the set of
+    64-bit key digests however long the table gets. `rows` and `cleaned` stay empty.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pending = []
+
+    def add(self, props):
+        new_rows = list(unseen(prop_records(props), self.keys))
+        self.pending.extend(row for row in new_rows if is_clean_player_name(row.player_name))
+        self.rows_parsed += len(props)
+        self.rows_new += len(new_rows)
+        return new_rows
+
+    def drain(self):
+        rows, self.pending = self.pending, []
+        return rows
+
+
+def parse_table_to_list(snapshot, today_date):
+    """Robust table parser: map headers to columns, prefer cells matching patterns, and fall back to scanning row cells and buttons for line/odds and player name."""
+    props = []
+    headers = snapshot.get('headers') or []
+    rows = snapshot.get('rows') or []
+
+    # Build header map by keywords
+    header_map = {}
+    for i, h in enumerate(headers):
+        if 'player' in h or 'name' in h:
+            header_map['player'] = i
+        elif 'prop' in h or 'bet' in h or 'type' in h:
+            header_map['bet_type'] = i
+        elif 'line' in h or 'o/u' in h or 'over' in h or 'under' in h:
+            header_map['line'] = i
+        elif 'odd' in h or 'odds' in h:
+            header_map['odds'] = i
+
+    start = 1 if rows and headers else 0
+
+    for row in rows[start:]:
+        try:
+            cells = row['cells']
+            buttons = row['buttons']
+
+            # helper to safely read cell text
+            def ct(idx):
+                try:
+                    return cells[idx].strip()
+                except Exception:
+                    return ''
+
+            # Primary reads using header mapping
+            player_raw = ct(header_map.get('player', 0))
+            bet_raw = ct(header_map.get('bet_type', 1))
+            line_raw = ct(header_map.get('line', 2))
+            odds_raw = ct(header_map.get('odds', 3))
+
+            # If player_raw looks like junk (percent/no letters), try to find the first cell with letters
+            def first_alpha_cell():
+                for t in cells:
+                    t = t.strip()
+                    if t and HAS_ALPHA.search(t):
+                        return t
+                return ''
+
+            if (not player_raw) or PERCENT.search(player_raw) or not HAS_ALPHA.search(player_raw):
+                alt = first_alpha_cell()
+                if alt:
+                    player_raw = alt
+
+            # If odds_raw missing, scan row cells for parentheses or button text
+            if not odds_raw:
+                # look for parentheses in any cell
+                for t in cells:
+                    m = PARENS.search(t)
+                    if m:
+                        odds_raw = m.group(1).strip()
+                        break
+                # fallback: look for button text inside the row
+                if not odds_raw:
+                    for bt in buttons:
+                        bt = bt.strip()
+                        m = PARENS.search(bt)
+                        if m:
+                            odds_raw = m.group(1).strip()
+                            # also consider bet text from button (e.g., 'O 220.5')
+                            if not line_raw or not OU_NUMBER.search(line_raw):
+                                # try to extract O/U and value
+                                m2 = BUTTON_OU.search(bt)
+                                if m2:
+                                    line_raw = (m2.group(1) + ' ' + m2.group(2)).strip()
+                            break
+
+            # If line_raw missing, scan cells/buttons for o/u or numeric patterns
+            if not line_raw or not OU_NUMBER.search(line_raw):
+                found = ''
+                for t in list(cells) + list(buttons):
+                    if OU_NUMBER.search(t) or STAT_NUMBER.search(t):
+                        found = t.strip()
+                        break
+                if found:
+                    line_raw = found
+
+            # parse player into name/position/matchup when possible
+            player_name = ''
+            position = ''
+            matchup = ''
+            try:
+                parts = player_raw.split('\n')
+                if parts:
+                    player_name = parts[0].strip()
+                if len(parts) >= 2:
+                    if POSITION_TOKEN.search(parts[1]):
+                        position = parts[1].strip()
+                    else:
+                        matchup = parts[1].strip()
+                if len(parts) >= 3:
+                    matchup = parts[2].replace('- ', '').strip()
+            except Exception:
+                player_name = player_raw
+
+            # ensure we have a plausible player name (must contain letters)
+            if not player_name or not HAS_ALPHA.search(player_name):
+                continue
+
+            # raw cell text; compaction splits line, label and odds (prop_normalize.normalize_props)
+            props.append({
+                'player_name': player_name,
+                'position': position,
+                'matchup': matchup,
+                'bet_type': bet_raw,
+                'line': line_raw,
+                'odds': odds_raw,
+                'sportsbook': '',
+                'date_scraped': today_date
+            })
+        except Exception:
+            continue
+    return props
+
+
+def parse_cards_fallback(texts, today_date):
+    """Last-resort parser over the innerText of card-like elements (see dom_snapshot.card_texts)."""
+    candidates = []
+    for txt in texts:
+        try:
+            txt = (txt or '').strip()
+            if not txt or not STAT_WORDS.search(txt):
+                continue
+            lines = [l.strip() for l in txt.splitlines() if l.strip()]
+            # find bet line index
+            bet_idx = None
+            for i, l in enumerate(lines):
+                if OU_NUMBER.search(l) or CARD_STAT_NUMBER.search(l):
+                    bet_idx = i
+                    break
+            if bet_idx is None or bet_idx == 0:
+                continue
+            # find player name above
+            player_name = None
+            for p in range(bet_idx-1, -1, -1):
+                cand = lines[p]
+                if len(cand) < 3:
+                    continue
+                if any(x in cand.lower() for x in ['best nfl', 'prop bet', 'click to view', 'premium']):
+                    continue
+                player_name = cand
+                break
+            if not player_name:
+                continue
+            # the whole bet line ('o82.5 Rush Yds (-10.4)'), split at compaction like the table's
+            candidates.append({'player_name': player_name, 'position': '', 'matchup': '', 'bet_type': '', 'line': lines[bet_idx], 'odds': '', 'sportsbook': '', 'date_scraped': today_date})
+        except Exception:
+            continue
+    # dedupe and filter
+    seen = set()
+    out = []
+    for c in candidates:
+        name = (c.get('player_name') or '').strip()
+        # reject percent/junk names
+        if not name or not is_clean_player_name(name):
+            continue
+        key = (name.lower(), c.get('bet_type','').strip().lower(), c.get('line','').strip(), c.get('odds','').strip())
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(c)
+    return out
+
+
+def final_row(p):
+    """Final cleaning applied while compacting the checkpoint (after normalize_props);
+    returns None to drop the row."""
+    name = (p.get('player_name') or '').strip()
+    if not name or 'out of' in name.lower() or not is_clean_player_name(name):
+        return None
+    return {'player_name': name, 'position': p.get('position', ''), 'matchup': p.get('matchup', ''), 'bet_type': (p.get('bet_type') or '').strip(),
+            'line': (p.get('line') or '').strip(), 'odds': (p.get('odds') or '').strip(), 'date_scraped': p.get('date_scraped', '')}
+
+
+def compact_to_final(today_date):
+    """Produce bettingpros_prop_bets_final_{date}.csv by streaming the checkpoint through the
+    final cleaning/dedupe and mark the checkpoint complete. Returns the number of rows written
+    (0 if nothing usable)."""
+    checkpoint_path = f'Data/bettingpros_prop_bets_{today_date}.csv'
+    final_path = f'Data/bettingpros_prop_bets_final_{today_date}.csv'
+    if not os.path.exists(checkpoint_path):
+        return 0
+    # the one parsing pass over the scraped text: normalize_props, a checkpoint chunk at a time
+    written = compact_checkpoint(checkpoint_path, final_path, FINAL_FIELDS, transform=final_row, key=prop_digest,
+                                 batch=normalize_props)
+    if not written:
+        # If cleaning removed everything, try to salvage any rows that contain alphabetic player names
+        logger.info('No cleaned rows after filtering — salvaging raw extracted rows that contain letters.')
+        written = compact_checkpoint(checkpoint_path, final_path, FINAL_FIELDS,
+                                     transform=lambda r: r if HAS_ALPHA.search(r.get('player_name') or '') else None)
+    if written:
+        logger.info(f"Saved final CSV with {written} rows -> {final_path}")
+        # the run is finished: a later run today starts a new checkpoint instead of resuming this one
+        CsvCheckpoint(checkpoint_path, PROP_FIELDS).mark_complete()
+    else:
+        os.remove(final_path)
+    return written
+
+
+class FinalCsv:
+    """What a STREAM_PROPS run returns instead of a DataFrame: the final CSV's path and row
+    count. len() works like a DataFrame's; read() loads the file."""
+
+    def __init__(self, path, rows):
+        self.path = path
+        self.rows = rows
+
+    def __len__(self):
+        return self.rows
+
+    def read(self):
+        return pd.read_csv(self.path, dtype=str, keep_default_na=False)
+
+
+def scrape_bettingpros_prop_bets(driver=None, resume=None):
+    """Scrape BettingPros NFL prop bets into CSV. Pass `driver` to reuse a pooled browser
+    (it is left open); otherwise one is started and quit here. `resume` (default: the RESUME
+    env var) picks up today's unfinished checkpoint. Returns the final rows as a DataFrame,
+    or with STREAM_PROPS=true a FinalCsv."""
+    # STREAM_PROPS=true keeps no parsed rows in memory: they go straight to the checkpoint
+    stream = os.getenv('STREAM_PROPS', 'false').lower() in ('1', 'true', 'yes')
+    if os.getenv('COMPACT_ONLY', 'false').lower() in ('1', 'true', 'yes'):
+        # finish a crashed run from its checkpoint without launching a browser
+        today_date = os.getenv('SCRAPE_DATE', datetime.now().strftime('%Y-%m-%d'))
+        written = compact_to_final(today_date)
+        if not written:
+            logger.info('No checkpoint rows to compact')
+            return None
+        final_path = f'Data/bettingpros_prop_bets_final_{today_date}.csv'
+        if stream:
+            save_snapshot_csv(final_path, 'bettingpros', today_date)
+            return FinalCsv(final_path, written)
+        df = pd.read_csv(final_path, dtype=str, keep_default_na=False)
+        save_snapshot(df, 'bettingpros', today_date)
+        return df
+
+    headless = headless_from_env()
+    metrics = RunMetrics('bettingpros')
+    owns_driver = driver is None
+    if owns_driver:
+        with metrics.span('driver_startup'):
+            driver = new_driver(headless)
+    metrics.watch_driver(driver)
 
     today_date = datetime.now().strftime('%Y-%m-%d')
     os.makedirs('Data', exist_ok=True)
@@ -39,11 +411,23 @@ def scrape_bettingpros_prop_bets():
     # timing / counters
     run_start = time.perf_counter()
     total_new_rows = 0
-    logger.info(f"Starting BettingPros scrape (HEADLESS={headless}) — output dir=Data, date={today_date}")
+    checkpoint = None
+    waits = WaitStats()
+    settle_ms = int(os.getenv('SETTLE_MS', '300'))
+    candidate_table_selectors = TABLE_SELECTORS
+    logger.info(f"Starting BettingPros scrape (HEADLESS={headless}, STREAM_PROPS={stream}) — output dir=Data, date={today_date}")
 
     try:
-        driver.get("https://www.bettingpros.com/nfl/picks/prop-bets/")
-        time.sleep(3)
+        # the props table is filled from api.bettingpros.com JSON; record it as the page loads
+        mode = capture_mode()
+        recorder = ResponseRecorder(driver, BETTINGPROS_API, label='bettingpros') if mode != 'dom' else None
+        replay = SnapshotRecorder.from_env('bettingpros')
+        page_wait = float(os.getenv('PAGE_WAIT', '15'))
+        with metrics.span('page_load'):
+            driver.get(BETTINGPROS_URL)
+            wait_for_document(driver, page_wait, stats=waits)
+            wait_for_table(driver, candidate_table_selectors, page_wait, settle_ms=0, stats=waits)
+        logger.info(f"Page ready: {format_page_report(page_report(driver))}")
 
         # Minimal popup dismissal heuristics
         def click_if_text_button(txts):
@@ -64,30 +448,29 @@ def scrape_bettingpros_prop_bets():
                 pass
             return False
 
+        popup_start = time.perf_counter()
         click_if_text_button(['accept', 'accept all', 'accept cookies', 'got it', 'dismiss', 'no thanks'])
 
-        # Aggressive JS overlay removal (best-effort)
+        # Aggressive JS overlay removal (best-effort). With ads/consent scripts blocked by the
+        # lean profile only top-level overlays remain, so skip the full-document style sweep.
         try:
+            scope = "document.body.children" if browser_profile() == 'lean' else "document.querySelectorAll('div, section, aside')"
             js = """
-            Array.from(document.querySelectorAll('div, section, aside')).forEach(function(el){
+            Array.from(%s).forEach(function(el){
               try{
                 var s = window.getComputedStyle(el);
                 if ((s.position==='fixed' || s.position==='absolute') && el.offsetHeight>50 && el.offsetWidth>50) el.remove();
               }catch(e){}
             });
-            """
+            """ % scope
             driver.execute_script(js)
             logger.debug("Executed overlay removal JS")
         except Exception:
             logger.debug("Overlay removal JS failed", exc_info=True)
 
-        time.sleep(int(os.getenv('POST_POPUP_WAIT', '4')))
-
-        candidate_table_selectors = [
-            '.table-overflow--is-scrollable-vertical.props-table table',
-            'table.table.table--is-striped',
-            'table'
-        ]
+        # let the table settle after the popups/overlays went away (POST_POPUP_WAIT is the cap)
+        wait_for_table(driver, candidate_table_selectors, float(os.getenv('POST_POPUP_WAIT', '4')), settle_ms=settle_ms, stats=waits)
+        metrics.record('popup_dismissal', time.perf_counter() - popup_start)
 
         def find_scrollable_container():
             selectors = ['.table-overflow--is-scrollable-vertical.props.table', '.table-overflow--is-scrollable-vertical.props-table', '.table-overflow.props-table', '.pbcs-table__wrapper']
@@ -117,270 +500,71 @@ def scrape_bettingpros_prop_bets():
             except Exception:
                 return None
 
-        def parse_table_to_list(table_el):
-            """Robust table parser: map headers to columns, prefer cells matching patterns, and fall back to scanning row cells and buttons for line/odds and player name."""
-            props = []
-            try:
-                headers = [th.text.strip().lower() for th in table_el.find_elements(By.TAG_NAME, 'th')]
-            except Exception:
-                headers = []
-            try:
-                rows = table_el.find_elements(By.TAG_NAME, 'tr')
-            except Exception:
-                rows = []
-
-            # Build header map by keywords
-            header_map = {}
-            for i, h in enumerate(headers):
-                if 'player' in h or 'name' in h:
-                    header_map['player'] = i
-                elif 'prop' in h or 'bet' in h or 'type' in h:
-                    header_map['bet_type'] = i
-                elif 'line' in h or 'o/u' in h or 'over' in h or 'under' in h:
-                    header_map['line'] = i
-                elif 'odd' in h or 'odds' in h:
-                    header_map['odds'] = i
-
-            start = 1 if rows and headers else 0
-
-            for row in rows[start:]:
-                try:
-                    cells = row.find_elements(By.TAG_NAME, 'td')
-                    # helper to safely read cell text
-                    def ct(idx):
-                        try:
-                            return cells[idx].text.strip()
-                        except Exception:
-                            return ''
-
-                    # Primary reads using header mapping
-                    player_raw = ct(header_map.get('player', 0))
-                    bet_raw = ct(header_map.get('bet_type', 1))
-                    line_raw = ct(header_map.get('line', 2))
-                    odds_raw = ct(header_map.get('odds', 3))
-
-                    # If player_raw looks like junk (percent/no letters), try to find the first cell with letters
-                    def first_alpha_cell():
-                        for c in cells:
-                            try:
-                                t = c.text.strip()
-                                if t and re.search(r'[A-Za-z]', t):
-                                    return t
-                            except Exception:
-                                continue
-                        return ''
-
-                    if (not player_raw) or re.search(r'\d+%', player_raw) or not re.search(r'[A-Za-z]', player_raw):
-                        alt = first_alpha_cell()
-                        if alt:
-                            player_raw = alt
-
-                    # If odds_raw missing, scan row cells for parentheses or button text
-                    if not odds_raw:
-                        # look for parentheses in any cell
-                        for c in cells:
-                            try:
-                                t = c.text or ''
-                                m = re.search(r'\(([^)]+)\)', t)
-                                if m:
-                                    odds_raw = m.group(1).strip()
-                                    break
-                            except Exception:
-                                continue
-                        # fallback: look for button text inside the row
-                        if not odds_raw:
-                            try:
-                                btns = row.find_elements(By.XPATH, ".//button")
-                                for b in btns:
-                                    try:
-                                        bt = (b.text or '').strip()
-                                        m = re.search(r'\(([^)]+)\)', bt)
-                                        if m:
-                                            odds_raw = m.group(1).strip()
-                                            # also consider bet text from button (e.g., 'O 220.5')
-                                            if not line_raw or not re.search(r'[ou]\s*\d', line_raw, re.I):
-                                                # try to extract O/U and value
-                                                m2 = re.search(r'\b([OUou])\s*([\d\.]+)', bt)
-                                                if m2:
-                                                    line_raw = (m2.group(1) + ' ' + m2.group(2)).strip()
-                                            break
-                                    except Exception:
-                                        continue
-                            except Exception:
-                                pass
-
-                    # If line_raw missing, scan cells/buttons for o/u or numeric patterns
-                    if not line_raw or not re.search(r'[ou]\s*\d', line_raw, re.I):
-                        found = ''
-                        for c in cells:
-                            try:
-                                t = c.text or ''
-                                if re.search(r'[ou]\s*\d', t, re.I) or re.search(r'\d+\.?\d*\s*(Pass|Rush|Rec|Yds|Yards|TD)', t, re.I):
-                                    found = t.strip()
-                                    break
-                            except Exception:
-                                continue
-                        if not found:
-                            try:
-                                btns = row.find_elements(By.XPATH, ".//button")
-                                for b in btns:
-                                    try:
-                                        bt = b.text or ''
-                                        if re.search(r'[ou]\s*\d', bt, re.I) or re.search(r'\d+\.?\d*\s*(Pass|Rush|Rec|Yds|Yards|TD)', bt, re.I):
-                                            found = bt.strip()
-                                            break
-                                    except Exception:
-                                        continue
-                            except Exception:
-                                pass
-                        if found:
-                            line_raw = found
-
-                    # parse player into name/position/matchup when possible
-                    player_name = ''
-                    position = ''
-                    matchup = ''
-                    try:
-                        parts = player_raw.split('\n')
-                        if parts:
-                            player_name = parts[0].strip()
-                        if len(parts) >= 2:
-                            if re.search(r'\b(QB|RB|WR|TE|K|PK|DEF)\b', parts[1], re.I):
-                                position = parts[1].strip()
-                            else:
-                                matchup = parts[1].strip()
-                        if len(parts) >= 3:
-                            matchup = parts[2].replace('- ', '').strip()
-                    except Exception:
-                        player_name = player_raw
-
-                    # final normalization for odds and line
-                    odds_val = ''
-                    if odds_raw:
-                        m_odds = re.search(r'\(([^)]+)\)', odds_raw)
-                        if m_odds:
-                            odds_val = m_odds.group(1).strip()
-                        else:
-                            odds_val = odds_raw.strip()
-
-                    line_val = ''
-                    bet_type_val = ''
-                    if line_raw:
-                        txt = re.sub(r'\([^)]*\)', '', line_raw).strip()
-                        m = re.match(r'([ouOUn]?[\d\.\-]+)\s*(.*)', txt)
-                        if m:
-                            line_val = m.group(1).strip()
-                            bet_type_val = m.group(2).strip()
-                        else:
-                            mn = re.search(r'([OUou]?\s*[\d\.]+)', txt)
-                            if mn:
-                                line_val = mn.group(1).strip()
-                            bet_type_val = txt
-
-                    # ensure we have a plausible player name (must contain letters)
-                    if not player_name or not re.search(r'[A-Za-z]', player_name):
-                        continue
-
-                    props.append({
-                        'player_name': player_name,
-                        'position': position,
-                        'matchup': matchup,
-                        'bet_type': bet_type_val or bet_raw,
-                        'line': line_val,
-                        'odds': odds_val,
-                        'sportsbook': '',
-                        'date_scraped': today_date
-                    })
-                except Exception:
-                    continue
-            return props
-
-        def parse_cards_fallback():
-            candidates = []
-            try:
-                elems = driver.find_elements(By.CSS_SELECTOR, 'main div, .pbcs-content-container div, article, li')
-            except Exception:
-                elems = []
-            patterns = re.compile(r'\b(pass|rush|receiv|rec|td|yards|yds|receptions|passing)\b', re.I)
-            for el in elems:
-                try:
-                    txt = el.text.strip()
-                    if not txt or not patterns.search(txt):
-                        continue
-                    lines = [l.strip() for l in txt.splitlines() if l.strip()]
-                    # find bet line index
-                    bet_idx = None
-                    for i, l in enumerate(lines):
-                        if re.search(r'[ou]\s*\d', l, re.I) or re.search(r'\d+\.?\d*\s*(Pass|Rush|Rec|Yds|Yards)', l, re.I):
-                            bet_idx = i
-                            break
-                    if bet_idx is None or bet_idx == 0:
-                        continue
-                    # find player name above
-                    player_name = None
-                    for p in range(bet_idx-1, -1, -1):
-                        cand = lines[p]
-                        if len(cand) < 3:
-                            continue
-                        if any(x in cand.lower() for x in ['best nfl', 'prop bet', 'click to view', 'premium']):
-                            continue
-                        player_name = cand
-                        break
-                    if not player_name:
-                        continue
-                    bet_line = lines[bet_idx]
-                    odds = ''
-                    m = re.search(r'\(([^)]+)\)', bet_line)
-                    if m:
-                        odds = m.group(1).strip()
-                    bet_text = re.sub(r'\([^)]*\)', '', bet_line).strip()
-                    mm = re.match(r'([ouOUn]?[\d\.\-]+)\s*(.*)', bet_text)
-                    line = ''
-                    bet_type = bet_text
-                    if mm:
-                        line = mm.group(1).strip()
-                        bet_type = mm.group(2).strip()
-                    candidates.append({'player_name': player_name, 'position': '', 'matchup': '', 'bet_type': bet_type, 'line': line, 'odds': odds, 'sportsbook': '', 'date_scraped': today_date})
-                except Exception:
-                    continue
-            # dedupe and filter
-            seen = set()
-            out = []
-            for c in candidates:
-                name = (c.get('player_name') or '').strip()
-                # reject percent/junk names
-                if not name or re.search(r'\d+%', name) or 'click to view' in name.lower() or not re.search(r'[A-Za-z]', name):
-                    continue
-                key = (name.lower(), c.get('bet_type','').strip().lower(), c.get('line','').strip(), c.get('odds','').strip())
-                if key in seen:
-                    continue
-                seen.add(key)
-                out.append(c)
-            return out
-
-        # scrolling loop
-        container = find_scrollable_container()
+        acc = StreamingPropAccumulator() if stream else PropAccumulator()
+        checkpoint = CsvCheckpoint(f'Data/bettingpros_prop_bets_{today_date}.csv', PROP_FIELDS, batch_size=int(os.getenv('CHECKPOINT_BATCH', '25')))
+        if resume is None:
+            resume = os.getenv('RESUME', 'true').lower() in ('1', 'true', 'yes')
+        if checkpoint.is_complete() or not resume:
+            # an earlier run today finished (or resuming is off); its (possibly moved) lines would
+            # come ahead of this run's in the final CSV, so start a new checkpoint
+            if os.path.exists(checkpoint.path):
+                logger.info(f"Not resuming {checkpoint.path}; starting a new checkpoint")
+            checkpoint.reset()
+        else:
+            resumed = checkpoint.load()
+            for batch in iter(lambda: list(islice(resumed, 1000)), []):
+                acc.add(batch)
+            acc.drain()  # already on disk
+            if acc.rows_new:
+                logger.info(f"Resumed {acc.rows_new} rows from checkpoint {checkpoint.path}")
+
+        # each captured page goes through the accumulator and into the checkpoint as it is decoded
+        xhr_rows = 0
+        if recorder is not None:
+            with metrics.span('xhr_capture') as span:
+                pages = 0
+                for page in iter_bettingpros_pages(recorder, today_date, float(os.getenv('XHR_WAIT', '10')), stats=waits, release=stream):
+                    pages += 1
+                    xhr_rows += len(page)
+                    new = len(acc.add(page))
+                    total_new_rows += new
+                    metrics.count('rows_seen', len(page))
+                    metrics.count('rows_kept', new)
+                    checkpoint.append(acc.drain())
+                span['rows'] = xhr_rows
+            recorder.close()
+            logger.info(f"XHR capture: {xhr_rows} rows from {pages} payloads")
+            if not xhr_rows and mode == 'auto':
+                logger.info("No props captured from XHR; falling back to DOM scrolling")
+
+        # scrolling loop (skipped when the XHR capture already produced the table)
+        container = find_scrollable_container() if not xhr_rows and mode != 'xhr' else None
         max_scrolls = int(os.getenv('MAX_SCROLLS', '40'))
-        increment_wait = int(os.getenv('SCROLL_WAIT', '6'))
-        prop_bets = []
+        increment_wait = float(os.getenv('SCROLL_WAIT', '6'))
+        if xhr_rows or mode == 'xhr':
+            max_scrolls = 0
         last_row_count = 0
         consecutive_no_growth = 0
         for i in range(max_scrolls):
             loop_start = time.perf_counter()
             try:
+                try:
+                    before = probe_table(driver, candidate_table_selectors, container)
+                except Exception:
+                    before = None
                 if container:
-                    client_h = driver.execute_script('return arguments[0].clientHeight;', container)
-                    scroll_top = driver.execute_script('return arguments[0].scrollTop;', container)
-                    scroll_height = driver.execute_script('return arguments[0].scrollHeight;', container)
+                    client_h, scroll_top, scroll_height = driver.execute_script('var c = arguments[0]; return [c.clientHeight, c.scrollTop, c.scrollHeight];', container)
                     next_top = scroll_top + client_h
                     if next_top + 60 >= scroll_height:
                         driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight;', container)
-                        time.sleep(increment_wait)
                     else:
                         driver.execute_script('arguments[0].scrollTop = arguments[1];', container, next_top)
                 else:
                     driver.execute_script('window.scrollBy(0, Math.max(window.innerHeight*0.35, 300));')
-                time.sleep(increment_wait)
+                # wait for new rows / a taller scroller and a quiet table instead of a fixed sleep (SCROLL_WAIT is the cap)
+                wait_start = time.perf_counter()
+                wait_for_table(driver, candidate_table_selectors, increment_wait, changed_from=before, scroller=container, settle_ms=settle_ms, stats=waits)
+                wait_elapsed = time.perf_counter() - wait_start
 
                 # attempt table parse
                 table = None
@@ -391,59 +575,63 @@ def scrape_bettingpros_prop_bets():
                             break
                     except Exception:
                         continue
+                table_rows = 0
                 if table:
                     parse_start = time.perf_counter()
-                    current = parse_table_to_list(table)
+                    try:
+                        html = snapshot_html(driver, table, acc.next_row)
+                        snapshot = table_snapshot_from_html(html)
+                        if acc.is_stale(snapshot):
+                            logger.debug(f"Table re-rendered (total_rows={snapshot['total_rows']}, start={snapshot['start']}); rescanning from row 0")
+                            acc.reset_position()
+                            html = snapshot_html(driver, table, 0)
+                            snapshot = table_snapshot_from_html(html)
+                        if replay is not None:
+                            replay.save(f"scroll_{i + 1:03d}.html", html)
+                    except Exception:
+                        logger.debug("Table snapshot failed", exc_info=True)
+                        snapshot = table_snapshot_from_html('')
+                    table_rows = snapshot['total_rows']
+                    current = parse_table_to_list(snapshot, today_date)
+                    acc.advance(snapshot)
                     parse_elapsed = time.perf_counter() - parse_start
-                    # merge dedupe
-                    ek = set((p['player_name'].strip().lower(), p['bet_type'].strip().lower(), p['line'].strip(), p['odds'].strip()) for p in prop_bets)
-                    new = 0
-                    for p in current:
-                        # skip junk
-                        if not p.get('player_name'):
-                            continue
-                        if (p['player_name'].strip().lower(), p['bet_type'].strip().lower(), p['line'].strip(), p['odds'].strip()) not in ek:
-                            prop_bets.append(p)
-                            ek.add((p['player_name'].strip().lower(), p['bet_type'].strip().lower(), p['line'].strip(), p['odds'].strip()))
-                            new += 1
+                    metrics.record('parse', parse_elapsed, scroll=i + 1, rows=len(current))
+                    # merge dedupe: only rows past the previous position were parsed
+                    new = len(acc.add(current))
                     total_new_rows += new
+                    metrics.count('rows_seen', len(current))
+                    metrics.count('rows_kept', new)
                     loop_elapsed = time.perf_counter() - loop_start
-                    # ensure we have row count for logging/growth checks
-                    try:
-                        rows = table.find_elements(By.TAG_NAME, 'tr') if table else []
-                    except Exception:
-                        rows = []
-                    logger.info(f"Scroll {i+1}/{max_scrolls}: rows_on_table={len(rows) if table else 'N/A'}, new_added={new}, total_props={len(prop_bets)}, parse_time={parse_elapsed:.2f}s, loop_time={loop_elapsed:.2f}s")
+                    metrics.record('scroll', loop_elapsed, scroll=i + 1, wait_ms=round(wait_elapsed * 1000, 1), rows_on_table=table_rows, new=new)
+                    logger.info(f"Scroll {i+1}/{max_scrolls}: rows_on_table={table_rows}, rows_parsed={len(current)}, new_added={new}, total_props={acc.rows_new}, wait_time={wait_elapsed:.2f}s, parse_time={parse_elapsed:.3f}s, loop_time={loop_elapsed:.2f}s")
                     if new:
-                        # save partial cleaned
-                        cleaned = [r for r in prop_bets if not re.search(r'\d+%', (r.get('player_name') or '')) and 'click to view' not in (r.get('player_name') or '').lower() and re.search(r'[A-Za-z]', (r.get('player_name') or ''))]
+                        # append only the newly cleaned rows to the checkpoint
                         try:
-                            pd.DataFrame(cleaned).to_csv(f'Data/bettingpros_prop_bets_{today_date}.csv', index=False)
-                            logger.info(f"Saved partial cleaned CSV with {len(cleaned)} rows -> Data/bettingpros_prop_bets_{today_date}.csv")
+                            cleaned = acc.drain()
+                            with metrics.span('write', target='checkpoint', rows=len(cleaned)):
+                                checkpoint.append(cleaned)
+                            logger.debug(f"Checkpoint: {checkpoint.rows_written} rows on disk, {len(checkpoint.pending)} pending -> {checkpoint.path}")
                         except Exception:
-                            logger.exception("Failed to save partial CSV")
+                            logger.exception("Failed to append to checkpoint")
 
                 # stop conditions based on growth
-                # rows already computed above when table was present; ensure it's defined
-                try:
-                    rows = rows if 'rows' in locals() else (table.find_elements(By.TAG_NAME, 'tr') if table else [])
-                except Exception:
-                    rows = []
-                if len(rows) == last_row_count:
+                if table_rows == last_row_count:
                     consecutive_no_growth += 1
                     if consecutive_no_growth >= 4:
                         logger.debug("No growth on table rows for several iterations, breaking scroll loop")
                         break
                 else:
-                    last_row_count = len(rows)
+                    last_row_count = table_rows
                     consecutive_no_growth = 0
             except Exception:
                 logger.exception("Exception in scroll loop, aborting")
                 break
 
+        logger.info(f"Scroll loop done: rows_parsed={acc.rows_parsed}, rows_new={acc.rows_new}")
+
         # after scrolling and incremental parsing, save debug artifacts if nothing was captured
         try:
-            if not prop_bets:
+            if not acc.rows_new:
                 html_path = f'Data/debug_page_after_scroll_{today_date}.html'
                 png_path = f'Data/debug_screenshot_after_scroll_{today_date}.png'
                 try:
@@ -461,72 +649,82 @@ def scrape_bettingpros_prop_bets():
             logger.exception("Failed during debug artifact saving")
 
         # if collected nothing from table, try card fallback
-        if not prop_bets:
-            cards = parse_cards_fallback()
-            if cards:
-                prop_bets = cards
-
-        # final cleaning/dedupe
-        final = []
-        seen = set()
-        for p in prop_bets:
+        if replay is not None:
             try:
-                name = (p.get('player_name') or '').strip()
-                bet = (p.get('bet_type') or '').strip()
-                line = (p.get('line') or '').strip()
-                odds = (p.get('odds') or '').strip()
-                if not name:
-                    continue
-                if re.search(r'\d+%', name) or 'click to view' in name.lower() or 'out of' in name.lower() or not re.search(r'[A-Za-z]', name):
-                    continue
-                key = (name.lower(), bet.lower(), line, odds)
-                if key in seen:
-                    continue
-                seen.add(key)
-                final.append({'player_name': name, 'position': p.get('position',''), 'matchup': p.get('matchup',''), 'bet_type': bet, 'line': line, 'odds': odds, 'date_scraped': today_date})
+                replay.save('page.html', driver.page_source)
             except Exception:
-                continue
-
-        # If cleaning removed everything, try to salvage any raw rows that contain alphabetic player names
-        if not final:
-            salvage = [p for p in prop_bets if re.search(r'[A-Za-z]', (p.get('player_name') or ''))]
-            if salvage:
-                logger.info('No cleaned rows after filtering — salvaging raw extracted rows that contain letters.')
-                final = salvage
-            else:
-                # save raw debug CSV so you can inspect what was extracted
-                if prop_bets:
-                    try:
-                        pd.DataFrame(prop_bets).to_csv(f'Data/bettingpros_prop_bets_raw_{today_date}.csv', index=False)
-                        logger.info(f"No salvageable rows; raw extraction saved to Data/bettingpros_prop_bets_raw_{today_date}.csv")
-                    except Exception:
-                        logger.exception("Failed saving raw extraction CSV")
-                else:
-                    logger.info('No prop_bets captured at all during extraction.')
-                return None
-
-        if final:
-            df = pd.DataFrame(final)
+                logger.debug("Failed saving page snapshot", exc_info=True)
+        if not acc.rows_new:
             try:
-                df.to_csv(f'Data/bettingpros_prop_bets_final_{today_date}.csv', index=False)
-                logger.info(f"Saved final CSV with {len(df)} rows -> Data/bettingpros_prop_bets_final_{today_date}.csv")
+                texts = card_texts(driver)
             except Exception:
-                logger.exception("Failed saving final CSV")
-            total_elapsed = time.perf_counter() - run_start
-            logger.info(f"Scrape complete: total_rows={len(df)}, total_new_rows_added={total_new_rows}, elapsed={total_elapsed:.2f}s")
-            return df
-        else:
-            logger.info('No prop bets found')
+                texts = []
+            with metrics.span('parse', fallback='cards') as span:
+                cards = parse_cards_fallback(texts, today_date)
+                span['rows'] = len(cards)
+            metrics.count('rows_seen', len(cards))
+            if cards:
+                acc.add(cards)
+                checkpoint.append(acc.drain())
+
+        try:
+            checkpoint.close()
+        except Exception:
+            logger.exception("Failed to flush checkpoint")
+        logger.info(f"Network: {format_page_report(page_report(driver))}")
+
+        # final cleaning/dedupe by compacting the checkpoint
+        with metrics.span('write', target='final') as span:
+            written = span['rows'] = compact_to_final(today_date)
+        if not written:
+            # save raw debug CSV so you can inspect what was extracted
+            if acc.rows:
+                try:
+                    pd.DataFrame(acc.rows).to_csv(f'Data/bettingpros_prop_bets_raw_{today_date}.csv', index=False)
+                    logger.info(f"No salvageable rows; raw extraction saved to Data/bettingpros_prop_bets_raw_{today_date}.csv")
+                except Exception:
+                    logger.exception("Failed saving raw extraction CSV")
+            elif acc.rows_new:
+                logger.info(f"No salvageable rows among {acc.rows_new} extracted; streaming mode keeps no raw rows (rerun with STREAM_PROPS=false to save them)")
+            else:
+                logger.info('No prop_bets captured at all during extraction.')
             return None
 
+        final_path = f'Data/bettingpros_prop_bets_final_{today_date}.csv'
+        with metrics.span('write', target='store', rows=written):
+            if stream:
+                # the store and the line log read the final CSV in chunks / row by row
+                result = FinalCsv(final_path, written)
+                save_snapshot_csv(final_path, 'bettingpros', today_date)
+                with open(final_path, newline='', encoding='utf-8') as f:
+                    changes = record_snapshot(csv.DictReader(f))
+            else:
+                result = pd.read_csv(final_path, dtype=str, keep_default_na=False)
+                save_snapshot(result, 'bettingpros', today_date)
+                changes = record_snapshot(result)
+        logger.info(f"Line changes since last scrape: {changes['moved']} moved, {changes['new']} new")
+        total_elapsed = time.perf_counter() - run_start
+        logger.info(f"Scrape complete: total_rows={written}, total_new_rows_added={total_new_rows}, elapsed={total_elapsed:.2f}s ({waits.summary()})")
+        return result
+
     except Exception as e:
         logger.exception(f'Error during scrape: {e}')
         return None
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        if checkpoint is not None:
+            try:
+                checkpoint.close()
+            except Exception:
+                logger.exception("Failed to flush checkpoint")
+        peak = peak_rss_mb()
+        if peak is not None:
+            logger.info(f"Peak RSS: {peak:.1f}MB (STREAM_PROPS={stream})")
+        metrics.close(peak_rss_mb=round(peak, 1) if peak is not None else None, stream=stream)
+        if owns_driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
 
 
 if __name__ == '__main__':
@@ -1,66 +1,79 @@
-import pandas as pd
-import requests
 from datetime import datetime
 import os
+from http_fetch import CACHE_PATH
+from ingest import FeedSource, ingest, register
+from metrics import RunMetrics
 
-def download_boris_chen_csv_files():
+BORIS_BASE_URL = 'https://s3-us-west-1.amazonaws.com/fftiers/out'
+# scoring format -> (file under BORIS_BASE_URL, display name)
+CSV_FILES = {
+    'standard': ('weekly-ALL.csv', 'Standard'),
+    'ppr': ('weekly-ALL-PPR.csv', 'PPR'),
+    'half_ppr': ('weekly-ALL-HALF-PPR.csv', 'Half PPR'),
+}
+
+def boris_sources(base_url=None):
+    """One ingest.FeedSource per scoring format, tagged with scoring_format/date_scraped columns."""
+    base_url = (base_url or os.getenv('BORIS_BASE_URL', BORIS_BASE_URL)).rstrip('/')
+    return [
+        FeedSource(
+            f'boris_{format_key}',
+            f'{base_url}/{csv_file}',
+            f'Data/boris_chen_{format_key}_{{date}}.csv',
+            extra_columns={'scoring_format': name, 'date_scraped': '{date}'},
+            schema='boris',
+            store='boris',
+            partition=format_key,
+            label=name,
+        )
+        for format_key, (csv_file, name) in CSV_FILES.items()
+    ]
+
+for _source in boris_sources():
+    register(_source)
+
+def download_boris_chen_csv_files(base_url=None, cache_path=None):
     """
-    Downloads Boris Chen draft sheets directly from CSV links
+    Downloads Boris Chen draft sheets directly from CSV links.
+
+    All scoring formats are fetched concurrently through ingest.ingest. Files whose
+    ETag/Last-Modified have not changed since the last run are skipped (HTTP 304).
+    `base_url` (or BORIS_BASE_URL) can point at a local stand-in server.
     """
-    
     # Get today's date
     today_date = datetime.now().strftime('%Y-%m-%d')
     
     # Create Data directory if it doesn't exist
     os.makedirs('Data', exist_ok=True)
     
-    # Define the CSV URLs and output filenames
-    csv_sources = {
-        'standard': {
-            'url': 'https://s3-us-west-1.amazonaws.com/fftiers/out/weekly-ALL.csv',
-            'filename': f'Data/boris_chen_standard_{today_date}.csv',
-            'name': 'Standard'
-        },
-        'ppr': {
-            'url': 'https://s3-us-west-1.amazonaws.com/fftiers/out/weekly-ALL-PPR.csv',
-            'filename': f'Data/boris_chen_ppr_{today_date}.csv',
-            'name': 'PPR'
-        },
-        'half_ppr': {
-            'url': 'https://s3-us-west-1.amazonaws.com/fftiers/out/weekly-ALL-HALF-PPR.csv',
-            'filename': f'Data/boris_chen_half_ppr_{today_date}.csv',
-            'name': 'Half PPR'
-        }
-    }
-    
+    sources = boris_sources(base_url)
     all_data = {}
+    metrics = RunMetrics('boris')
+    
+    # Metadata columns are added while each response streams to disk
+    print(f"\nDownloading {', '.join(source.label for source in sources)} data...")
+    results = ingest(sources, cache_path=cache_path or CACHE_PATH, today=today_date, metrics=metrics)
     
-    for format_key, format_info in csv_sources.items():
-        print(f"\nDownloading {format_info['name']} data...")
+    for source in sources:
+        format_key = source.partition
+        print(f"\n{source.label}:")
         
         try:
-            # Download the CSV file
-            response = requests.get(format_info['url'])
-            response.raise_for_status()
-            
-            # Save the raw CSV
-            with open(format_info['filename'], 'wb') as f:
-                f.write(response.content)
-            
-            # Read the CSV into a DataFrame
-            df = pd.read_csv(format_info['filename'])
-            
-            # Add metadata columns
-            df['scoring_format'] = format_info['name']
-            df['date_scraped'] = today_date
-            
-            # Save the enhanced CSV
-            df.to_csv(format_info['filename'], index=False)
-            
+            result = results[source.name]
+            if result['status'] == 'failed':
+                print(f"  ❌ Error downloading {source.label}: {result['error']}")
+                continue
+            df = result['frame']
             all_data[format_key] = df
+            metrics.count('rows_seen', len(df))
+            metrics.count('rows_kept', len(df))
+            
+            if result['status'] == 'unchanged':
+                print(f"  ⏭️  Unchanged since last download, skipped ({len(df)} players in {result['filename']})")
+                continue
             
-            print(f"  ✅ Downloaded {len(df)} players for {format_info['name']}")
-            print(f"  📄 Saved to {format_info['filename']}")
+            print(f"  ✅ Downloaded {len(df)} players for {source.label}")
+            print(f"  📄 Saved to {result['filename']}")
             
             # Show column names
             print(f"  Columns: {', '.join(df.columns[:6])}...")
@@ -77,11 +90,10 @@ def download_boris_chen_csv_files():
                 # Fallback: just show first few columns
                 print(df.iloc[:3, :4].to_string(index=False))
             
-        except requests.exceptions.RequestException as e:
-            print(f"  ❌ Error downloading {format_info['name']}: {e}")
         except Exception as e:
-            print(f"  ❌ Error processing {format_info['name']}: {e}")
+            print(f"  ❌ Error processing {source.label}: {e}")
     
+    metrics.close()
     print(f"\n📅 All data downloaded on: {today_date}")
     print(f"✅ Download complete!")
     
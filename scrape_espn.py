@@ -1,36 +1,264 @@
 import pandas as pd
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from lxml import html as lxml_html
+from browser import DriverPool, format_page_report, new_driver, page_report
+from dom_snapshot import SnapshotRecorder, inner_text, snapshot_html
+from loader import coerce
+from metrics import RunMetrics
+from store import save_snapshot
+from xhr_capture import ESPN_API, ResponseRecorder, capture_mode, collect_espn
+from waits import WaitStats, probe_table, wait_for_table
 
-def scrape_espn_draft_trends():
+ESPN_URL = "https://fantasy.espn.com/football/livedraftresults"
+TABLE_SELECTORS = ['.Table__TBODY']
+
+# Numbered pagination buttons: every page number shown and the active one
+PAGINATION_JS = """
+var pages = [], active = null;
+document.querySelectorAll('.Pagination__list__item').forEach(function (li) {
+  var n = parseInt(li.textContent.trim(), 10);
+  if (isNaN(n)) return;
+  pages.push(n);
+  if (/--active/.test(li.className)) active = n;
+});
+return {pages: pages, active: active};
+"""
+
+# Click page arguments[0] if its button is shown, else the shown page closest to it
+GOTO_PAGE_JS = """
+var target = arguments[0], best = null, bestEl = null;
+document.querySelectorAll('.Pagination__list__item').forEach(function (li) {
+  var n = parseInt(li.textContent.trim(), 10);
+  if (isNaN(n)) return;
+  if (best === null || Math.abs(target - n) < Math.abs(target - best)) { best = n; bestEl = li; }
+});
+if (bestEl === null) return null;
+(bestEl.querySelector('a, button') || bestEl).click();
+return best;
+"""
+
+def parse_espn_rows(html, today_date):
     """
-    Scrapes ESPN Fantasy Football live draft results and saves to CSV
+    Parses one page of the live draft results table (as returned by dom_snapshot.snapshot_html,
+    or a saved copy of it) into player dicts
     """
+    try:
+        root = lxml_html.fromstring(html)
+    except Exception:
+        return []
     
-    # Configure Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')  # Run in background
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
+    players = []
+    for row in root.xpath("//tr[contains(concat(' ', normalize-space(@class), ' '), ' Table__TR--sm ')]"):
+        try:
+            cells = list(row.iter('td'))
+            
+            if len(cells) >= 4:  # Ensure we have enough data
+                # Cell 0: Rank
+                rank = inner_text(cells[0])
+                
+                # Cell 1: Player name, team, and position all together
+                player_cell = cells[1]
+                
+                # Get player name (in the link)
+                links = player_cell.xpath(".//a[contains(concat(' ', normalize-space(@class), ' '), ' AnchorLink ')]")
+                player_name = inner_text(links[0]) if links else ""
+                
+                # Get team and position from the full text
+                team = ""
+                position = ""
+                # Remove the player name from the full text to get team/position
+                remaining_text = inner_text(player_cell).replace(player_name, "").strip()
+                
+                # The remaining text should be like "Cin WR"
+                if remaining_text:
+                    parts = remaining_text.split()
+                    if len(parts) >= 2:
+                        team = parts[0]
+                        position = parts[1]
+                    elif len(parts) == 1:
+                        # Sometimes it might just be position
+                        position = parts[0]
+                
+                # Cell 2: ADP (Average Draft Position)
+                adp = inner_text(cells[2])
+                
+                # Cell 3: 7 Day +/- (this is what was showing in avg_round)
+                seven_day_change = inner_text(cells[3])
+                
+                if player_name:  # Only add valid entries
+                    players.append({
+                        'rank': rank,
+                        'player_name': player_name,
+                        'team': team,
+                        'position': position,
+                        'adp': adp,
+                        'seven_day_change': seven_day_change,
+                        'date_scraped': today_date
+                    })
+                    
+        except Exception:
+            continue  # Skip rows that don't match expected format
     
-    # Initialize the driver
-    driver = webdriver.Chrome(options=chrome_options)
+    return players
+
+def rank_key(player):
+    try:
+        return int(player['rank'])
+    except (TypeError, ValueError):
+        return float('inf')
+
+
+def goto_page(driver, target, waits, max_steps=20):
+    """Walk the numbered pagination to page `target`, a few pages per click when its button
+    is not shown yet. Returns False if the page does not exist."""
+    current = (driver.execute_script(PAGINATION_JS) or {}).get('active') or 1
+    for _ in range(max_steps):
+        if current == target:
+            return True
+        before = probe_table(driver, TABLE_SELECTORS)
+        clicked = driver.execute_script(GOTO_PAGE_JS, target)
+        if clicked is None or clicked == current:
+            return False
+        wait_for_table(driver, TABLE_SELECTORS, 10, changed_from=before, settle_ms=300, stats=waits)
+        current = clicked
+    return False
+
+
+def scrape_pages(driver, pages, today_date, waits, metrics=None, replay=None, load=False):
+    """Parse result pages `pages` (ascending) in one browser; `load` opens the results page
+    first (a fresh browser). Stops at the first page that does not exist or is empty."""
+    if load:
+        driver.get(ESPN_URL)
+        wait_for_table(driver, TABLE_SELECTORS, 15, settle_ms=300, stats=waits)
+    players = []
+    for page in pages:
+        page_start = time.perf_counter()
+        if not goto_page(driver, page, waits):
+            break
+        html = snapshot_html(driver, driver.find_element(By.CSS_SELECTOR, ".Table__TBODY"))
+        if replay is not None:
+            replay.save(f"page_{page:03d}.html", html)
+        page_players = parse_espn_rows(html, today_date)
+        players.extend(page_players)
+        if metrics is not None:
+            metrics.count('rows_seen', len(page_players))
+            metrics.record('page', time.perf_counter() - page_start, page=page, rows=len(page_players))
+        if not page_players:
+            break
+    return players
+
+
+def _scrape_pages_pooled(pool, pages, today_date, metrics, replay):
+    waits = WaitStats()
+    wait_start = time.perf_counter()
+    try:
+        with pool.acquire(timeout=float(os.getenv('ESPN_BROWSER_WAIT', '30'))) as driver:
+            metrics.record('driver_acquire', time.perf_counter() - wait_start)
+            players = scrape_pages(driver, pages, today_date, waits, metrics, replay, load=True)
+    except Exception as e:
+        print(f"  ⚠️ Pages {pages} failed: {e}")
+        return []
+    print(f"  Pages {pages[0]}..{pages[-1]}: {len(players)} players ({waits.summary()})")
+    return players
+
+
+def paginate_parallel(driver, today_date, max_players, browsers, waits, metrics, replay=None, pool=None):
+    """Scrape the result pages with `browsers` browsers at once: this driver (already on
+    page 1) plus browsers - 1 taken from `pool` (a private pool when None). Page p goes to
+    browser p % browsers, so each walks forward through the numbered pagination, and the rows
+    are merged by rank. One WebDriver session runs commands one at a time, so parallel tabs
+    need separate browsers. A browser the pool can't hand out within ESPN_BROWSER_WAIT seconds
+    leaves its pages missing.
+
+    The page count is the highest page number the pagination shows, capped by the pages
+    `max_players` needs. The widget may not show the last page, so when every page came back
+    full this browser keeps going past it until a page is missing or empty. Returns None
+    (with this driver back on page 1) when the page count can't be read or a page is missing
+    from the merge, so the caller pages serially."""
+    html = snapshot_html(driver, driver.find_element(By.CSS_SELECTOR, ".Table__TBODY"))
+    if replay is not None:
+        replay.save("page_001.html", html)
+    first = parse_espn_rows(html, today_date)
+    shown = (driver.execute_script(PAGINATION_JS) or {}).get('pages') or []
+    if not first or not shown:
+        return None
+    metrics.count('rows_seen', len(first))
+    needed = -(-max_players // len(first))
+    page_count = min(max(shown), needed)
+    pages = list(range(2, page_count + 1))
+    chunks = [pages[i::browsers] for i in range(browsers)]
+    print(f"{page_count} pages of {len(first)} players across {browsers} browsers")
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(size=browsers - 1, factory=new_driver)
+    try:
+        with ThreadPoolExecutor(max_workers=browsers) as executor:
+            own = executor.submit(scrape_pages, driver, chunks[0], today_date, waits, metrics, replay)
+            others = [executor.submit(_scrape_pages_pooled, pool, chunk, today_date, metrics, replay) for chunk in chunks[1:] if chunk]
+            players = first + own.result() + [p for f in others for p in f.result()]
+    finally:
+        if own_pool:
+            pool.close()
+    # every page before the last one is full
+    expected = min(max_players, (page_count - 1) * len(first) + 1)
+    if len(players) < expected:
+        print(f"  Parallel pages returned {len(players)} of at least {expected} players")
+        driver.get(ESPN_URL)
+        wait_for_table(driver, TABLE_SELECTORS, 15, settle_ms=300, stats=waits)
+        return None
+    if page_count < needed and len(players) >= page_count * len(first):
+        more = scrape_pages(driver, range(page_count + 1, needed + 1), today_date, waits, metrics, replay)
+        print(f"  Pages past {page_count}: {len(more)} players")
+        players += more
+    return sorted(players, key=rank_key)
+
+
+def scrape_espn_draft_trends(driver=None, pool=None):
+    """
+    Scrapes ESPN Fantasy Football live draft results and saves to CSV.
+    Pass `driver` to reuse a pooled browser; it is left open for the caller. With
+    ESPN_BROWSERS > 1 the extra browsers come from `pool` (the caller's DriverPool).
+    """
+    
+    # Initialize the driver (headless unless HEADLESS=false)
+    metrics = RunMetrics('espn')
+    owns_driver = driver is None
+    if owns_driver:
+        with metrics.span('driver_startup'):
+            driver = new_driver()
+    metrics.watch_driver(driver)
+    waits = WaitStats()
+    table_selectors = TABLE_SELECTORS
+    max_players = int(os.getenv('ESPN_MAX_PLAYERS', '500'))
+    # ESPN_BROWSERS > 1 pages the table with that many browsers at once (DOM mode); the XHR
+    # path fetches ESPN_PAGE_SIZE-player pages, ESPN_FETCH_CONCURRENCY at a time
+    browsers = max(1, int(os.getenv('ESPN_BROWSERS', '1')))
+    page_size = int(os.getenv('ESPN_PAGE_SIZE', '250'))
+    concurrency = int(os.getenv('ESPN_FETCH_CONCURRENCY', '4'))
+    
+    # The results table is filled from a kona_player_info JSON request; record it as the page loads
+    mode = capture_mode()
+    recorder = ResponseRecorder(driver, ESPN_API, label='espn') if mode != 'dom' else None
+    replay = SnapshotRecorder.from_env('espn')
     
     try:
         print("Loading ESPN draft results page...")
-        driver.get("https://fantasy.espn.com/football/livedraftresults")
-        
-        # Wait for the main content to load
-        wait = WebDriverWait(driver, 15)
-        
-        # Wait for player table to be present
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".Table__TBODY")))
-        time.sleep(2)  # Additional wait for dynamic content
+        with metrics.span('page_load'):
+            driver.get(ESPN_URL)
+            
+            # Wait for the main content to load
+            wait = WebDriverWait(driver, 15)
+            
+            # Wait for player table to be present
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".Table__TBODY")))
+            wait_for_table(driver, table_selectors, 10, settle_ms=300, stats=waits)  # Wait for dynamic content to settle
+        print(f"Page ready: {format_page_report(page_report(driver))}")
         
         print("Extracting player data...")
         
@@ -40,73 +268,42 @@ def scrape_espn_draft_trends():
         players = []
         page_num = 1
         
-        while True:
+        if recorder is not None:
+            with metrics.span('xhr_capture') as span:
+                players = collect_espn(recorder, today_date, 10, max_players, stats=waits,
+                                       page_size=page_size, concurrency=concurrency)
+                span['rows'] = len(players)
+            metrics.count('rows_seen', len(players))
+            recorder.close()
+            print(f"XHR capture: {len(players)} players from {len(recorder.payloads)} payloads")
+            if not players and mode == 'auto':
+                print("No players captured from XHR; falling back to paginating the table")
+        
+        # DOM pagination (skipped when the XHR capture already produced the table)
+        paginate = not players and mode != 'xhr'
+        if paginate and browsers > 1:
+            with metrics.span('parallel_pages', browsers=browsers) as span:
+                parallel = paginate_parallel(driver, today_date, max_players, browsers, waits, metrics, replay, pool)
+                span['rows'] = len(parallel or [])
+            if parallel is not None:
+                players = parallel
+                paginate = False
+            else:
+                print("Parallel paging incomplete; paging serially")
+        while paginate:
             print(f"Scraping page {page_num}...")
+            page_start = time.perf_counter()
             
-            # Find all player rows on current page
-            player_rows = driver.find_elements(By.CSS_SELECTOR, "tr.Table__TR.Table__TR--sm")
-            
-            page_players_count = 0
-            for row in player_rows:
-                try:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    
-                    if len(cells) >= 4:  # Ensure we have enough data
-                        # Cell 0: Rank
-                        rank = cells[0].text.strip()
-                        
-                        # Cell 1: Player name, team, and position all together
-                        player_cell = cells[1]
-                        
-                        # Get player name (in the link)
-                        try:
-                            player_name = player_cell.find_element(By.CSS_SELECTOR, "a.AnchorLink").text.strip()
-                        except:
-                            player_name = ""
-                        
-                        # Get team and position from the full text
-                        team = ""
-                        position = ""
-                        try:
-                            # Get all text from the player cell
-                            full_text = player_cell.text.strip()
-                            # Remove the player name from the full text to get team/position
-                            remaining_text = full_text.replace(player_name, "").strip()
-                            
-                            # The remaining text should be like "Cin WR"
-                            if remaining_text:
-                                parts = remaining_text.split()
-                                if len(parts) >= 2:
-                                    team = parts[0]
-                                    position = parts[1]
-                                elif len(parts) == 1:
-                                    # Sometimes it might just be position
-                                    position = parts[0]
-                        except:
-                            pass
-                        
-                        # Cell 2: ADP (Average Draft Position)
-                        adp = cells[2].text.strip() if len(cells) > 2 else ''
-                        
-                        # Cell 3: 7 Day +/- (this is what was showing in avg_round)
-                        seven_day_change = cells[3].text.strip() if len(cells) > 3 else ''
-                        
-                        player_data = {
-                            'rank': rank,
-                            'player_name': player_name,
-                            'team': team,
-                            'position': position,
-                            'adp': adp,
-                            'seven_day_change': seven_day_change,
-                            'date_scraped': today_date
-                        }
-                        
-                        if player_data['player_name']:  # Only add valid entries
-                            players.append(player_data)
-                            page_players_count += 1
-                            
-                except Exception as e:
-                    continue  # Skip rows that don't match expected format
+            # Snapshot the page's rows in one round trip and parse them in-process
+            html = snapshot_html(driver, driver.find_element(By.CSS_SELECTOR, ".Table__TBODY"))
+            if replay is not None:
+                replay.save(f"page_{page_num:03d}.html", html)
+            with metrics.span('parse', page=page_num) as span:
+                page_players = parse_espn_rows(html, today_date)
+                span['rows'] = len(page_players)
+            players.extend(page_players)
+            page_players_count = len(page_players)
+            metrics.count('rows_seen', page_players_count)
             
             print(f"  Found {page_players_count} players on page {page_num}")
             
@@ -121,10 +318,13 @@ def scrape_espn_draft_trends():
                     break
                     
                 # Click the next button
+                before = probe_table(driver, table_selectors)
                 driver.execute_script("arguments[0].click();", next_button)
                 
-                # Wait for new content to load
-                time.sleep(2)
+                # Wait for the rows to change and settle
+                if not wait_for_table(driver, table_selectors, 10, changed_from=before, settle_ms=300, stats=waits):
+                    print("  Timed out waiting for the next page to render")
+                metrics.record('page', time.perf_counter() - page_start, page=page_num, rows=page_players_count)
                 page_num += 1
                 
             except:
@@ -132,9 +332,9 @@ def scrape_espn_draft_trends():
                 print("Reached last page")
                 break
                 
-            # Safety check - don't scrape more than 10 pages (500 players)
-            if page_num > 10:
-                print("Reached maximum page limit")
+            # Safety check - don't scrape more than ESPN_MAX_PLAYERS (default 10 pages, 500 players)
+            if len(players) >= max_players:
+                print("Reached maximum player limit")
                 break
         
         # Remove duplicates (in case any were loaded twice)
@@ -150,21 +350,25 @@ def scrape_espn_draft_trends():
         if unique_players:
             df = pd.DataFrame(unique_players)
             
-            # Clean up the data - convert to numeric where appropriate
-            df['rank'] = pd.to_numeric(df['rank'], errors='coerce')
-            df['adp'] = pd.to_numeric(df['adp'], errors='coerce')
-            df['seven_day_change'] = pd.to_numeric(df['seven_day_change'], errors='coerce')
+            # Clean up the data - typed columns per the ESPN schema (see loader.SCHEMAS)
+            df = coerce(df, 'espn')
             
             # Sort by rank to ensure proper order
             df = df.sort_values('rank', na_position='last')
             
             # Save to CSV
             filename = f'Data/espn_draft_trends_{today_date}.csv'
-            df.to_csv(filename, index=False)
+            metrics.count('rows_kept', len(df))
+            with metrics.span('write', target='csv', rows=len(df)):
+                df.to_csv(filename, index=False)
+            with metrics.span('write', target='store', rows=len(df)):
+                save_snapshot(df, 'espn', today_date)
             
             print(f"\n✅ Successfully scraped {len(unique_players)} unique players")
             print(f"📄 Data saved to {filename}")
             print(f"📅 Data scraped on: {today_date}")
+            print(f"⏱️  {waits.summary()}")
+            print(f"🌐 {format_page_report(page_report(driver))}")
             print(f"\nTop 5 players:")
             print(df[['rank', 'player_name', 'team', 'position', 'adp', 'seven_day_change']].head())
             
@@ -178,8 +382,10 @@ def scrape_espn_draft_trends():
         return None
         
     finally:
-        driver.quit()
-        print("\nBrowser closed")
+        metrics.close()
+        if owns_driver:
+            driver.quit()
+            print("\nBrowser closed")
 
 if __name__ == "__main__":
     # Run the scraper
@@ -0,0 +1,199 @@
+import os
+import re
+import sys
+import glob
+import gzip
+import json
+import zlib
+import hashlib
+import logging
+
+logger = logging.getLogger('snapshot_store')
+
+SNAPSHOT_DIR = 'Data/snapshots'
+# A row ends a block when crc32(row) % BLOCK_MODULUS == 0 (~32 rows per block on average).
+# Boundaries depend on row content, not position, so an inserted or dropped row only
+# changes the block it falls in.
+BLOCK_MODULUS = 32
+MAX_BLOCK_ROWS = 128
+
+_DATED = re.compile(r'_\d{4}-\d{2}-\d{2}(?=\.csv$)')
+
+
+def series_name(name):
+    """Snapshot series a dated file belongs to: boris_chen_ppr_2025-09-03.csv -> boris_chen_ppr.csv"""
+    return _DATED.sub('', os.path.basename(name))
+
+
+def common_suffix(rows):
+    """Longest trailing text shared by every row, starting at a field separator. Scrape
+    metadata columns (scoring_format, date_scraped) sit at the end of every row, so this
+    keeps a date change from making every block new."""
+    if not rows:
+        return b''
+    suffix = os.path.commonprefix([r[::-1] for r in rows])[::-1]
+    cut = suffix.find(b',')
+    return suffix[cut:] if cut >= 0 else b''
+
+
+def split_blocks(rows):
+    blocks, current = [], []
+    for row in rows:
+        current.append(row)
+        if zlib.crc32(row) % BLOCK_MODULUS == 0 or len(current) >= MAX_BLOCK_ROWS:
+            blocks.append(current)
+            current = []
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class SnapshotStore:
+    """Content-addressed store for the dated CSVs in Data/.
+
+    A file is split into header + row blocks; each block is stored once as
+    blocks/<sha256>.gz and a manifest (header + block hashes, itself content-addressed)
+    lists them. index.json maps each file name to its manifest plus the per-file common row
+    suffix, so a scrape identical to an earlier one writes no block and no manifest, only
+    its index entry. Files are rebuilt byte for byte and checked against their sha256."""
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv('SNAPSHOT_DIR', SNAPSHOT_DIR)
+        self.index_path = os.path.join(self.root, 'index.json')
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def _path(self, kind, digest, ext):
+        return os.path.join(self.root, kind, digest[:2], f'{digest}{ext}')
+
+    def _write_once(self, path, data):
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return True
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp, self.index_path)
+
+    def latest(self, series):
+        """Name of the newest stored file in a series, or None."""
+        names = sorted(n for n in self.index if series_name(n) == series)
+        return names[-1] if names else None
+
+    def add(self, path):
+        """Store one CSV. Returns (status, new_bytes) where status is 'stored', 'unchanged'
+        (same content as the previous file of its series) or 'present' (already indexed)."""
+        name = os.path.basename(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = _sha(data)
+        if self.index.get(name, {}).get('sha256') == digest:
+            return 'present', 0
+        header, _, body = data.partition(b'\n')
+        trailing_newline = body.endswith(b'\n')
+        rows = body[:-1].split(b'\n') if trailing_newline else (body.split(b'\n') if body else [])
+        suffix = common_suffix(rows)
+        if suffix:
+            rows = [r[:-len(suffix)] for r in rows]
+
+        new_bytes = 0
+        hashes = []
+        for block in split_blocks(rows):
+            raw = b'\n'.join(block)
+            block_hash = _sha(raw)
+            hashes.append(block_hash)
+            packed = gzip.compress(raw, mtime=0)
+            if self._write_once(self._path('blocks', block_hash, '.gz'), packed):
+                new_bytes += len(packed)
+        manifest = json.dumps({'header': header.decode('utf-8'), 'blocks': hashes, 'rows': len(rows)}, sort_keys=True).encode('utf-8')
+        manifest_hash = _sha(manifest)
+        if self._write_once(self._path('manifests', manifest_hash, '.json'), manifest):
+            new_bytes += len(manifest)
+
+        previous = self.latest(series_name(name))
+        status = 'unchanged' if previous and self.index[previous]['manifest'] == manifest_hash else 'stored'
+        self.index[name] = {'manifest': manifest_hash, 'suffix': suffix.decode('utf-8'),
+                            'trailing_newline': trailing_newline, 'sha256': digest, 'size': len(data)}
+        return status, new_bytes
+
+    def read(self, name):
+        """Rebuild a stored file's bytes."""
+        entry = self.index[os.path.basename(name)]
+        with open(self._path('manifests', entry['manifest'], '.json'), 'rb') as f:
+            manifest = json.loads(f.read())
+        suffix = entry['suffix'].encode('utf-8')
+        rows = []
+        for block_hash in manifest['blocks']:
+            with open(self._path('blocks', block_hash, '.gz'), 'rb') as f:
+                rows.extend(gzip.decompress(f.read()).split(b'\n'))
+        parts = [manifest['header'].encode('utf-8')] + [r + suffix for r in rows]
+        data = b'\n'.join(parts)
+        if entry['trailing_newline'] or not rows:
+            data += b'\n'
+        if _sha(data) != entry['sha256']:
+            raise ValueError(f"Rebuilt {name} does not match its stored checksum")
+        return data
+
+    def restore(self, name, dest_dir='Data', overwrite=False):
+        """Write a stored file back into `dest_dir`; returns the path (untouched if present)."""
+        path = os.path.join(dest_dir, os.path.basename(name))
+        if overwrite or not os.path.exists(path):
+            data = self.read(name)
+            os.makedirs(dest_dir, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        return path
+
+    def stats(self):
+        stored = sum(os.path.getsize(p) for p in glob.glob(os.path.join(self.root, '*', '*', '*')))
+        logical = sum(e['size'] for e in self.index.values())
+        return {'files': len(self.index), 'logical_bytes': logical, 'stored_bytes': stored,
+                'manifests': len({e['manifest'] for e in self.index.values()})}
+
+
+def ingest(paths, store=None):
+    """Add files to the store and save the index. Returns {name: status}."""
+    store = store or SnapshotStore()
+    results = {}
+    for path in sorted(paths):
+        status, new_bytes = store.add(path)
+        results[os.path.basename(path)] = status
+        logger.info(f"{path}: {status} (+{new_bytes} bytes)")
+    store.save()
+    return results
+
+
+if __name__ == '__main__':
+    # python snapshot_store.py add Data/*.csv       store new snapshots
+    # python snapshot_store.py restore [names...]   materialize snapshots into Data/ (all if no names)
+    # python snapshot_store.py stats
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+    store = SnapshotStore()
+    if command == 'add':
+        results = ingest([p for arg in sys.argv[2:] for p in glob.glob(arg)], store)
+        print(f"{sum(s == 'stored' for s in results.values())} stored, {sum(s == 'unchanged' for s in results.values())} unchanged, "
+              f"{sum(s == 'present' for s in results.values())} already present")
+    elif command == 'restore':
+        for name in sys.argv[2:] or sorted(store.index):
+            print(store.restore(name))
+    elif command != 'stats':
+        raise SystemExit(f"Unknown command {command}")
+    stats = store.stats()
+    print(f"{stats['files']} files, {stats['manifests']} distinct, {stats['logical_bytes'] / 1e3:.0f}KB as CSV, "
+          f"{stats['stored_bytes'] / 1e3:.0f}KB stored")
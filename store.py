@@ -0,0 +1,240 @@
+import os
+import re
+import sys
+import glob
+import time
+import shutil
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger('store')
+
+STORE_DIR = 'Data/store'
+
+# Typed column layout per source. Dictionary columns come back from read() as pandas categoricals.
+# BettingPros line/odds stay text: older snapshots carry values like "44.1 Over" in those columns.
+SCHEMAS = {
+    'espn': pa.schema([
+        ('rank', pa.int32()),
+        ('player_name', pa.string()),
+        ('team', pa.dictionary(pa.int16(), pa.string())),
+        ('position', pa.dictionary(pa.int8(), pa.string())),
+        ('adp', pa.float32()),
+        ('seven_day_change', pa.float32()),
+    ]),
+    'boris': pa.schema([
+        ('rank', pa.int32()),
+        ('player_name', pa.string()),
+        ('tier', pa.int16()),
+        ('position', pa.dictionary(pa.int8(), pa.string())),
+        ('best_rank', pa.int32()),
+        ('worst_rank', pa.int32()),
+        ('avg_rank', pa.float32()),
+        ('std_dev', pa.float32()),
+    ]),
+    'bettingpros': pa.schema([
+        ('player_name', pa.string()),
+        ('position', pa.dictionary(pa.int8(), pa.string())),
+        ('matchup', pa.dictionary(pa.int16(), pa.string())),
+        ('bet_type', pa.dictionary(pa.int16(), pa.string())),
+        ('line', pa.string()),
+        ('odds', pa.string()),
+        ('sportsbook', pa.string()),
+    ]),
+}
+
+# CSV column names -> store column names (Boris uses dotted headers)
+RENAMES = {
+    'Rank': 'rank', 'Player.Name': 'player_name', 'Tier': 'tier', 'Position': 'position',
+    'Best.Rank': 'best_rank', 'Worst.Rank': 'worst_rank', 'Avg.Rank': 'avg_rank', 'Std.Dev': 'std_dev',
+}
+
+# Hive-style partition keys under {root}/source={source}/
+PARTITIONING = ds.partitioning(pa.schema([('scoring_format', pa.string()), ('date', pa.string())]), flavor='hive')
+
+CSV_NAME = re.compile(r'^(?P<source>espn_draft_trends|boris_chen_(?P<format>standard|ppr|half_ppr)|bettingpros_prop_bets(?P<final>_final)?)_(?P<date>\d{4}-\d{2}-\d{2})\.csv$')
+
+
+def store_dir(root=None):
+    return root or os.getenv('STORE_DIR', STORE_DIR)
+
+
+def partition_path(source, date, scoring_format=None, root=None):
+    return os.path.join(store_dir(root), f'source={source}', f'scoring_format={scoring_format or "all"}', f'date={date}')
+
+
+def to_table(df, source):
+    """Coerce a scraped DataFrame (CSV column names or store names) onto the source's schema.
+    Unparseable numbers become nulls; columns the frame lacks are filled with nulls."""
+    schema = SCHEMAS[source]
+    df = df.rename(columns=RENAMES)
+    arrays = []
+    for field in schema:
+        values = df[field.name] if field.name in df.columns else pd.Series([None] * len(df), dtype=object)
+        if pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            values = pd.to_numeric(values, errors='coerce')
+            array = pa.array(values, type=pa.float64(), from_pandas=True)
+            if pa.types.is_integer(field.type):
+                array = pc.cast(pc.round(array), field.type)
+            else:
+                array = pc.cast(array, field.type)
+        else:
+            values = values.astype(object).where(values.notna(), None)
+            values = values.map(lambda v: v if v is None else str(v).strip())
+            array = pa.array(values, type=pa.string(), from_pandas=True)
+            if pa.types.is_dictionary(field.type):
+                array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_partition(write, source, date, scoring_format=None, root=None):
+    """Run `write(path)` into a temporary partition directory and swap it in."""
+    directory = partition_path(source, date, scoring_format, root)
+    tmp = directory + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    write(os.path.join(tmp, 'part-0.parquet'))
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+    return os.path.join(directory, 'part-0.parquet')
+
+
+def write_snapshot(df, source, date, scoring_format=None, root=None):
+    """Write one scrape as {root}/source=../scoring_format=../date=../part-0.parquet.
+    Rewriting the same source/format/date replaces the partition. Returns the file path."""
+    table = to_table(df, source).sort_by('player_name')
+    return _write_partition(lambda path: pq.write_table(table, path, compression='zstd', row_group_size=50_000),
+                            source, date, scoring_format, root)
+
+
+def write_snapshot_csv(csv_path, source, date, scoring_format=None, root=None, chunk_rows=50_000):
+    """write_snapshot for a scrape already on disk as CSV, read `chunk_rows` at a time so memory
+    does not grow with the file. Each chunk is one row group, sorted by player_name within
+    itself. Returns (file path, rows written)."""
+    rows = [0]
+
+    def write(path):
+        with pq.ParquetWriter(path, SCHEMAS[source], compression='zstd') as writer:
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+                writer.write_table(to_table(chunk, source).sort_by('player_name'))
+                rows[0] += len(chunk)
+    path = _write_partition(write, source, date, scoring_format, root)
+    return path, rows[0]
+
+
+def save_snapshot(df, source, date, scoring_format=None, root=None):
+    """write_snapshot for the scrapers: a store failure is logged, never raised, so the
+    CSV output is unaffected. Set WRITE_STORE=false to skip."""
+    if os.getenv('WRITE_STORE', 'true').lower() not in ('1', 'true', 'yes') or df is None or not len(df):
+        return None
+    try:
+        return write_snapshot(df, source, date, scoring_format, root)
+    except Exception:
+        logger.exception(f"Could not write {source} {date} to the store")
+        return None
+
+
+def save_snapshot_csv(csv_path, source, date, scoring_format=None, root=None):
+    """save_snapshot for a CSV on disk (streamed by write_snapshot_csv)."""
+    if os.getenv('WRITE_STORE', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+    try:
+        return write_snapshot_csv(csv_path, source, date, scoring_format, root)[0]
+    except Exception:
+        logger.exception(f"Could not write {source} {date} to the store")
+        return None
+
+
+def dataset(source, root=None):
+    return ds.dataset(os.path.join(store_dir(root), f'source={source}'), format='parquet', partitioning=PARTITIONING,
+                      schema=SCHEMAS[source].append(pa.field('scoring_format', pa.string())).append(pa.field('date', pa.string())))
+
+
+def read(source, start=None, end=None, players=None, scoring_format=None, columns=None, root=None):
+    """Load a source's history as a DataFrame. Date bounds are inclusive ISO dates and,
+    like `scoring_format`, prune whole partitions; `players` filters on exact player_name
+    inside the Parquet scan. Partition keys come back as `scoring_format` and `date`."""
+    if not os.path.isdir(os.path.join(store_dir(root), f'source={source}')):
+        return pd.DataFrame(columns=columns or SCHEMAS[source].names + ['scoring_format', 'date'])
+    expr = None
+    conditions = []
+    if start:
+        conditions.append(ds.field('date') >= start)
+    if end:
+        conditions.append(ds.field('date') <= end)
+    if scoring_format:
+        formats = [scoring_format] if isinstance(scoring_format, str) else list(scoring_format)
+        conditions.append(ds.field('scoring_format').isin(formats))
+    if players is not None:
+        names = [players] if isinstance(players, str) else list(players)
+        conditions.append(ds.field('player_name').isin(names))
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+    table = dataset(source, root).to_table(columns=columns, filter=expr)
+    return table.to_pandas()
+
+
+def dates(source, root=None):
+    """Snapshot dates held for a source, oldest first."""
+    pattern = os.path.join(store_dir(root), f'source={source}', 'scoring_format=*', 'date=*')
+    return sorted({os.path.basename(p)[len('date='):] for p in glob.glob(pattern) if not p.endswith('.tmp')})
+
+
+def parse_csv_name(path):
+    """(source, scoring_format, date, is_final) for a Data/ CSV name, or None if it isn't a scrape."""
+    m = CSV_NAME.match(os.path.basename(path))
+    if not m:
+        return None
+    name = m.group('source')
+    if name.startswith('espn'):
+        source = 'espn'
+    elif name.startswith('boris'):
+        source = 'boris'
+    else:
+        source = 'bettingpros'
+    return source, m.group('format'), m.group('date'), bool(m.group('final'))
+
+
+def backfill(data_dir='Data', root=None):
+    """One-time import of the dated CSVs in `data_dir`. For BettingPros the `_final_` file
+    wins over the partial checkpoint of the same date. Returns the partitions written."""
+    chosen = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.csv'))):
+        parsed = parse_csv_name(path)
+        if parsed is None:
+            continue
+        source, scoring_format, date, final = parsed
+        key = (source, scoring_format, date)
+        if key not in chosen or final:
+            chosen[key] = path
+    written = []
+    for (source, scoring_format, date), path in sorted(chosen.items()):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''])
+        written.append(write_snapshot(df, source, date, scoring_format, root))
+        logger.info(f"{path} -> {written[-1]} ({len(df)} rows)")
+    return written
+
+
+if __name__ == '__main__':
+    # python store.py backfill [Data]        import the existing CSVs
+    # python store.py read espn [start] [end] load and time a read
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'backfill'
+    if command == 'backfill':
+        paths = backfill(sys.argv[2] if len(sys.argv) > 2 else 'Data')
+        print(f"Wrote {len(paths)} partitions to {store_dir()}")
+    elif command == 'read':
+        source = sys.argv[2]
+        started = time.perf_counter()
+        df = read(source, *sys.argv[3:5])
+        elapsed = time.perf_counter() - started
+        print(f"{source}: {len(df)} rows over {df['date'].nunique() if len(df) else 0} dates in {elapsed * 1000:.1f}ms, "
+              f"{df.memory_usage(deep=True).sum() / 1e6:.2f}MB in memory")
+        print(df.head())
+    else:
+        raise SystemExit(f"Unknown command {command}")
@@ -0,0 +1,64 @@
+import os
+import sys
+import itertools
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for scrape_bettingpros_prop_bets with CAPTURE_MODE=xhr."""
+
+    page_source = '<html></html>'
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, *args):
+        return None
+
+    def find_elements(self, *args):
+        return []
+
+    def save_screenshot(self, path):
+        return False
+
+
+class FakeRecorder:
+    def __init__(self, driver, pattern, label=None):
+        self.payloads = []
+
+    def close(self):
+        pass
+
+
+def prop(name, bet_type, line, odds='4.2'):
+    return {'player_name': name, 'position': 'RB', 'matchup': 'BUF @ MIA', 'bet_type': bet_type,
+            'line': line, 'odds': odds, 'sportsbook': '', 'date_scraped': ''}
+
+
+@pytest.fixture
+def bettingpros(tmp_path, monkeypatch):
+    """Run the BettingPros scraper offline in tmp_path: run(rows) scrapes a table holding `rows`
+    (fed through the XHR path) and returns the scraper's result."""
+    import line_moves
+    import scrape_bettingpros as S
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('CAPTURE_MODE', 'xhr')
+    monkeypatch.setenv('METRICS_FILE', '')
+    monkeypatch.setenv('STORE_DIR', str(tmp_path / 'store'))
+    for name in ('wait_for_document', 'wait_for_table'):
+        monkeypatch.setattr(S, name, lambda *a, **k: {})
+    monkeypatch.setattr(S, 'page_report', lambda driver: {})
+    monkeypatch.setattr(S, 'format_page_report', lambda report: '')
+    monkeypatch.setattr(S, 'ResponseRecorder', FakeRecorder)
+    # every run observes the line log at a later time, even within the same second
+    stamps = (f'2030-01-01T00:{m:02d}:00' for m in itertools.count())
+    monkeypatch.setattr(S, 'record_snapshot', lambda rows, observed_at=None: line_moves.record_snapshot(rows, next(stamps)))
+    table = []
+    monkeypatch.setattr(S, 'iter_bettingpros_pages', lambda *a, **k: iter([list(table)]))
+
+    def run(rows):
+        table[:] = rows
+        return S.scrape_bettingpros_prop_bets(driver=FakeDriver())
+    return run
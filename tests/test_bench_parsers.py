@@ -0,0 +1,39 @@
+import json
+import os
+import pytest
+import bench_parsers
+from bench_parsers import best_of, compare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def result(rows=100, rows_per_sec=1000.0, peak_kb=100.0):
+    return {'rows': rows, 'rows_per_sec': rows_per_sec, 'best_s': rows / rows_per_sec, 'peak_kb': peak_kb}
+
+
+def test_baseline_is_row_counts_only():
+    assert compare({'p': result(rows_per_sec=1.0, peak_kb=1e6)}, {'p': {'rows': 100}}) == []
+    assert compare({'p': result(rows=99)}, {'p': {'rows': 100}}) == ['p: 99 rows, baseline 100']
+    assert compare({}, {'p': {'rows': 100}}) == ['p: missing (fixture removed?)']
+
+
+def test_speed_and_memory_are_relative_to_the_previous_revision():
+    previous = {'p': result(rows_per_sec=1000.0, peak_kb=100.0), 'gone': result()}
+    assert compare({'p': result(rows_per_sec=750.0, peak_kb=125.0)}, {}, previous, tolerance=0.3) == []
+    failures = compare({'p': result(rows_per_sec=650.0, peak_kb=140.0)}, {}, previous, tolerance=0.3)
+    assert failures == ['p: 650 rows/s, previous revision 1000', 'p: peak 140KB, previous revision 100KB']
+
+
+def test_best_of_takes_the_fastest_run_and_smallest_peak():
+    best = best_of([{'p': result(rows_per_sec=800.0, peak_kb=90.0)}, {'p': result(rows_per_sec=1000.0, peak_kb=95.0)}])
+    assert best['p']['rows_per_sec'] == 1000.0 and best['p']['best_s'] == pytest.approx(0.1) and best['p']['peak_kb'] == 90.0
+
+
+def test_committed_baseline_matches_the_fixtures(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    with open(bench_parsers.BASELINE, encoding='utf-8') as f:
+        baseline = json.load(f)
+    cases = bench_parsers.load_cases()
+    assert set(cases) == set(baseline)
+    for name, (func, inputs) in cases.items():
+        assert sum(len(func(item)) for item in inputs) == baseline[name]['rows'], name
@@ -0,0 +1,40 @@
+import os
+import csv
+import glob
+from datetime import datetime
+import pytest
+from checkpoint import CsvCheckpoint
+from conftest import prop
+from scrape_bettingpros import PROP_FIELDS
+
+
+def read(pattern):
+    paths = glob.glob(pattern)
+    assert len(paths) == 1, paths
+    with open(paths[0], newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize('stream', ['false', 'true'])
+def test_second_run_same_day_keeps_only_the_new_line(bettingpros, monkeypatch, stream):
+    monkeypatch.setenv('STREAM_PROPS', stream)
+    bettingpros([prop('James Cook', 'Rush Yds', '62.5'), prop('Josh Allen', 'Pass Yds', '240.5')])
+    bettingpros([prop('James Cook', 'Rush Yds', '70.5'), prop('Josh Allen', 'Pass Yds', '240.5')])
+
+    final = read('Data/bettingpros_prop_bets_final_*.csv')
+    assert [(r['player_name'], r['line']) for r in final] == [('James Cook', '70.5'), ('Josh Allen', '240.5')]
+
+    log = read('Data/prop_line_changes.csv')
+    cook = [(r['line'], r['change']) for r in log if r['player_name'] == 'James Cook']
+    assert cook == [('62.5', 'new'), ('70.5', 'moved')]
+    assert [r['change'] for r in log if r['player_name'] == 'Josh Allen'] == ['new']
+
+
+def test_unfinished_run_is_resumed(bettingpros):
+    path = f"Data/bettingpros_prop_bets_{datetime.now():%Y-%m-%d}.csv"
+    os.makedirs('Data', exist_ok=True)
+    with CsvCheckpoint(path, PROP_FIELDS) as checkpoint:
+        checkpoint.append([prop('James Cook', 'Rush Yds', '62.5')])
+    bettingpros([prop('Josh Allen', 'Pass Yds', '240.5')])
+    final = read('Data/bettingpros_prop_bets_final_*.csv')
+    assert sorted(r['player_name'] for r in final) == ['James Cook', 'Josh Allen']
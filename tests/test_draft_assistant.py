@@ -0,0 +1,80 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pandas as pd
+import pytest
+from draft_assistant import DraftState, make_server
+
+
+class NoIndex:
+    def resolve(self, name, position=''):
+        return None
+
+
+@pytest.fixture
+def server():
+    pool = pd.DataFrame({
+        'player_id': ['josh-allen', 'james-cook'], 'player_name': ['Josh Allen', 'James Cook'],
+        'position': ['QB', 'RB'], 'rank': [1.0, 2.0], 'adp': [1.5, 2.5], 'tier': [1, 1],
+        'score': [1.0, 2.0], 'centre': [1.5, 2.5],
+    })
+    httpd = make_server(DraftState(pool, NoIndex()), port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def call(server, path, body=None):
+    url = f'http://127.0.0.1:{server.server_port}{path}'
+    data = None if body is None else body.encode('utf-8')
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+@pytest.mark.parametrize('path', ['/recommend?n=abc', '/available?n=1.5', '/available?n=-1'])
+def test_get_rejects_bad_n(server, path):
+    status, payload = call(server, path)
+    assert status == 400
+    assert 'n must' in payload['error']
+    assert call(server, '/recommend?n=1')[0] == 200
+
+
+@pytest.mark.parametrize('body', ['[]', '"josh allen"', '{"player": ["josh-allen"]}',
+                                  '{"player": "josh-allen", "n": "abc"}'])
+def test_post_rejects_bad_body(server, body):
+    status, payload = call(server, '/pick', body)
+    assert status == 400
+    assert payload['error']
+    # nothing was drafted, and the server still answers
+    assert call(server, '/state')[1]['picks'] == 0
+
+
+def test_pick(server):
+    status, payload = call(server, '/pick', '{"player": "josh-allen", "mine": true, "n": 1}')
+    assert status == 200
+    assert payload['drafted']['name'] == 'Josh Allen'
+    assert payload['picks'] == 1
+
+
+def test_pick_status_codes(server):
+    status, payload = call(server, '/pick', '{"player": "Nobody Known"}')
+    assert status == 404 and 'Unknown player' in payload['error']
+    assert call(server, '/pick', '{"player": "josh-allen"}')[0] == 200
+    status, payload = call(server, '/pick', '{"player": "josh-allen"}')
+    assert status == 409 and payload['error'] == 'Josh Allen already drafted'
+    status, payload = call(server, '/pick', '{"mine": true}')
+    assert status == 400 and payload['error'] == "missing field 'player'"
+    assert call(server, '/state')[1]['picks'] == 1
+
+
+def test_undo_status_codes(server):
+    assert call(server, '/undo', '{"player": "Nobody Known"}')[0] == 404
+    assert call(server, '/undo', '{"player": "james-cook"}')[0] == 409
+    call(server, '/pick', '{"player": "james-cook"}')
+    status, payload = call(server, '/undo', '{"player": "james-cook"}')
+    assert status == 200 and payload['restored']['name'] == 'James Cook' and payload['picks'] == 0
@@ -0,0 +1,14 @@
+import pandas as pd
+from draft_sim import simulate
+
+
+def test_picks_past_the_pool_are_dropped():
+    pool = pd.DataFrame({
+        'player_id': [f'p{i}' for i in range(20)], 'player_name': [f'Player {i}' for i in range(20)],
+        'position': 'RB', 'centre': [float(i + 1) for i in range(20)], 'sigma': 2.0, 'rank': float('nan'),
+    })
+    # 4 teams x 10 rounds is 40 picks; slot 1 picks 1, 8, 9, 16, 17, 24, ... and the pool ends at 20
+    result, _ = simulate(pool, slot=1, teams=4, rounds=10, drafts=200, workers=1, batch=100)
+    picks = [c for c in result.columns if c.startswith('pick_')]
+    assert picks == ['pick_1', 'pick_8', 'pick_9', 'pick_16', 'pick_17']
+    assert (result[picks].sum() > 0).all()
@@ -0,0 +1,98 @@
+import pytest
+import scrape_espn as E
+from browser import DriverPool
+from metrics import RunMetrics
+from waits import WaitStats
+
+PER_PAGE = 50
+
+
+class PagedDriver:
+    """ESPN results table of `total` players whose pagination, like ESPN's, only shows the
+    pages within two of the active one."""
+
+    def __init__(self, total, missing=()):
+        self.total = total
+        self.missing = set(missing)
+        self.page = 1
+
+    @property
+    def last(self):
+        return -(-self.total // PER_PAGE)
+
+    def shown(self):
+        return [n for n in range(1, self.last + 1) if abs(n - self.page) <= 2]
+
+    def get(self, url):
+        self.page = 1
+
+    def find_element(self, *args):
+        return None
+
+    def execute_script(self, script, *args):
+        if script == E.PAGINATION_JS:
+            return {'pages': self.shown(), 'active': self.page}
+        if script == E.GOTO_PAGE_JS:
+            self.page = min(self.shown(), key=lambda n: abs(args[0] - n))
+            return self.page
+        return None
+
+    def rows(self):
+        if self.page in self.missing:
+            return []
+        start = (self.page - 1) * PER_PAGE
+        return [{'rank': str(r), 'player_name': f'Player {r}', 'team': 'Buf'}
+                for r in range(start + 1, min(start + PER_PAGE, self.total) + 1)]
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def espn(monkeypatch):
+    drivers = []
+    monkeypatch.setattr(E, 'snapshot_html', lambda driver, el: driver)
+    monkeypatch.setattr(E, 'parse_espn_rows', lambda driver, today: driver.rows())
+    monkeypatch.setattr(E, 'wait_for_table', lambda *a, **k: {})
+    monkeypatch.setattr(E, 'probe_table', lambda *a, **k: None)
+
+    def run(total, max_players, browsers=2, missing=(), pool=None):
+        monkeypatch.setattr(E, 'new_driver', lambda: drivers.append(PagedDriver(total, missing)) or drivers[-1])
+        driver = PagedDriver(total, missing)
+        result = E.paginate_parallel(driver, '', max_players, browsers, WaitStats(), RunMetrics('espn'), pool=pool)
+        return result, driver
+    run.drivers = drivers
+    return run
+
+
+def test_pages_past_the_last_one_shown(espn):
+    players, _ = espn(total=1000, max_players=500)
+    assert [int(p['rank']) for p in players] == list(range(1, 501))
+
+
+def test_short_table_ends_at_its_last_page(espn):
+    players, _ = espn(total=420, max_players=500)
+    assert [int(p['rank']) for p in players] == list(range(1, 421))
+
+
+@pytest.mark.parametrize('missing', [2, 3])
+def test_missing_page_falls_back_to_serial(espn, missing):
+    players, driver = espn(total=1000, max_players=500, missing={missing})
+    assert players is None
+    assert driver.page == 1
+
+
+def test_extra_browsers_come_from_the_callers_pool(espn):
+    pooled = []
+    pool = DriverPool(size=2, factory=lambda: pooled.append(PagedDriver(1000)) or pooled[-1])
+    players, _ = espn(total=1000, max_players=500, pool=pool)
+    assert [int(p['rank']) for p in players] == list(range(1, 501))
+    assert len(pooled) == 1 and espn.drivers == []
+
+
+def test_busy_pool_falls_back_to_serial(espn, monkeypatch):
+    monkeypatch.setenv('ESPN_BROWSER_WAIT', '0.05')
+    pool = DriverPool(size=1, factory=lambda: PagedDriver(1000))
+    with pool.acquire():  # held by another source
+        players, driver = espn(total=1000, max_players=500, pool=pool)
+    assert players is None and driver.page == 1
@@ -0,0 +1,173 @@
+import os
+import csv
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import ingest
+from ingest import CsvRows, FeedSource, JsonRows
+
+BORIS_CSV = ('Rank,Player.Name,Tier,Position,Best.Rank,Worst.Rank,Avg.Rank,Std.Dev\r\n'
+             '1,"Chase, Ja\'Marr",1,WR,1,3,1.4,0.6\r\n'
+             '2,Bijan Robinson,1,RB,1,4,2.1,0.8\r\n'
+             '3,"Amon-Ra St. Brown ""The Sun God""\nDET",1,WR,2,6,3.3,1.0\r\n'
+             '4,Señor Déjà-Vu,2,TE,3,9,5.0,1.5\r\n')
+
+
+def feed_all(parser, text, size):
+    rows = []
+    for i in range(0, len(text), size):
+        rows += parser.feed(text[i:i + size])
+    return rows + parser.close()
+
+
+def test_csv_rows_across_chunk_boundaries():
+    expected = list(csv.reader(BORIS_CSV.splitlines(keepends=True)))
+    for size in range(1, len(BORIS_CSV) + 1):
+        parser = CsvRows()
+        rows = feed_all(parser, BORIS_CSV, size)
+        assert [parser.header] + rows == expected, size
+
+
+def test_csv_rows_columns_pick_and_order():
+    parser = CsvRows(['Player.Name', 'Rank', 'Missing'])
+    rows = feed_all(parser, BORIS_CSV, 7)
+    assert parser.header == ['Player.Name', 'Rank', 'Missing']
+    assert rows[0] == ["Chase, Ja'Marr", '1', '']
+    assert rows[3] == ['Señor Déjà-Vu', '4', '']
+
+
+@pytest.mark.parametrize('text', [
+    '[{"name": "Josh Allen", "adp": 1.5, "note": "a}b"},\n {"name": "James Cook", "adp": null}]',
+    '{"name": "Josh Allen", "adp": 1.5, "note": "a}b"}\n{"name": "James Cook", "adp": null}\n',
+])
+def test_json_rows_across_chunk_boundaries(text):
+    for size in range(1, len(text) + 1):
+        parser = JsonRows()
+        assert feed_all(parser, text, size) == [['Josh Allen', 1.5, 'a}b'], ['James Cook', '', '']], size
+        assert parser.header == ['name', 'adp', 'note']
+    parser = JsonRows(['adp', 'name'])
+    assert feed_all(parser, text, 5) == [[1.5, 'Josh Allen'], ['', 'James Cook']]
+
+
+def test_json_rows_truncated():
+    parser = JsonRows()
+    parser.feed('[{"name": "Josh')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Local stand-in for a feed host: serves `files` with an ETag, answers If-None-Match
+    with 304, and returns `failures[path]` 503s (or a fixed status) before the file."""
+
+    files = {}
+    failures = {}
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('If-None-Match')))
+        failure = self.failures.get(self.path)
+        if isinstance(failure, int) and failure >= 400:
+            self.send_error(failure)
+            return
+        if failure:
+            self.failures[self.path] -= 1
+            self.send_error(503)
+            return
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{hash(body) & 0xffffffff:x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        for i in range(0, len(body), 16):
+            self.wfile.write(body[i:i + 16])
+            self.wfile.flush()
+
+
+@pytest.fixture
+def stand_in(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ingest, 'CHUNK_SIZE', 3)  # splits records and multibyte characters
+    monkeypatch.setattr(ingest, 'BACKOFF', 0.01)
+    handler = type('Handler', (StandIn,), {'files': {}, 'failures': {}, 'requests': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    handler.base = f'http://127.0.0.1:{server.server_port}'
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+
+def source(stand_in, path, **kwargs):
+    name = path.strip('/').replace('.', '_')
+    return FeedSource(name, stand_in.base + path, f'Data/{name}_{{date}}.csv', **kwargs)
+
+
+def test_download_then_unchanged(stand_in):
+    stand_in.files['/ranks.csv'] = BORIS_CSV.encode('utf-8')
+    feed = source(stand_in, '/ranks.csv', extra_columns={'scoring_format': 'PPR', 'date_scraped': '{date}'})
+
+    first = ingest.ingest([feed], cache_path='cache.json', today='2030-01-01', store=False)['ranks_csv']
+    assert (first['status'], first['rows'], first['filename']) == ('downloaded', 4, 'Data/ranks_csv_2030-01-01.csv')
+    df = first['frame']
+    assert list(df.columns[-2:]) == ['scoring_format', 'date_scraped']
+    assert df['Player.Name'].tolist()[3] == 'Señor Déjà-Vu'
+    assert df['Player.Name'].tolist()[2] == 'Amon-Ra St. Brown "The Sun God"\nDET'
+    assert set(df['date_scraped']) == {'2030-01-01'}
+
+    second = ingest.ingest([feed], cache_path='cache.json', today='2030-01-02', store=False)['ranks_csv']
+    assert (second['status'], second['rows'], second['filename']) == ('unchanged', 4, first['filename'])
+    assert second['frame'].equals(df)
+    assert stand_in.requests[1][1] is not None  # sent If-None-Match
+    assert not os.path.exists('Data/ranks_csv_2030-01-02.csv')
+
+
+def test_changed_file_is_downloaded_again(stand_in):
+    stand_in.files['/ranks.csv'] = BORIS_CSV.encode('utf-8')
+    feed = source(stand_in, '/ranks.csv')
+    ingest.ingest([feed], cache_path='cache.json', today='2030-01-01', store=False)
+    stand_in.files['/ranks.csv'] = BORIS_CSV.replace('Bijan Robinson', 'Breece Hall').encode('utf-8')
+    result = ingest.ingest([feed], cache_path='cache.json', today='2030-01-02', store=False)['ranks_csv']
+    assert result['status'] == 'downloaded'
+    assert 'Breece Hall' in result['frame']['Player.Name'].tolist()
+
+
+def test_retries(stand_in):
+    body = BORIS_CSV.encode('utf-8')
+    stand_in.files.update({'/flaky.csv': body, '/down.csv': body})
+    stand_in.failures.update({'/flaky.csv': 2, '/down.csv': 10, '/gone.csv': 404})
+    feeds = [source(stand_in, p) for p in ('/flaky.csv', '/down.csv', '/gone.csv')]
+    results = ingest.ingest(feeds, cache_path='cache.json', today='2030-01-01', store=False)
+
+    assert results['flaky_csv']['status'] == 'downloaded'
+    assert results['down_csv']['status'] == 'failed' and '503' in results['down_csv']['error']
+    assert results['gone_csv']['status'] == 'failed' and '404' in results['gone_csv']['error']
+    tries = {p: sum(r[0] == p for r in stand_in.requests) for p in ('/flaky.csv', '/down.csv', '/gone.csv')}
+    assert tries == {'/flaky.csv': 3, '/down.csv': ingest.RETRIES + 1, '/gone.csv': 1}
+
+
+def test_boris_against_the_stand_in(stand_in, monkeypatch):
+    import scrape_borris
+    monkeypatch.setenv('WRITE_STORE', 'false')
+    monkeypatch.setenv('METRICS_FILE', '')
+    for csv_file, _ in scrape_borris.CSV_FILES.values():
+        stand_in.files[f'/{csv_file}'] = BORIS_CSV.encode('utf-8')
+    data = scrape_borris.download_boris_chen_csv_files(base_url=stand_in.base, cache_path='cache.json')
+    assert sorted(data) == ['half_ppr', 'ppr', 'standard']
+    assert set(data['half_ppr']['scoring_format']) == {'Half PPR'}
+    with open('cache.json', encoding='utf-8') as f:
+        assert len(json.load(f)) == 3
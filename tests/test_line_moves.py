@@ -0,0 +1,60 @@
+import csv
+from line_moves import LineTracker, legacy_row, load_changes, movers
+
+
+def row(name, bet_type, line, odds='-110', matchup='BUF @ MIA'):
+    return {'player_name': name, 'bet_type': bet_type, 'matchup': matchup, 'line': line, 'odds': odds}
+
+
+def logged(path):
+    with open(path, newline='') as f:
+        return [(r['player_name'], r['bet_type'], r['line'], r['change']) for r in csv.DictReader(f)]
+
+
+def test_legacy_row_moves_the_line_out_of_bet_type():
+    old = {'player_name': 'Josh Allen', 'bet_type': '23.5 Rush Yds', 'line': '44.1 Over', 'odds': '+5.1'}
+    assert legacy_row(old) == dict(old, bet_type='Rush Yds', line='23.5')
+    assert legacy_row(dict(old, bet_type='o0.5 Rush TDs'))['line'] == '0.5'
+    current = row('Josh Allen', 'Rush Yds', '23.5')
+    assert legacy_row(current) is current
+
+
+def test_ingest_logs_new_moved_and_removed_markets(tmp_path):
+    path = str(tmp_path / 'changes.csv')
+    with LineTracker(path) as tracker:
+        assert tracker.ingest([row('Josh Allen', 'Pass Yds', '238.5'), row('James Cook', 'Rush Yds', '62.5')],
+                              '2030-01-01T00:00:00') == {'new': 2, 'moved': 0, 'removed': 0}
+        # same market spelled differently, one line moved, one market pulled
+        second = [row('josh allen', 'pass yds', '238.5'), row('Tyreek Hill', 'Rec Yds', '70.5'),
+                  row('Josh Allen', 'Rush Yds', '33.5', matchup='buf @ mia')]
+        assert tracker.ingest(second, '2030-01-01T01:00:00', track_removed=True) == {'new': 2, 'moved': 0, 'removed': 1}
+        assert tracker.ingest([row('Tyreek Hill', 'Rec Yds', '72.5'), row('Tyreek Hill', 'Rec Yds', '99.5')],
+                              '2030-01-01T02:00:00') == {'new': 0, 'moved': 1, 'removed': 0}
+
+    assert logged(path) == [('Josh Allen', 'Pass Yds', '238.5', 'new'), ('James Cook', 'Rush Yds', '62.5', 'new'),
+                            ('Tyreek Hill', 'Rec Yds', '70.5', 'new'), ('Josh Allen', 'Rush Yds', '33.5', 'new'),
+                            ('James Cook', 'Rush Yds', '', 'removed'), ('Tyreek Hill', 'Rec Yds', '72.5', 'moved')]
+    # a new tracker rebuilds the current lines from the log alone
+    with LineTracker(path) as tracker:
+        assert tracker.ingest([row('Tyreek Hill', 'Rec Yds', '72.5'), row('James Cook', 'Rush Yds', '62.5')],
+                              '2030-01-01T03:00:00') == {'new': 1, 'moved': 0, 'removed': 0}
+
+
+def test_odds_change_alone_is_a_move(tmp_path):
+    path = str(tmp_path / 'changes.csv')
+    with LineTracker(path) as tracker:
+        tracker.ingest([row('James Cook', 'Rush Yds', '62.5', '-4.0')], '2030-01-01T00:00:00')
+        assert tracker.ingest([row('James Cook', 'Rush Yds', '62.5', '-6.0')], '2030-01-01T01:00:00')['moved'] == 1
+    summary = movers(path)
+    assert list(summary['moves']) == [1] and list(summary['net_move']) == [0.0]
+
+
+def test_snapshots_not_newer_than_the_log_are_skipped(tmp_path):
+    path = str(tmp_path / 'changes.csv')
+    with LineTracker(path) as tracker:
+        tracker.ingest([row('James Cook', 'Rush Yds', '62.5')], '2030-01-02')
+    with LineTracker(path) as tracker:
+        for stamp in ('2030-01-01', '2030-01-02'):
+            assert tracker.ingest([row('James Cook', 'Rush Yds', '70.5')], stamp) == {'new': 0, 'moved': 0, 'removed': 0}
+        assert tracker.ingest([row('James Cook', 'Rush Yds', '70.5')], '2030-01-02T06:00:00')['moved'] == 1
+    assert len(load_changes(path)) == 2
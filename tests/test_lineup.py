@@ -0,0 +1,59 @@
+import itertools
+import random
+import pandas as pd
+import pytest
+from lineup import expand_slots, optimize, solve
+
+SLOT_RULES = {'QB': 1, 'RB': 2, 'WR': 1, 'TE': 1, 'FLEX': 1, 'SUPERFLEX': 1}
+
+
+def brute_force(positions, points, slots):
+    """{starters: total} for every lineup found by trying every assignment of distinct players to
+    slots that take their position, keeping only starter sets no benched player could join."""
+    choices = [[i for i, p in enumerate(positions) if p in accepted] + [None] for _, accepted in slots]
+    assignable = set()
+    for picks in itertools.product(*choices):
+        starters = [i for i in picks if i is not None]
+        if len(set(starters)) == len(starters):
+            assignable.add(frozenset(starters))
+    return {starters: sum(points[i] for i in starters) for starters in assignable
+            if not any(starters | {i} in assignable for i in range(len(positions)) if i not in starters)}
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_solve_matches_brute_force(seed):
+    rng = random.Random(seed)
+    size = rng.randint(3, 9)
+    positions = [rng.choice(['QB', 'RB', 'RB', 'WR', 'WR', 'TE', 'K']) for _ in range(size)]
+    # integer-ish points make ties common
+    points = [float(rng.randint(0, 12)) if rng.random() < 0.5 else round(rng.uniform(0, 25), 1) for _ in range(size)]
+    slots = expand_slots(SLOT_RULES)
+    k = rng.choice([1, 3, 5])
+
+    expected = sorted(brute_force(positions, points, slots).values(), reverse=True)[:k]
+    got = solve(positions, points, slots, k)
+    assert [total for total, _ in got] == pytest.approx(expected)
+
+    starter_sets = [frozenset(i for i in picks if i is not None) for _, picks in got]
+    assert len(set(starter_sets)) == len(got)
+    for (total, picks), starters in zip(got, starter_sets):
+        assert total == pytest.approx(sum(points[i] for i in starters))
+        for (_, accepted), i in zip(slots, picks):
+            assert i is None or positions[i] in accepted
+
+
+def test_expand_slots_puts_flexible_slots_last():
+    assert [slot for slot, _ in expand_slots(SLOT_RULES)] == ['QB', 'RB', 'RB', 'WR', 'TE', 'FLEX', 'SUPERFLEX']
+
+
+def test_optimize_fills_flex_and_benches_the_rest():
+    roster = pd.DataFrame([
+        ('QB One', 'QB', 20.0), ('QB Two', 'QB', 18.0), ('RB One', 'RB', 15.0), ('RB Two', 'RB', 12.0),
+        ('RB Three', 'RB', 11.0), ('WR One', 'WR', 14.0), ('WR Two', 'WR', 9.0), ('TE One', 'TE', None),
+    ], columns=['player_name', 'position', 'points'])
+    best, second = optimize(roster, {'QB': 1, 'RB': 1, 'WR': 1, 'TE': 1, 'FLEX': 1, 'K': 1}, k=2)
+    assert [(s['slot'], s['player_name']) for s in best['starters']] == [
+        ('QB', 'QB One'), ('RB', 'RB One'), ('WR', 'WR One'), ('TE', 'TE One'), ('K', None), ('FLEX', 'RB Two')]
+    assert best['points'] == 61.0 and best['starters'][3]['points'] == 0.0
+    assert best['bench'] == ['QB Two', 'RB Three', 'WR Two']
+    assert second['points'] == 60.0 and 'RB Three' in [s['player_name'] for s in second['starters']]
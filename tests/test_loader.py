@@ -0,0 +1,78 @@
+import os
+import pandas as pd
+import pytest
+import loader
+
+ESPN_HEADER = 'rank,player_name,team,position,adp,seven_day_change,date_scraped\n'
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    loader.clear_cache()
+    yield
+    loader.clear_cache()
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text, encoding='utf-8')
+    if mtime_ns:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def test_load_types_columns_and_tolerates_junk(tmp_path):
+    path = write(tmp_path / 'espn_draft_trends_2030-01-01.csv',
+                 ESPN_HEADER + "1,Ja'Marr Chase,Cin,WR,1.5,0.0,2030-01-01\n2,Justin Jefferson,Q,Min,abc,,2030-01-01\n")
+    df = loader.load(path)
+    assert str(df['rank'].dtype) == 'Int32' and str(df['adp'].dtype) == 'float64'
+    assert isinstance(df['team'].dtype, pd.CategoricalDtype)
+    assert df['adp'].iloc[0] == 1.5 and pd.isna(df['adp'].iloc[1]) and pd.isna(df['seven_day_change'].iloc[1])
+    # the shifted injury-tag row is repaired before typing
+    assert df['team'].iloc[1] == 'Min' and pd.isna(df['position'].iloc[1])
+
+
+def test_cached_frames_are_copies(tmp_path):
+    path = write(tmp_path / 'espn_draft_trends_2030-01-01.csv', ESPN_HEADER + '1,A,Cin,WR,1.5,0,2030-01-01\n')
+    first = loader.load(path)
+    first.loc[0, 'adp'] = 99.0
+    assert loader.load(path)['adp'].iloc[0] == 1.5
+    assert (loader.cache_info().hits, loader.cache_info().misses) == (1, 1)
+
+
+def test_cache_invalidates_on_mtime_or_size_change(tmp_path):
+    path = write(tmp_path / 'espn_draft_trends_2030-01-01.csv', ESPN_HEADER + '1,A,Cin,WR,1.5,0,2030-01-01\n', mtime_ns=10**18)
+    assert loader.load(path)['adp'].iloc[0] == 1.5
+
+    # same size, new mtime
+    write(tmp_path / 'espn_draft_trends_2030-01-01.csv', ESPN_HEADER + '1,A,Cin,WR,2.5,0,2030-01-01\n', mtime_ns=10**18 + 10**9)
+    assert loader.load(path)['adp'].iloc[0] == 2.5
+
+    # same mtime, new size
+    write(tmp_path / 'espn_draft_trends_2030-01-01.csv', ESPN_HEADER + '1,A,Cin,WR,12.5,0,2030-01-01\n', mtime_ns=10**18 + 10**9)
+    assert loader.load(path)['adp'].iloc[0] == 12.5
+
+    loader.load(path)
+    assert (loader.cache_info().hits, loader.cache_info().misses) == (1, 3)
+
+
+def test_schema_version_by_header():
+    assert loader.schema_version('bettingpros', loader.SCHEMAS[('bettingpros', 1)]) == 1
+    assert loader.schema_version('bettingpros', loader.SCHEMAS[('bettingpros', 2)]) == 2
+    assert loader.schema_version('bettingpros', ['player_name', 'extra']) == 2
+    with pytest.raises(ValueError):
+        loader.schema_version('unknown', [])
+
+
+def test_unknown_file_name_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        loader.load(write(tmp_path / 'notes.csv', 'a\n1\n'))
+
+
+def test_load_source_concatenates_in_date_order(tmp_path):
+    write(tmp_path / 'espn_draft_trends_2030-01-02.csv', ESPN_HEADER + '1,B,Buf,QB,3.0,0,2030-01-02\n')
+    write(tmp_path / 'espn_draft_trends_2030-01-01.csv', ESPN_HEADER + '1,A,Cin,WR,1.5,0,2030-01-01\n')
+    df = loader.load_source('espn', data_dir=str(tmp_path))
+    assert list(df['player_name']) == ['A', 'B']
+    assert isinstance(df['team'].dtype, pd.CategoricalDtype)
+    assert list(loader.load_source('espn', data_dir=str(tmp_path), start='2030-01-02')['player_name']) == ['B']
+    assert loader.load_source('boris', data_dir=str(tmp_path)) is None
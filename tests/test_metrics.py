@@ -0,0 +1,98 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+import metrics
+from metrics import Registry, RunMetrics
+
+
+def records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_spans_and_summary_are_written_as_json_lines(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    run = RunMetrics('test-spans', path=str(path))
+    with run.span('parse', page=1) as attrs:
+        attrs['rows'] = 25
+    with pytest.raises(ValueError):
+        with run.span('scroll'):
+            raise ValueError('stale')
+    run.record('fetch', 0.25, note=None)
+    run.count('rows', 25)
+    run.count('rows', 5)
+    run.count('retries', 0)
+    run.close(rows_written=30)
+
+    spans = records(path)
+    assert {r['run'] for r in spans} == {run.run_id} and {r['source'] for r in spans} == {'test-spans'}
+    assert [(r['type'], r.get('name')) for r in spans] == [('span', 'parse'), ('span', 'scroll'), ('span', 'fetch'), ('summary', None)]
+    assert spans[0]['page'] == 1 and spans[0]['rows'] == 25 and 'error' not in spans[0]
+    assert spans[1]['error'] == 'ValueError'
+    assert spans[2]['duration_ms'] == 250.0 and 'note' not in spans[2]
+    assert spans[3]['counters'] == {'rows': 30} and spans[3]['rows_written'] == 30
+
+
+def test_empty_metrics_file_disables_the_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('METRICS_FILE', '')
+    run = RunMetrics('test-disabled')
+    with run.span('parse'):
+        pass
+    run.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+class Driver:
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append(command)
+        return {'value': None}
+
+
+def test_watch_driver_counts_commands_until_close(tmp_path):
+    driver = Driver()
+    run = RunMetrics('test-driver', path=str(tmp_path / 'm.jsonl'))
+    assert run.watch_driver(driver) is driver
+    driver.execute('findElements')
+    driver.execute('executeScript', {'script': ''})
+    run.close()
+    driver.execute('quit')
+    assert run.counters == {'webdriver_calls': 2}
+    assert driver.commands == ['findElements', 'executeScript', 'quit']
+    assert 'execute' not in driver.__dict__
+
+
+def test_registry_renders_cumulative_histogram_buckets():
+    registry = Registry()
+    registry.observe('espn', 'page', 0.02)
+    registry.observe('espn', 'page', 3)
+    registry.inc('espn', 'rows', 10)
+    text = registry.render()
+    assert 'scrape_span_seconds_bucket{source="espn",span="page",le="0.01"} 0' in text
+    assert 'scrape_span_seconds_bucket{source="espn",span="page",le="0.025"} 1' in text
+    assert 'scrape_span_seconds_bucket{source="espn",span="page",le="5"} 2' in text
+    assert 'scrape_span_seconds_bucket{source="espn",span="page",le="+Inf"} 2' in text
+    assert 'scrape_span_seconds_sum{source="espn",span="page"} 3.020000' in text
+    assert 'scrape_events_total{source="espn",name="rows"} 10' in text
+
+
+def test_metrics_endpoint(monkeypatch):
+    monkeypatch.setattr(metrics, '_server', None)
+    monkeypatch.setenv('METRICS_PORT', '0')
+    server = metrics.serve_from_env()
+    try:
+        assert metrics.serve_from_env() is server
+        metrics.REGISTRY.inc('test-endpoint', 'rows', 3)
+        url = f'http://127.0.0.1:{server.server_port}'
+        with urllib.request.urlopen(url + '/metrics') as response:
+            assert 'scrape_events_total{source="test-endpoint",name="rows"} 3' in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError) as missing:
+            urllib.request.urlopen(url + '/other')
+        assert missing.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
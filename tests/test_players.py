@@ -0,0 +1,7 @@
+from players import normalize_name
+
+
+def test_nickname_only_expands_for_its_player():
+    assert normalize_name('Tank Dell') == normalize_name('Nathaniel Dell')
+    assert normalize_name('Tank Bigsby') == 'tank bigsby'
+    assert normalize_name('Mike Evans') == normalize_name('Michael Evans')
@@ -0,0 +1,81 @@
+import os
+import glob
+import pandas as pd
+import pytest
+from prop_normalize import accuracy, normalize_frame, normalize_props
+from replay import replay_bettingpros
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROP_FILES = sorted(glob.glob(os.path.join(ROOT, 'Data', 'bettingpros_prop_bets_*.csv')))
+
+
+def read(name):
+    return pd.read_csv(os.path.join(ROOT, 'Data', name), dtype=str, keep_default_na=False)
+
+
+@pytest.mark.parametrize('path', PROP_FILES, ids=os.path.basename)
+def test_parse_rates_on_the_data_files(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    rates = accuracy(df, normalize_frame(df))
+    # the only rows left unparsed are premium teasers with no line at all
+    teasers = df['bet_type'].str.contains('click to view', case=False).mean()
+    assert rates['line'] >= 1 - teasers
+    assert rates['stat'] >= 1 - teasers
+    assert rates['side'] == 1.0
+    assert rates['valid'] >= 1 - teasers
+
+
+def row(typed, df, name, bet_type):
+    match = typed[(df['player_name'] == name) & (df['bet_type'] == bet_type)]
+    assert len(match) == 1, (name, bet_type)
+    return match.iloc[0]
+
+
+def test_unlabeled_markets():
+    df = read('bettingpros_prop_bets_2025-09-17.csv')
+    typed = normalize_frame(df)
+    herbert = row(typed, df, 'Justin Herbert', 'U 22.5')
+    assert (herbert['line'], herbert['side'], herbert['stat']) == (22.5, 'under', 'pass_cmp')
+    assert herbert['edge'] == -2.0
+    wr = typed[(df['bet_type'] == 'O 0.5') & (df['position'] == 'WR')]
+    assert len(wr) and (wr['stat'] == 'td').all() and (wr['side'] == 'over').all() and (wr['line'] == 0.5).all()
+
+
+def test_current_and_2025_09_03_layouts():
+    df = read('bettingpros_prop_bets_final_2025-09-21.csv')
+    walker = row(normalize_frame(df), df, 'Kenneth Walker III', 'Rush Yds')
+    assert (walker['line'], walker['stat'], walker['side'], walker['edge']) == (82.5, 'rush_yds', 'under', -10.4)
+    assert pd.isna(walker['odds'])
+
+    df = read('bettingpros_prop_bets_2025-09-03.csv')
+    typed = normalize_frame(df)
+    jcm = row(typed, df, 'Jacory Croskey-Merritt', '23.5 Rush Yds')
+    assert (jcm['line'], jcm['projection'], jcm['side'], jcm['stat'], jcm['bet_type']) == (23.5, 44.1, 'over', 'rush_yds', 'Rush Yds')
+
+
+def test_scraped_text_is_normalized_once():
+    raw = [
+        {'player_name': 'Kenneth Walker III', 'position': 'rb', 'matchup': '- NO @ SEA', 'bet_type': 'Rush Yds',
+         'line': '82.5 Rush Yds', 'odds': '-10.4'},
+        {'player_name': 'Aaron Rodgers', 'position': 'QB', 'matchup': 'PIT @ NE', 'bet_type': 'U 23.5',
+         'line': 'U 23.5 U 23.5', 'odds': '-3.2'},
+        {'player_name': 'Jordan Mason', 'bet_type': '', 'line': 'o79.5 Rush Yds (+110)'},
+        {'player_name': 'Tua Tagovailoa', 'bet_type': 'Click to view premium content',
+         'line': 'Click to view premium content', 'odds': '-1.5'},
+    ]
+    out = [(r['player_name'], r['position'], r['matchup'], r['bet_type'], r['line'], r['odds']) for r in normalize_props(raw)]
+    assert out == [
+        ('Kenneth Walker III', 'RB', 'NO @ SEA', 'Rush Yds', '82.5', '-10.4'),
+        ('Aaron Rodgers', 'QB', 'PIT @ NE', '', 'U 23.5', '-3.2'),
+        ('Jordan Mason', '', '', 'Rush Yds', 'O 79.5', '+110'),
+    ]
+    # the canonical rows parse to the same values again
+    assert normalize_props(normalize_props(raw)) == normalize_props(raw)
+
+
+def test_replayed_scrape_matches_the_final_file():
+    rows = pd.DataFrame(replay_bettingpros(os.path.join(ROOT, 'fixtures', 'replay', 'bettingpros_2025-09-21')))
+    final = read('bettingpros_prop_bets_final_2025-09-21.csv')
+    assert len(rows) == len(final) - final['line'].eq('').sum()
+    typed = normalize_frame(rows)
+    assert typed['valid'].all() and (typed['stat'] != '').all()
@@ -0,0 +1,89 @@
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+import pytest
+import prop_projections
+from prop_projections import DEFAULT_OVERROUND, devig, implied_probability, probit, project, projections
+
+
+def test_implied_probability_from_american_odds():
+    got = implied_probability([-110, 150, -200, 100, np.nan])
+    assert got[:4] == pytest.approx([110 / 210, 0.4, 2 / 3, 0.5])
+    assert np.isnan(got[4])
+
+
+def test_devig_normalizes_both_sides():
+    over = implied_probability([-110, -200, np.nan, np.nan, np.nan])
+    under = implied_probability([-110, 150, -110, np.nan, 10000])
+    fair = devig(over, under)
+    assert fair[0] == pytest.approx(0.5)
+    assert fair[1] == pytest.approx((2 / 3) / (2 / 3 + 0.4))
+    assert fair[2] == pytest.approx(1 - (110 / 210) / DEFAULT_OVERROUND) == pytest.approx(0.5)
+    assert np.isnan(fair[3])
+    assert fair[4] == 0.99  # clipped
+
+
+def test_devig_with_only_the_over_price():
+    assert devig(np.array([0.6]), np.array([np.nan]))[0] == pytest.approx(0.6 / DEFAULT_OVERROUND)
+
+
+def test_probit_is_centred_and_symmetric():
+    assert probit(0.5) == 0
+    assert probit(0.8) == pytest.approx(-probit(0.2))
+    for p in np.linspace(0.2, 0.8, 61):
+        assert probit(p) == pytest.approx(NormalDist().inv_cdf(p), abs=0.03)
+    for p in np.linspace(0.05, 0.95, 91):
+        assert probit(p) == pytest.approx(NormalDist().inv_cdf(p), abs=0.09)
+
+
+def props_frame(rows):
+    df = pd.DataFrame(rows, columns=['player_name', 'position', 'stat', 'line', 'side', 'projection', 'edge', 'odds'])
+    df['odds'] = df['odds'].astype('Int64')
+    df['valid'] = True
+    return df
+
+
+PROPS = props_frame([
+    ('Josh Allen', 'QB', 'pass_yds', 240.5, 'over', 250.0, np.nan, pd.NA),  # projection wins
+    ('Josh Allen', 'QB', 'td', 0.5, 'over', np.nan, 0.2, pd.NA),            # line + edge
+    ('Josh Allen', 'QB', 'pass_int', 0.5, 'under', np.nan, np.nan, pd.NA),  # line alone
+    ('Stefon Diggs', 'WR', 'rec', 5.5, 'over', np.nan, np.nan, -150),       # de-vigged odds
+    ('Stefon Diggs', 'WR', 'rec', 5.5, 'under', np.nan, np.nan, 130),
+    ('Stefon Diggs', 'WR', 'rec_yds', 70.5, 'over', np.nan, np.nan, pd.NA),
+    ('Nobody', 'WR', 'rec_yds', np.nan, 'over', 10.0, np.nan, pd.NA),       # no line: dropped
+])
+
+
+def test_project_points_per_format():
+    result = project(PROPS).set_index('player_name')
+    assert list(result.index) == ['Josh Allen', 'Stefon Diggs']
+
+    allen = 250 * 0.04 + 0.7 * 6 - 0.5 * 2
+    assert result.loc['Josh Allen', 'markets'] == 3
+    assert result.loc['Josh Allen', ['points_standard', 'points_ppr', 'points_half_ppr']].tolist() == [round(allen, 2)] * 3
+
+    p_over, p_under = 150 / 250, 100 / 230
+    fair = p_over / (p_over + p_under)
+    receptions = 5.5 + 1.8 * math.log(fair / (1 - fair)) / 1.702
+    assert result.loc['Stefon Diggs', 'rec'] == pytest.approx(receptions)
+    assert result.loc['Stefon Diggs', 'points_standard'] == pytest.approx(7.05)
+    assert result.loc['Stefon Diggs', 'points_ppr'] == pytest.approx(round(7.05 + receptions, 2))
+    assert result.loc['Stefon Diggs', 'points_half_ppr'] == pytest.approx(round(7.05 + receptions / 2, 2))
+
+
+def test_project_without_usable_markets():
+    result = project(PROPS.assign(valid=False))
+    assert result.empty and 'points_ppr' in result.columns
+
+
+def test_projections_are_cached_by_content(monkeypatch):
+    monkeypatch.setattr(prop_projections, '_cache', prop_projections.OrderedDict())
+    calls = []
+    real = prop_projections.project
+    monkeypatch.setattr(prop_projections, 'project', lambda props: calls.append(1) or real(props))
+    first = projections(PROPS)
+    first.loc[0, 'points_ppr'] = -1
+    assert projections(PROPS.copy())['points_ppr'].iloc[0] > 0
+    projections(PROPS.assign(line=PROPS['line'] + 1))
+    assert len(calls) == 2
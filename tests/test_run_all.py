@@ -0,0 +1,63 @@
+import threading
+import time
+import pandas as pd
+import run_all
+from browser import DriverPool
+
+
+class Driver:
+    def __init__(self):
+        self.quit_called = threading.Event()
+
+    def quit(self):
+        self.quit_called.set()
+
+
+def use_sources(monkeypatch, sources, browsers_factory=Driver):
+    monkeypatch.setattr(run_all, 'SOURCES', sources)
+    monkeypatch.setattr(run_all, 'DriverPool', lambda size: DriverPool(size, factory=browsers_factory))
+    monkeypatch.setattr(run_all, 'POLL_SECONDS', 0.05)
+
+
+def test_sources_waiting_for_a_browser_get_their_own_timeout(monkeypatch):
+    def scrape(driver):
+        time.sleep(0.4)
+        return pd.DataFrame({'a': [1, 2]})
+    use_sources(monkeypatch, {'first': ('browser', scrape), 'second': ('browser', scrape)})
+
+    # one browser: the second source runs after the first, past a deadline shared from the run start
+    summary = run_all.run_all(timeout=0.7, browsers=1)
+    assert {name: s['status'] for name, s in summary.items()} == {'first': 'ok', 'second': 'ok'}
+    assert all(0.35 < s['latency'] < 0.7 for s in summary.values())
+
+
+def test_hung_source_is_abandoned_and_its_browser_quit(monkeypatch):
+    release = threading.Event()
+    drivers = []
+
+    def hang(driver):
+        drivers.append(driver)
+        release.wait()
+
+    def quick():
+        return {'ppr': pd.DataFrame({'a': [1]})}
+    use_sources(monkeypatch, {'hung': ('browser', hang), 'quick': ('http', quick)})
+    try:
+        started = time.perf_counter()
+        summary = run_all.run_all(timeout=0.3, browsers=1)
+        assert time.perf_counter() - started < 1.0
+        assert summary['hung']['status'] == 'timeout' and summary['quick'] == dict(summary['quick'], status='ok', rows=1)
+        assert drivers[0].quit_called.is_set()
+        worker = next(t for t in threading.enumerate() if t.name == 'source-hung')
+        assert worker.daemon  # not joined at interpreter exit
+    finally:
+        release.set()
+
+
+def test_failed_source_does_not_stop_the_others(monkeypatch):
+    def broken():
+        raise RuntimeError('site down')
+    use_sources(monkeypatch, {'broken': ('http', broken), 'empty': ('http', lambda: None)})
+    summary = run_all.run_all(timeout=5)
+    assert summary['broken']['status'] == 'failed' and summary['broken']['error'] == 'site down'
+    assert summary['empty']['status'] == 'empty'
@@ -0,0 +1,61 @@
+import os
+import csv
+from datetime import datetime
+import run_all
+import scheduler
+import scrape_bettingpros as S
+from checkpoint import CsvCheckpoint
+from conftest import FakeDriver, prop
+
+
+def test_changed_bettingpros_is_rescraped_without_the_old_checkpoint(bettingpros, monkeypatch, tmp_path):
+    today = f"{datetime.now():%Y-%m-%d}"
+    calls = []
+
+    def scrape(**kwargs):
+        calls.append(kwargs)
+        return S.scrape_bettingpros_prop_bets(driver=FakeDriver(), **kwargs)
+    monkeypatch.setitem(run_all.SOURCES, 'bettingpros', ('http', scrape))
+    monkeypatch.setattr(S, 'iter_bettingpros_pages', lambda *a, **k: iter([[prop('James Cook', 'Rush Yds', '70.5')]]))
+
+    # an earlier run today left its (now moved) line in an unfinished checkpoint
+    os.makedirs('Data', exist_ok=True)
+    with CsvCheckpoint(f'Data/bettingpros_prop_bets_{today}.csv', S.PROP_FIELDS) as checkpoint:
+        checkpoint.append([prop('James Cook', 'Rush Yds', '62.5')])
+
+    sched = scheduler.Scheduler(['bettingpros'], state_path=str(tmp_path / 'state.json'),
+                                probes={'bettingpros': lambda: 'b'}, clock=lambda: 10000.0)
+    sched.state.get('bettingpros').update({'fingerprint': 'a', 'last_probe': 1.0, 'last_scrape': 1.0})
+    assert sched.tick() == {'bettingpros': 'changed'}
+
+    assert calls == [{'resume': False}]
+    with open(f'Data/bettingpros_prop_bets_final_{today}.csv', newline='', encoding='utf-8') as f:
+        assert [(r['player_name'], r['line']) for r in csv.DictReader(f)] == [('James Cook', '70.5')]
+    assert sched.state.get('bettingpros')['fingerprint'] == 'b'
+
+
+def test_probe_only_tick_leaves_the_state_file_alone(tmp_path):
+    state_path = tmp_path / 'state.json'
+    scraped = []
+
+    def scrape(names):
+        scraped.extend(names)
+        return {name: {'status': 'ok', 'rows': 3} for name in names}
+    now = [10000.0]
+    sched = scheduler.Scheduler(['boris'], state_path=str(state_path), probes={'boris': lambda: 'a'},
+                                scrape=scrape, clock=lambda: now[0])
+    assert sched.tick() == {'boris': 'never scraped'}
+    written = state_path.read_text()
+    assert '"fingerprint": "a"' in written and 'last_probe' not in written
+
+    now[0] += 4000
+    assert sched.tick() == {}
+    assert scraped == ['boris']
+    assert state_path.read_text() == written
+
+    # a restarted scheduler still knows when it last probed
+    again = scheduler.Scheduler(['boris'], state_path=str(state_path), probes={'boris': lambda: 'a'},
+                                scrape=scrape, clock=lambda: now[0] + 10)
+    assert again.state.get('boris')['last_probe'] == now[0]
+    assert again.state.get('boris')['probes'] == 2
+    assert again.due() == []
@@ -0,0 +1,24 @@
+import os
+import shutil
+from loader import latest_snapshots
+from players import snapshot_files
+from snapshot_store import ingest, SnapshotStore
+
+
+def test_fresh_checkout_reads_snapshots_only_in_the_store(tmp_path, monkeypatch):
+    monkeypatch.delenv('SNAPSHOT_DIR', raising=False)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Data')
+    data = tmp_path / 'Data'
+    data.mkdir()
+    for name in ('espn_draft_trends_2025-08-20.csv', 'espn_draft_trends_2025-09-03.csv'):
+        shutil.copy(os.path.join(src, name), data / name)
+    ingest([str(p) for p in data.glob('*.csv')], SnapshotStore(str(data / 'snapshots')))
+    # the workflow commits the store but not the newest dated CSV
+    newest = (data / 'espn_draft_trends_2025-09-03.csv').read_bytes()
+    (data / 'espn_draft_trends_2025-09-03.csv').unlink()
+
+    files = snapshot_files(str(data))
+    assert [f[3] for f in files] == ['2025-08-20', '2025-09-03']
+    assert (data / 'espn_draft_trends_2025-09-03.csv').read_bytes() == newest
+    espn, _, _ = latest_snapshots(str(data))
+    assert set(espn['date_scraped'].astype(str)) == {'2025-09-03'}
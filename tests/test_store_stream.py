@@ -0,0 +1,65 @@
+import csv
+import tracemalloc
+import store
+from scrape_bettingpros import FINAL_FIELDS, FinalCsv
+from conftest import prop
+
+
+def write_final_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FINAL_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow(dict(prop(f'Player {i}', 'Rush Yds', f'{i % 90}.5'), date_scraped='2030-01-01'))
+
+
+def peak_bytes(csv_path, root):
+    tracemalloc.start()
+    try:
+        _, rows = store.write_snapshot_csv(csv_path, 'bettingpros', '2030-01-01', root=root, chunk_rows=5_000)
+        return rows, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_store_write_memory_does_not_grow_with_rows(tmp_path):
+    small, large = tmp_path / 'small.csv', tmp_path / 'large.csv'
+    write_final_csv(small, 20_000)
+    write_final_csv(large, 80_000)
+
+    small_rows, small_peak = peak_bytes(small, tmp_path / 'a')
+    large_rows, large_peak = peak_bytes(large, tmp_path / 'b')
+
+    assert (small_rows, large_rows) == (20_000, 80_000)
+    assert large_peak < 1.5 * small_peak, (small_peak, large_peak)
+    assert len(store.read('bettingpros', root=tmp_path / 'b')) == 80_000
+
+
+def test_stream_run_returns_path_and_row_count(bettingpros, monkeypatch):
+    monkeypatch.setenv('STREAM_PROPS', 'true')
+    result = bettingpros([prop('James Cook', 'Rush Yds', '62.5'), prop('Josh Allen', 'Pass Yds', '240.5')])
+    assert isinstance(result, FinalCsv)
+    assert len(result) == 2
+    assert list(result.read()['player_name']) == ['James Cook', 'Josh Allen']
+    assert len(store.read('bettingpros')) == 2
+
+
+def test_record_snapshot_counts_changes_from_a_stream(tmp_path):
+    from line_moves import record_snapshot, load_changes
+    log = str(tmp_path / 'changes.csv')
+    first, second = tmp_path / 'first.csv', tmp_path / 'second.csv'
+    write_final_csv(first, 3_000)
+    write_final_csv(second, 3_000)
+    with open(second, newline='') as f:
+        rows = list(csv.DictReader(f))
+    rows[0]['line'] = '99.5'
+    with open(second, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FINAL_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows[:2_500])
+
+    with open(first, newline='') as f:
+        assert record_snapshot(csv.DictReader(f), '2030-01-01T00:00:00', path=log) == {'new': 3_000, 'moved': 0, 'removed': 0}
+    with open(second, newline='') as f:
+        assert record_snapshot(csv.DictReader(f), '2030-01-01T00:30:00', path=log) == {'new': 0, 'moved': 1, 'removed': 0}
+    assert len(load_changes(log)) == 3_001
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from value import compute_values, value_boards
+
+COLUMNS = ['player_name', 'scoring_format', 'position', 'rank', 'avg_rank', 'std_dev', 'tier', 'adp']
+BOARD = pd.DataFrame([
+    ('Late RB', 'PPR', 'RB', 3, 3.1, 2.0, 2, 10.0),
+    ('Top RB', 'PPR', 'RB', 1, 1.2, 0.2, 1, 3.0),
+    ('WR One', 'PPR', 'WR', 4, 4.0, 1.0, 1, 4.0),
+    ('Second RB', 'PPR', 'RB', 2, 2.5, 1.0, 1, 1.5),
+    ('No ADP', 'PPR', 'RB', 5, 5.0, 1.0, 3, np.nan),
+    ('Top RB', 'Half', 'RB', 1, 1.0, 1.0, 1, 2.0),
+], columns=COLUMNS)
+
+
+def test_compute_values_on_a_fixed_board():
+    values = compute_values(BOARD)
+    got = values[['player_name', 'scoring_format', 'value', 'z_score', 'pos_rank', 'tier_left', 'next_tier_gap', 'dropoff']]
+    expected = pd.DataFrame([
+        ('Top RB', 'Half', 1.0, 1.0, 1, 0, np.nan, 0.0),
+        ('Top RB', 'PPR', 2.0, 3.6, 1, 1, 2.0, 1.9),  # std dev floored at MIN_STD_DEV; dropoff capped at the last RB
+        ('Second RB', 'PPR', -0.5, -1.0, 2, 0, 1.0, 0.6),
+        ('Late RB', 'PPR', 7.0, 3.45, 3, 0, np.nan, 0.0),
+        ('WR One', 'PPR', 0.0, 0.0, 1, 0, np.nan, 0.0),
+    ], columns=got.columns)
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected, check_dtype=False)
+
+
+def test_compute_values_empty_and_all_missing():
+    assert compute_values(BOARD.iloc[:0]).empty
+    assert compute_values(BOARD.assign(adp=np.nan)).empty
+
+
+def test_value_boards_rank_by_value_per_format():
+    boards = value_boards(compute_values(BOARD))
+    assert list(boards) == ['Half', 'PPR']
+    assert list(boards['PPR']['player_name']) == ['Late RB', 'Top RB', 'WR One', 'Second RB']
+    assert list(value_boards(compute_values(BOARD), top=1)['PPR']['player_name']) == ['Late RB']
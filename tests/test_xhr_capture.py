@@ -0,0 +1,73 @@
+import json
+import os
+from xhr_capture import decode_bettingpros_props, decode_espn_players, decode_file
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'xhr')
+BETTINGPROS = os.path.join(FIXTURES, 'bettingpros_props_2025-09-21.json')
+ESPN = os.path.join(FIXTURES, 'espn_kona_player_info_2025-09-03.json')
+
+
+def payload(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['payload']
+
+
+def test_bettingpros_fixture_decodes_to_dom_rows():
+    rows = decode_file(BETTINGPROS, '2025-09-21')
+    assert len(rows) == 40
+    assert rows[0] == {'player_name': 'Kenneth Walker III', 'position': 'RB', 'matchup': 'NO @ SEA', 'bet_type': 'Rush Yds',
+                       'line': '82.5', 'odds': '-10.4', 'sportsbook': '', 'date_scraped': '2025-09-21'}
+    assert rows[1]['bet_type'] == 'Pass Yds' and rows[1]['position'] == 'QB' and rows[1]['line'] == '207.5'
+
+
+def test_bettingpros_odds_sign_follows_the_recommended_side():
+    data = payload(BETTINGPROS)
+    rows = decode_bettingpros_props(data, '2025-09-21')
+    sides = [p['projection']['recommended_side'] for p in data['props']]
+    assert {'over', 'under'} <= set(sides)
+    for row, side in zip(rows, sides):
+        assert row['odds'][0] == ('+' if side == 'over' else '-'), row
+
+
+def test_bettingpros_takes_the_recommended_sides_line_and_skips_nameless_props():
+    data = {
+        'events': [{'id': 1, 'visitor': 'BUF', 'home': 'MIA'}],
+        'markets': [{'id': 7, 'label': 'Receptions'}],
+        'props': [
+            {'participant': {'name': 'Dalton Kincaid', 'player': {'position': 'TE'}}, 'market_id': 7, 'event_id': 1,
+             'over': {'line': 4.5}, 'under': {'line': 5.0}, 'projection': {'recommended_side': 'under', 'diff': -0.75}},
+            {'participant': {'name': 'Tyreek Hill'}, 'market_id': 8, 'event_id': 2,
+             'over': {'line': 6}, 'projection': {'diff': 1}},
+            {'participant': {'name': ' '}, 'market_id': 7, 'event_id': 1, 'over': {'line': 1.5}},
+        ],
+    }
+    rows = decode_bettingpros_props(data, '2025-09-21')
+    assert [(r['player_name'], r['position'], r['matchup'], r['bet_type'], r['line'], r['odds']) for r in rows] == [
+        ('Dalton Kincaid', 'TE', 'BUF @ MIA', 'Receptions', '5', '-0.8'),
+        ('Tyreek Hill', '', '', '', '6', '+1.0'),
+    ]
+
+
+def test_espn_fixture_is_ranked_by_adp_with_teams_and_positions_mapped():
+    rows = decode_file(ESPN, '2025-09-03')
+    assert len(rows) == 50
+    assert rows[0] == {'rank': 1, 'player_name': "Ja'Marr Chase", 'team': 'Cin', 'position': 'WR', 'adp': 1.5,
+                       'seven_day_change': 0.0, 'date_scraped': '2025-09-03'}
+    assert [r['rank'] for r in rows] == list(range(1, 51))
+    assert [r['adp'] for r in rows] == sorted(r['adp'] for r in rows)
+    assert {r['position'] for r in rows} <= {'QB', 'RB', 'WR', 'TE', 'K', 'D/ST'}
+    assert all(r['team'] for r in rows)
+
+
+def test_espn_skips_players_without_adp_and_leaves_unknown_ids_blank():
+    data = {'players': [
+        {'player': {'fullName': 'Late Pick', 'proTeamId': 2, 'defaultPositionId': 4,
+                    'ownership': {'averageDraftPosition': 140.26, 'averageDraftPositionPercentChange': -1.04}}},
+        {'player': {'fullName': 'Undrafted', 'proTeamId': 2, 'defaultPositionId': 2, 'ownership': {}}},
+        {'fullName': 'Early Pick', 'proTeamId': 99, 'defaultPositionId': 9, 'ownership': {'averageDraftPosition': 12}},
+    ]}
+    rows = decode_espn_players(data, '2025-09-03')
+    assert [(r['rank'], r['player_name'], r['team'], r['position'], r['adp'], r['seven_day_change']) for r in rows] == [
+        (1, 'Early Pick', '', '', 12.0, 0.0),
+        (2, 'Late Pick', 'Buf', 'TE', 140.3, -1.0),
+    ]
@@ -0,0 +1,105 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from loader import latest_snapshots
+from players import join_sources, load_index
+
+# Positional rank gap used for drop-off: how much worse (in Boris avg rank) the player
+# this many spots down the position is. Roughly one starter per team per league of 12.
+DROPOFF_WINDOW = {'QB': 12, 'RB': 24, 'WR': 24, 'TE': 12, 'K': 12, 'DST': 12}
+DEFAULT_WINDOW = 12
+MIN_STD_DEV = 0.5
+
+
+def _group_codes(*columns):
+    """Dense integer code per distinct combination of the given arrays."""
+    keys = np.rec.fromarrays(columns)
+    _, codes = np.unique(keys, return_inverse=True)
+    return codes.ravel()
+
+
+def compute_values(joined):
+    """Value metrics for every (player, scoring format) row that has both an ESPN ADP and a
+    Boris rank, in one vectorized pass over all formats:
+
+    value        ADP minus Boris rank (positive: the market drafts him later than the experts rank him)
+    z_score      (ADP - Boris avg rank) / Boris std dev, with std dev floored at MIN_STD_DEV
+    pos_rank     rank within scoring format and position
+    tier_left    same-position players still in his tier after him
+    next_tier_gap  Boris ranks until the first same-position player of the next tier
+    dropoff      Boris avg-rank gap to the player DROPOFF_WINDOW spots lower at his position
+    """
+    df = joined.dropna(subset=['adp', 'rank']).copy()
+    df['position'] = df['position'].fillna('').astype(str)
+    df = df.sort_values(['scoring_format', 'position', 'rank'], kind='stable').reset_index(drop=True)
+    n = len(df)
+    if not n:
+        return df
+
+    rank = df['rank'].to_numpy(dtype=float)
+    adp = df['adp'].to_numpy(dtype=float)
+    avg = df['avg_rank'].to_numpy(dtype=float)
+    std = np.maximum(df['std_dev'].to_numpy(dtype=float), MIN_STD_DEV)
+    tier = df['tier'].to_numpy(dtype=float)
+    fmt = df['scoring_format'].astype(str).to_numpy()
+    pos = df['position'].to_numpy()
+
+    df['value'] = adp - rank
+    df['z_score'] = (adp - avg) / std
+
+    # rows are sorted by (format, position, rank): groups are contiguous runs
+    group = _group_codes(fmt, pos)
+    starts = np.r_[0, np.flatnonzero(np.diff(group)) + 1]
+    sizes = np.diff(np.r_[starts, n])
+    first = np.repeat(starts, sizes)
+    pos_rank = np.arange(n) - first
+    df['pos_rank'] = pos_rank + 1
+
+    # tier runs within each position group
+    tier_group = _group_codes(fmt, pos, tier)
+    tier_starts = np.r_[0, np.flatnonzero(np.diff(tier_group) != 0) + 1]
+    tier_sizes = np.diff(np.r_[tier_starts, n])
+    tier_end = np.repeat(tier_starts + tier_sizes, tier_sizes)  # index just past the tier run
+    df['tier_left'] = tier_end - np.arange(n) - 1
+    group_end = first + np.repeat(sizes, sizes)
+    has_next = tier_end < group_end
+    next_rank = rank[np.minimum(tier_end, n - 1)]
+    df['next_tier_gap'] = np.where(has_next, next_rank - rank, np.nan)
+
+    window = df['position'].map(DROPOFF_WINDOW).fillna(DEFAULT_WINDOW).to_numpy(dtype=int)
+    target = np.minimum(np.arange(n) + window, group_end - 1)
+    df['dropoff'] = avg[target] - avg
+    return df
+
+
+def value_boards(values, top=None):
+    """{scoring_format: board} sorted by value (ties by z-score), best value first."""
+    boards = {}
+    for scoring_format, board in values.groupby('scoring_format', sort=True):
+        board = board.sort_values(['value', 'z_score'], ascending=False, kind='stable')
+        boards[scoring_format] = (board.head(top) if top else board).reset_index(drop=True)
+    return boards
+
+
+def latest_values(data_dir='Data'):
+    """compute_values over the newest ESPN, Boris and BettingPros snapshots."""
+    espn, boris, props = latest_snapshots(data_dir)
+    return compute_values(join_sources(espn, boris, props, load_index(data_dir)))
+
+
+if __name__ == '__main__':
+    # python value.py [repeat]  print the boards; `repeat` tiles the pool to time larger inputs
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    espn, boris, props = latest_snapshots()
+    joined = join_sources(espn, boris, props, load_index())
+    if repeat > 1:
+        joined = pd.concat([joined.assign(player_id=joined['player_id'] + f'#{i}') for i in range(repeat)], ignore_index=True)
+    started = time.perf_counter()
+    values = compute_values(joined)
+    elapsed = time.perf_counter() - started
+    columns = ['player_name', 'position', 'rank', 'adp', 'value', 'z_score', 'tier', 'tier_left', 'next_tier_gap', 'dropoff']
+    for scoring_format, board in value_boards(values, top=10).items():
+        print(f"\n{scoring_format}:")
+        print(board[columns].round(2).to_string(index=False))
+    print(f"\n{len(values)} player-format rows in {elapsed * 1000:.1f}ms")
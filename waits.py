@@ -0,0 +1,100 @@
+import time
+import logging
+
+logger = logging.getLogger('waits')
+
+# One round trip per poll: locate the table by the first matching selector, make sure a
+# MutationObserver is recording its last change, and report what the callers compare on.
+PROBE_TABLE_JS = """
+var selectors = arguments[0], scroller = arguments[1], table = null;
+for (var i = 0; i < selectors.length && !table; i++) table = document.querySelector(selectors[i]);
+var now = performance.now();
+if (table && !table.__settle) {
+  var state = table.__settle = {last: now};
+  new MutationObserver(function () { state.last = performance.now(); })
+    .observe(table, {childList: true, subtree: true, characterData: true});
+}
+var first = table ? table.querySelector('tr') : null;
+return {
+  found: !!table,
+  rows: table ? (table.rows ? table.rows.length : table.querySelectorAll('tr').length) : 0,
+  first_row: first ? (first.innerText || '').trim() : '',
+  scroll_height: scroller ? scroller.scrollHeight : document.documentElement.scrollHeight,
+  quiet_ms: table ? now - table.__settle.last : 0,
+  ready: document.readyState
+};
+"""
+
+
+class WaitStats:
+    """Splits a run's wall-clock time into time spent waiting on the page vs working."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.waited = 0.0
+        self.waits = 0
+        self.timeouts = 0
+
+    def add(self, elapsed, timed_out=False):
+        self.waited += elapsed
+        self.waits += 1
+        if timed_out:
+            self.timeouts += 1
+
+    def summary(self):
+        total = time.perf_counter() - self.started
+        return f"waited={self.waited:.2f}s, working={total - self.waited:.2f}s, waits={self.waits}, timeouts={self.timeouts}"
+
+
+def wait_until(condition, timeout, stats=None, poll=0.05, max_poll=0.5, backoff=1.6):
+    """Poll `condition` until it returns something truthy or `timeout` seconds pass.
+
+    The poll interval starts at `poll` and grows by `backoff` up to `max_poll`, so fast
+    pages are picked up quickly without hammering the driver on slow ones. Exceptions
+    from `condition` count as "not yet". Returns the truthy value, or None on timeout.
+    """
+    start = time.perf_counter()
+    delay = poll
+    result = None
+    timed_out = False
+    while True:
+        try:
+            result = condition()
+        except Exception:
+            result = None
+        if result:
+            break
+        remaining = timeout - (time.perf_counter() - start)
+        if remaining <= 0:
+            result = None
+            timed_out = True
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_poll)
+    if stats is not None:
+        stats.add(time.perf_counter() - start, timed_out)
+    return result
+
+
+def probe_table(driver, selectors, scroller=None):
+    """Row count, first-row text, scrollHeight and ms since the table last mutated."""
+    return driver.execute_script(PROBE_TABLE_JS, list(selectors), scroller)
+
+
+def wait_for_table(driver, selectors, timeout, changed_from=None, scroller=None, settle_ms=300, stats=None):
+    """Wait until a table matching `selectors` exists, differs from the `changed_from` probe
+    (row count, first row or scrollHeight) when one is given, and has had no DOM mutations
+    for `settle_ms`. Returns the final probe, or None if `timeout` ran out first."""
+    def ready():
+        p = probe_table(driver, selectors, scroller)
+        if not p or not p.get('found'):
+            return None
+        if changed_from is not None and all(p.get(k) == changed_from.get(k) for k in ('rows', 'first_row', 'scroll_height')):
+            return None
+        return p if p.get('quiet_ms', 0) >= settle_ms else None
+    return wait_until(ready, timeout, stats)
+
+
+def wait_for_document(driver, timeout, stats=None):
+    """Wait for document.readyState to leave 'loading'."""
+    return wait_until(lambda: driver.execute_script('return document.readyState;') in ('interactive', 'complete'), timeout, stats)
@@ -0,0 +1,344 @@
+import os
+import re
+import sys
+import json
+import base64
+import logging
+from datetime import datetime
+from browser import network_meter
+from waits import wait_until
+
+logger = logging.getLogger('xhr_capture')
+
+BETTINGPROS_API = re.compile(r'api\.bettingpros\.com/v3/props')
+ESPN_API = re.compile(r'fantasy\.espn\.com/apis/v3/games/ffl/seasons/\d+/segments/\d+/leaguedefaults/\d+\?.*kona_player_info')
+
+ESPN_TEAMS = {
+    0: 'FA', 1: 'Atl', 2: 'Buf', 3: 'Chi', 4: 'Cin', 5: 'Cle', 6: 'Dal', 7: 'Den', 8: 'Det', 9: 'GB',
+    10: 'Ten', 11: 'Ind', 12: 'KC', 13: 'LV', 14: 'LAR', 15: 'Mia', 16: 'Min', 17: 'NE', 18: 'NO',
+    19: 'NYG', 20: 'NYJ', 21: 'Phi', 22: 'Ari', 23: 'Pit', 24: 'LAC', 25: 'SF', 26: 'Sea', 27: 'TB',
+    28: 'Wsh', 29: 'Car', 30: 'Jax', 33: 'Bal', 34: 'Hou',
+}
+ESPN_POSITIONS = {1: 'QB', 2: 'RB', 3: 'WR', 4: 'TE', 5: 'K', 16: 'D/ST'}
+
+# In-page fetch used to follow pagination with the headers the page itself sent
+# (API keys, fantasy filters); the browser drops any header fetch() may not set.
+FETCH_JS = """
+var url = arguments[0], headers = arguments[1], done = arguments[arguments.length - 1];
+fetch(url, {headers: headers, credentials: 'include'})
+  .then(function (r) { return r.text().then(function (t) { done({status: r.status, body: t}); }); })
+  .catch(function (e) { done({status: 0, body: String(e)}); });
+"""
+
+# Several in-page fetches, at most arguments[1] in flight; resolves with results in job order
+FETCH_ALL_JS = """
+var jobs = arguments[0], limit = arguments[1], done = arguments[arguments.length - 1];
+var results = new Array(jobs.length), next = 0;
+function run() {
+  if (next >= jobs.length) return Promise.resolve();
+  var i = next++;
+  return fetch(jobs[i][0], {headers: jobs[i][1], credentials: 'include'})
+    .then(function (r) { return r.text().then(function (t) { results[i] = {status: r.status, body: t}; }); })
+    .catch(function (e) { results[i] = {status: 0, body: String(e)}; })
+    .then(run);
+}
+var workers = [];
+for (var w = 0; w < Math.min(limit, jobs.length); w++) workers.push(run());
+Promise.all(workers).then(function () { done(results); });
+"""
+
+
+def _page_headers(request):
+    """Headers of a captured request that an in-page fetch() can resend."""
+    return {k: v for k, v in ((request or {}).get('headers') or {}).items()
+            if k.lower().startswith('x-') or k.lower() in ('accept', 'content-type')}
+
+
+class ResponseRecorder:
+    """Watches the driver's performance log for JSON responses whose URL matches `pattern`
+    and pulls their bodies with CDP Network.getResponseBody once loading has finished."""
+
+    def __init__(self, driver, pattern, record_dir=None, label='xhr'):
+        self.driver = driver
+        self.pattern = pattern
+        self.record_dir = record_dir or os.getenv('XHR_RECORD_DIR')
+        self.label = label
+        self.pending = {}
+        self.requests = {}
+        self.payloads = []
+        self.meter = network_meter(driver)
+        self.meter.listeners.append(self.handle)
+
+    def close(self):
+        if self.handle in self.meter.listeners:
+            self.meter.listeners.remove(self.handle)
+
+    def poll(self):
+        """Drain new log events; returns the number of payloads captured so far."""
+        self.meter.collect(self.driver)
+        return len(self.payloads)
+
+    def handle(self, event):
+        method = event.get('method')
+        params = event.get('params') or {}
+        request_id = params.get('requestId')
+        if method == 'Network.requestWillBeSent':
+            request = params.get('request') or {}
+            if self.pattern.search(request.get('url', '')):
+                self.requests[request_id] = request
+        elif method == 'Network.responseReceived':
+            response = params.get('response') or {}
+            if self.pattern.search(response.get('url', '')) and 'json' in (response.get('mimeType') or ''):
+                self.pending[request_id] = response.get('url')
+        elif method == 'Network.loadingFinished' and request_id in self.pending:
+            url = self.pending.pop(request_id)
+            self._take(request_id, url)
+
+    def _take(self, request_id, url):
+        try:
+            body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            text = body.get('body', '')
+            if body.get('base64Encoded'):
+                text = base64.b64decode(text).decode('utf-8')
+            payload = json.loads(text)
+        except Exception:
+            logger.debug(f"Could not read response body for {url}", exc_info=True)
+            return
+        self.add(url, payload, self.requests.get(request_id))
+
+    def add(self, url, payload, request=None):
+        self.payloads.append({'url': url, 'payload': payload, 'request': request or {}})
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            path = os.path.join(self.record_dir, f"{self.label}_{datetime.now():%Y%m%d_%H%M%S}_{len(self.payloads)}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'payload': payload}, f)
+            logger.debug(f"Recorded {url} -> {path}")
+
+    def wait(self, timeout, stats=None):
+        """Wait until at least one matching payload has been captured."""
+        return wait_until(self.poll, timeout, stats)
+
+    def fetch(self, url, request=None):
+        """Fetch `url` from inside the page, reusing the captured request's headers."""
+        result = self.driver.execute_async_script(FETCH_JS, url, _page_headers(request))
+        if not result or result.get('status') != 200:
+            logger.debug(f"In-page fetch of {url} failed: {result and result.get('status')}")
+            return None
+        payload = json.loads(result['body'])
+        self.add(url, payload, request)
+        return payload
+
+    def fetch_all(self, jobs, concurrency=4):
+        """Fetch several (url, request) pairs from inside the page in one WebDriver call,
+        `concurrency` at a time. Returns the payloads in job order (None where a fetch failed)."""
+        results = self.driver.execute_async_script(FETCH_ALL_JS, [[url, _page_headers(request)] for url, request in jobs], concurrency)
+        payloads = []
+        for (url, request), result in zip(jobs, results or []):
+            if not result or result.get('status') != 200:
+                logger.debug(f"In-page fetch of {url} failed: {result and result.get('status')}")
+                payloads.append(None)
+                continue
+            payload = json.loads(result['body'])
+            self.add(url, payload, request)
+            payloads.append(payload)
+        return payloads
+
+
+def _signed(value):
+    if value in (None, ''):
+        return ''
+    try:
+        return f"{float(value):+.1f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _line(value):
+    if value in (None, ''):
+        return ''
+    try:
+        return f"{float(value):g}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def decode_bettingpros_props(payload, today_date):
+    """Map a /v3/props payload onto the DOM scraper's row schema (PROP_FIELDS).
+
+    The table shows the recommended side's line and the projection edge in the odds column,
+    so the same values are used here to keep XHR and DOM captures comparable."""
+    events = {e.get('id'): e for e in payload.get('events') or []}
+    markets = {m.get('id'): m for m in payload.get('markets') or []}
+    rows = []
+    for prop in payload.get('props') or []:
+        participant = prop.get('participant') or {}
+        player = participant.get('player') or {}
+        name = (participant.get('name') or '').strip()
+        if not name:
+            continue
+        projection = prop.get('projection') or {}
+        side = prop.get(projection.get('recommended_side') or 'over') or prop.get('over') or {}
+        market = markets.get(prop.get('market_id')) or {}
+        event = events.get(prop.get('event_id')) or {}
+        matchup = f"{event['visitor']} @ {event['home']}" if event.get('visitor') and event.get('home') else ''
+        rows.append({
+            'player_name': name,
+            'position': player.get('position') or '',
+            'matchup': matchup,
+            'bet_type': market.get('short_label') or market.get('label') or market.get('name') or '',
+            'line': _line(side.get('line')),
+            'odds': _signed(projection.get('diff')),
+            'sportsbook': '',
+            'date_scraped': today_date,
+        })
+    return rows
+
+
+def bettingpros_next_url(payload):
+    """URL of the next page of a paginated /v3/props payload, if any."""
+    pagination = payload.get('_pagination') or {}
+    return pagination.get('next') or None
+
+
+def decode_espn_players(payload, today_date):
+    """Map a kona_player_info payload onto the ESPN scraper's row schema, ranked by ADP."""
+    rows = []
+    for entry in payload.get('players') or []:
+        player = entry.get('player') or entry
+        ownership = player.get('ownership') or {}
+        adp = ownership.get('averageDraftPosition')
+        name = (player.get('fullName') or '').strip()
+        if not name or not adp:
+            continue
+        rows.append({
+            'player_name': name,
+            'team': ESPN_TEAMS.get(player.get('proTeamId'), ''),
+            'position': ESPN_POSITIONS.get(player.get('defaultPositionId'), ''),
+            'adp': round(float(adp), 1),
+            'seven_day_change': round(float(ownership.get('averageDraftPositionPercentChange') or 0.0), 1),
+        })
+    rows.sort(key=lambda r: r['adp'])
+    return [{'rank': i + 1, **r, 'date_scraped': today_date} for i, r in enumerate(rows)]
+
+
+def espn_filter_with_limit(request, limit, offset=0):
+    """Copy of a captured request's x-fantasy-filter header asking for `limit` players from `offset`."""
+    headers = dict((request or {}).get('headers') or {})
+    key = next((k for k in headers if k.lower() == 'x-fantasy-filter'), None)
+    if key is None:
+        return None
+    try:
+        fantasy_filter = json.loads(headers[key])
+    except ValueError:
+        return None
+    players = fantasy_filter.setdefault('players', {})
+    players['limit'] = limit
+    players['offset'] = offset
+    headers[key] = json.dumps(fantasy_filter)
+    return {**request, 'headers': headers}
+
+
+def iter_bettingpros_pages(recorder, today_date, timeout, stats=None, max_pages=50, release=False):
+    """Decoded rows of every captured /v3/props payload, one page (list) at a time, following
+    `_pagination.next` from inside the page so one load covers the whole table. With `release`
+    the recorder drops each payload once it is queued, so only the page in hand is held."""
+    if not recorder.wait(timeout, stats):
+        return
+    seen = set()
+    queue = [(item['url'], item['payload'], item['request']) for item in recorder.payloads]
+    if release:
+        recorder.payloads.clear()
+    while queue and len(seen) < max_pages:
+        url, payload, request = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        yield decode_bettingpros_props(payload, today_date)
+        next_url = bettingpros_next_url(payload)
+        payload = None
+        if next_url and next_url not in seen:
+            try:
+                next_payload = recorder.fetch(next_url, request)
+            except Exception:
+                logger.debug(f"Following {next_url} failed", exc_info=True)
+                next_payload = None
+            if release:
+                recorder.payloads.clear()
+            if next_payload is not None:
+                queue.append((next_url, next_payload, request))
+
+
+def collect_bettingpros(recorder, today_date, timeout, stats=None, max_pages=50):
+    """Every page of iter_bettingpros_pages as one list. Returns [] if nothing was captured."""
+    return [row for page in iter_bettingpros_pages(recorder, today_date, timeout, stats, max_pages) for row in page]
+
+
+def espn_page_requests(request, limit, page_size):
+    """x-fantasy-filter requests covering players [0, limit) in offset/limit pages, or None
+    if the captured request carries no filter."""
+    pages = [espn_filter_with_limit(request, min(page_size, limit - offset), offset) for offset in range(0, limit, page_size)]
+    return pages if pages and pages[0] is not None else None
+
+
+def merge_espn_pages(payloads):
+    """Player entries of several payloads, first occurrence of each player ID kept (pages of
+    a live ranking can overlap when it shifts between requests)."""
+    seen = set()
+    merged = []
+    for payload in payloads:
+        for entry in (payload or {}).get('players') or []:
+            player = entry.get('player') or entry
+            key = entry.get('id') or player.get('id') or player.get('fullName')
+            if key not in seen:
+                seen.add(key)
+                merged.append(entry)
+    return merged
+
+
+def collect_espn(recorder, today_date, timeout, limit, stats=None, page_size=250, concurrency=4):
+    """Decode the live draft results payload. When the page only asked for its first screen,
+    players up to `limit` are re-requested as offset/limit pages of `page_size`, `concurrency`
+    at a time from inside the page, and merged (ranks come from ADP across all pages).
+    Returns [] if nothing was captured."""
+    if not recorder.wait(timeout, stats):
+        return []
+    item = recorder.payloads[-1]
+    payload = item['payload']
+    if len(payload.get('players') or []) < limit:
+        requests = espn_page_requests(item['request'], limit, page_size)
+        if requests is not None:
+            try:
+                pages = recorder.fetch_all([(item['url'], r) for r in requests], concurrency)
+                if any(pages):
+                    payload = {'players': merge_espn_pages(pages)}
+            except Exception:
+                logger.debug("Re-requesting ESPN players in pages failed", exc_info=True)
+    return decode_espn_players(payload, today_date)[:limit]
+
+
+def capture_mode():
+    """'auto' (XHR first, DOM fallback), 'xhr' or 'dom'."""
+    return os.getenv('CAPTURE_MODE', 'auto').lower()
+
+
+def decode_file(path, today_date=None):
+    """Decode a recorded payload file ({'url', 'payload'}) with the decoder its URL implies."""
+    with open(path, encoding='utf-8') as f:
+        recorded = json.load(f)
+    today_date = today_date or datetime.now().strftime('%Y-%m-%d')
+    url = recorded.get('url', '')
+    if BETTINGPROS_API.search(url):
+        return decode_bettingpros_props(recorded['payload'], today_date)
+    if ESPN_API.search(url):
+        return decode_espn_players(recorded['payload'], today_date)
+    raise ValueError(f"No decoder for {url}")
+
+
+if __name__ == '__main__':
+    # Offline check: decode recorded payloads, e.g. python xhr_capture.py fixtures/xhr/*.json
+    for path in sys.argv[1:]:
+        decoded = decode_file(path)
+        print(f"{path}: {len(decoded)} rows")
+        for row in decoded[:3]:
+            print(f"  {row}")